@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Any, Callable
+
+import funciones as fn
+import persistencia
+import instantanea
+import generador
+import motores
+import ventas
+import sucursales
+from catalogo import Catalogo
+
+TAMANIOS = [10 ** 3, 10 ** 4, 10 ** 5]
+
+
+def medir(nombre: str, filas: int, repeticiones: int, operacion: Callable[[int], Any], agrupar: bool = False) -> Dict[str, Any]:
+    '''
+    Mide el tiempo de ejecutar una operación varias veces.
+
+    Parámetros:
+    - operacion: Función que recibe el número de repetición.
+    - agrupar: Si es True, las repeticiones se hacen dentro de persistencia.agrupar() y el tiempo incluye
+      la escritura final del grupo.
+
+    Postcondiciones:
+    - Devuelve un diccionario con el nombre, el tamaño del catálogo, las repeticiones, los segundos totales
+      y las operaciones por segundo.
+    '''
+    inicio = time.perf_counter()
+    if agrupar:
+        with persistencia.agrupar(max_cambios=repeticiones + 1, ventana=3600.0):
+            for i in range(repeticiones):
+                operacion(i)
+    else:
+        for i in range(repeticiones):
+            operacion(i)
+    segundos = time.perf_counter() - inicio
+    return {"operacion": nombre, "filas": filas, "repeticiones": repeticiones, "segundos": segundos,
+            "ops_por_segundo": repeticiones / segundos if segundos else float("inf")}
+
+
+def medir_memoria(operacion: Callable[[], Any]) -> float:
+    '''
+    Devuelve el pico de memoria, en MB, reservado por Python durante la operación.
+    '''
+    tracemalloc.start()
+    try:
+        resultado = operacion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return pico / 2 ** 20
+
+
+def correr_tamanio(filas: int, repeticiones: int, semilla: int) -> List[Dict[str, Any]]:
+    '''
+    Genera un catálogo sintético de "filas" filas en una carpeta temporal y mide cada operación del menú
+    sin pasar por input() ni print().
+
+    Postcondiciones:
+    - Devuelve una lista de mediciones (ver medir()). La medición de carga incluye también el pico de memoria.
+    '''
+    carpeta_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.chdir(carpeta)
+        try:
+            generador.generar_catalogo(persistencia.RUTA_ARCHIVO, filas, semilla)
+            azar = random.Random(semilla)
+            resultados = []
+
+            resultado = medir("leer_archivo", filas, 1, lambda _: fn.leer_archivo())
+            resultado["memoria_mb"] = medir_memoria(fn.leer_archivo)
+            resultados.append(resultado)
+
+            archivo = fn.leer_archivo()
+            resultado = medir("catalogo", filas, 1, lambda _: Catalogo([list(f) for f in archivo]))
+            resultado["memoria_mb"] = medir_memoria(lambda: Catalogo(fn.leer_archivo()))
+            resultados.append(resultado)
+
+            catalogo = Catalogo(archivo)
+            claves = list(catalogo.indice)
+            marcas = sorted(set(clave[0] for clave in claves))
+            almacenamientos = sorted(set(clave[2] for clave in claves))
+
+            fn.leer_archivo_cacheado()
+            resultados.append(medir("modelos_cel", filas, max(repeticiones // 100, 1),
+                                    lambda i: fn.modelos_cel(marcas[i % len(marcas)], almacenamientos[i % len(almacenamientos)])))
+            resultados.append(medir("leer_filtrado", filas, 1,
+                                    lambda _: sum(1 for _ in persistencia.leer_filtrado(marca=marcas[0], almacenamiento="128"))))
+            resultados.append(medir("buscar", filas, repeticiones,
+                                    lambda i: catalogo.buscar(*claves[azar.randrange(len(claves))])))
+            resultados.append(medir("consultar", filas, repeticiones,
+                                    lambda i: catalogo.consultar(marcas[i % len(marcas)], almacenamientos[i % len(almacenamientos)],
+                                                                 anio_desde=2018, precio_maximo=azar.randint(300, 3000), con_stock=True)))
+            resultados.append(medir("indice_modelos", filas, 1, lambda _: catalogo.modelos))
+
+            def con_error(modelo: str) -> str:
+                # Simula un error de tipeo cambiando una letra del medio.
+                medio = len(modelo) // 2
+                return modelo[:medio] + "x" + modelo[medio + 1:]
+            resultados.append(medir("sugerir_prefijo", filas, repeticiones,
+                                    lambda i: catalogo.sugerir(claves[i % len(claves)][0], claves[i % len(claves)][1][:4])))
+            resultados.append(medir("sugerir_aproximado", filas, max(repeticiones // 10, 1),
+                                    lambda i: catalogo.sugerir(claves[i % len(claves)][0], con_error(claves[i % len(claves)][1]))))
+            resultados.append(medir("presupuesto", filas, repeticiones,
+                                    lambda i: catalogo.buscar_por_precio(marcas[i % len(marcas)], maximo=azar.randint(100, 3000), limite=20, descendente=True)))
+
+            resultados.append(medir("modificar_stock", filas, repeticiones,
+                                    lambda i: catalogo.actualizar_stock(*claves[i % len(claves)], 1 if i % 2 else -1), agrupar=True))
+            resultados.append(medir("modificar_stock_sin_agrupar", filas, max(repeticiones // 100, 1),
+                                    lambda i: catalogo.actualizar_stock(*claves[i % len(claves)], 1 if i % 2 else -1)))
+
+            def vender(i: int) -> int:
+                clave = claves[i % len(claves)]
+                precio = catalogo.precio(*clave)
+                if catalogo.cantidad(*clave) > 0:
+                    catalogo.actualizar_stock(*clave, -1)
+                return precio
+            resultados.append(medir("compra", filas, repeticiones, vender, agrupar=True))
+
+            def vender_pedido(i: int) -> Any:
+                # Pedido de 10 celulares distintos con stock, vendido con una sola escritura.
+                pedido = {clave: 1 for clave in (claves[(i * 10 + j) % len(claves)] for j in range(10))
+                          if catalogo.cantidad(*clave) > 0}
+                return catalogo.vender(pedido)
+            resultados.append(medir("pedido_10", filas, max(repeticiones // 10, 1), vender_pedido, agrupar=True))
+            resultados.append(medir("pedido_10_sin_agrupar", filas, max(repeticiones // 100, 1), vender_pedido))
+
+            libro = ventas.LibroVentas()
+            resultados.append(medir("registrar_venta", filas, repeticiones,
+                                    lambda i: libro.registrar(*claves[i % len(claves)], 100, "efectivo")))
+            resultados.append(medir("reporte_ventas_dia", filas, 1, lambda _: libro.totales(ventas.hoy(), por=("marca",))))
+
+            motor = motores.MotorSQLite()
+            motores.convertir(motores.MotorCSV(), motor)
+            catalogo_sqlite = Catalogo(motor.cargar(), motor)
+            resultados.append(medir("modificar_stock_sqlite", filas, max(repeticiones // 10, 1),
+                                    lambda i: catalogo_sqlite.actualizar_stock(*claves[i % len(claves)], 1 if i % 2 else -1)))
+            motor.cerrar()
+
+            # El mismo stock repartido en 4 sucursales, para medir las consultas con mezcla entre sucursales.
+            os.mkdir(sucursales.CARPETA_SUCURSALES)
+            for numero in range(4):
+                persistencia.escribir_archivo([archivo[0]] + [list(fila) for fila in archivo[1 + numero::4]],
+                                              os.path.join(sucursales.CARPETA_SUCURSALES, f"sucursal{numero}.csv"))
+            red = sucursales.Sucursales()
+            resultados.append(medir("sucursales_cargar", filas, 1, lambda _: [sucursal.catalogo for sucursal in red]))
+            resultados.append(medir("sucursales_modelos", filas, max(repeticiones // 10, 1),
+                                    lambda i: red.modelos(marcas[i % len(marcas)], int(almacenamientos[i % len(almacenamientos)]))))
+            resultados.append(medir("sucursales_presupuesto", filas, repeticiones,
+                                    lambda i: red.presupuesto(marcas[i % len(marcas)], azar.randint(100, 3000), limite=20)))
+            resultados.append(medir("sucursales_disponibilidad", filas, repeticiones,
+                                    lambda i: red.disponibilidad(*claves[i % len(claves)])))
+
+            persistencia.compactar()
+            resultados.append(medir("instantanea_exportar", filas, 1, lambda _: instantanea.exportar(fn.leer_archivo())))
+            resultado = medir("instantanea_cargar", filas, 1, lambda _: instantanea.cargar_si_vigente())
+            resultado["memoria_mb"] = medir_memoria(instantanea.cargar_si_vigente)
+            resultados.append(resultado)
+            return resultados
+        finally:
+            os.chdir(carpeta_original)
+
+
+def imprimir_tabla(resultados: List[Dict[str, Any]]) -> None:
+    '''
+    Imprime las mediciones como una tabla de texto.
+    '''
+    print(f"{'Operación':<28}{'Filas':>10}{'Reps':>8}{'Segundos':>12}{'Ops/s':>14}{'Memoria MB':>12}")
+    for resultado in resultados:
+        memoria = f"{resultado['memoria_mb']:.1f}" if "memoria_mb" in resultado else "-"
+        print(f"{resultado['operacion']:<28}{resultado['filas']:>10}{resultado['repeticiones']:>8}"
+              f"{resultado['segundos']:>12.4f}{resultado['ops_por_segundo']:>14.1f}{memoria:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las operaciones del menú sobre catálogos sintéticos.")
+    parser.add_argument("--tamanios", type=int, nargs="+", default=TAMANIOS, help="Cantidades de filas a probar (10^3 a 10^7).")
+    parser.add_argument("--repeticiones", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados en JSON.")
+    argumentos = parser.parse_args()
+
+    resultados = []
+    for tamanio in argumentos.tamanios:
+        resultados.extend(correr_tamanio(tamanio, argumentos.repeticiones, argumentos.semilla))
+    if argumentos.json:
+        print(json.dumps(resultados, indent=2))
+    else:
+        imprimir_tabla(resultados)
@@ -0,0 +1,166 @@
+from bisect import insort
+from typing import List, Dict, Tuple, Optional, Iterable
+
+import instrumentacion
+
+# Cantidad de candidatos que guarda cada nodo del trie y máximo que devuelve una búsqueda.
+CANDIDATOS = 10
+
+
+def normalizar(texto: str) -> str:
+    '''
+    Normaliza una marca o un modelo para buscarlo: minúsculas y sin espacios de más ("15 Pro " -> "15 pro").
+    '''
+    return " ".join(str(texto).lower().split())
+
+
+def distancia_maxima(texto: str) -> int:
+    '''
+    Cantidad de errores de tipeo que se toleran según el largo de lo escrito: ninguno hasta 3 letras,
+    uno hasta 7 y dos a partir de 8.
+    '''
+    return min(len(texto) // 4, 2)
+
+
+class _Nodo:
+    __slots__ = ("hijos", "mejores")
+
+    def __init__(self) -> None:
+        self.hijos: Dict[str, "_Nodo"] = {}
+        # Los CANDIDATOS modelos más cortos del subárbol, como (largo, modelo normalizado).
+        self.mejores: List[Tuple[int, str]] = []
+
+    def sumar_candidato(self, candidato: Tuple[int, str]) -> None:
+        if len(self.mejores) < CANDIDATOS or candidato < self.mejores[-1]:
+            insort(self.mejores, candidato)
+            del self.mejores[CANDIDATOS:]
+
+
+class IndiceModelos:
+    '''
+    Índice de búsqueda de modelos: un trie por marca sobre los nombres de modelo normalizados.
+
+    Cada nodo guarda los modelos más cortos de su subárbol, así que una búsqueda por prefijo recorre
+    solo las letras de lo escrito y no el catálogo. La búsqueda aproximada recorre el trie con la
+    distancia de edición y descarta las ramas que ya superan la cantidad de errores permitida.
+    '''
+
+    def __init__(self) -> None:
+        self.raices: Dict[str, _Nodo] = {}
+        self.filas: Dict[Tuple[str, str], List[int]] = {}
+
+    def agregar(self, marca: str, modelo: str, indice_fila: int) -> None:
+        '''
+        Agrega al índice la fila "indice_fila" del catálogo con esa marca y ese modelo.
+        '''
+        marca, modelo = normalizar(marca), normalizar(modelo)
+        filas = self.filas.setdefault((marca, modelo), [])
+        filas.append(indice_fila)
+        if len(filas) == 1:
+            self._insertar(marca, modelo)
+
+    def _insertar(self, marca: str, modelo: str) -> None:
+        # La raíz también guarda candidatos, para las búsquedas con texto vacío.
+        candidato = (len(modelo), modelo)
+        nodo = self.raices.setdefault(marca, _Nodo())
+        nodo.sumar_candidato(candidato)
+        for letra in modelo:
+            nodo = nodo.hijos.setdefault(letra, _Nodo())
+            nodo.sumar_candidato(candidato)
+
+    @instrumentacion.medir
+    def agregar_todos(self, filas: Iterable[Tuple[str, str, int]]) -> None:
+        '''
+        Agrega muchas filas (marca, modelo, índice de fila) juntas, por ejemplo al armar el índice.
+
+        Postcondiciones:
+        - Queda igual que llamando a agregar() con cada fila, pero los modelos se insertan de más corto a
+          más largo, así que en cada nodo los candidatos nuevos solo se agregan al final de la lista.
+        '''
+        nuevos: List[Tuple[int, str, str]] = []
+        for marca, modelo, indice_fila in filas:
+            marca, modelo = normalizar(marca), normalizar(modelo)
+            filas_modelo = self.filas.setdefault((marca, modelo), [])
+            filas_modelo.append(indice_fila)
+            if len(filas_modelo) == 1:
+                nuevos.append((len(modelo), modelo, marca))
+        if self.raices:
+            for _, modelo, marca in nuevos:
+                self._insertar(marca, modelo)
+            return
+        nuevos.sort()
+        for largo, modelo, marca in nuevos:
+            nodo = self.raices.setdefault(marca, _Nodo())
+            candidato = (largo, modelo)
+            if len(nodo.mejores) < CANDIDATOS:
+                nodo.mejores.append(candidato)
+            for letra in modelo:
+                hijo = nodo.hijos.get(letra)
+                if hijo is None:
+                    hijo = nodo.hijos[letra] = _Nodo()
+                nodo = hijo
+                if len(nodo.mejores) < CANDIDATOS:
+                    nodo.mejores.append(candidato)
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("IndiceModelos.agregar_todos", filas=len(nuevos))
+
+    @instrumentacion.medir
+    def buscar(self, marca: Optional[str], texto: str, distancia: Optional[int] = None,
+               limite: int = CANDIDATOS) -> List[Tuple[int, str, str]]:
+        '''
+        Busca los modelos que empiezan con "texto" o que se le parecen.
+
+        Parámetros:
+        - marca: Marca donde buscar. Si es None se busca en todas.
+        - distancia: Errores de tipeo tolerados. Si es None se usa distancia_maxima(texto).
+
+        Postcondiciones:
+        - Devuelve hasta "limite" tuplas (errores, marca, modelo) con la marca y el modelo normalizados,
+          ordenadas por errores, largo del modelo y modelo. Un modelo que empieza con "texto" tiene 0 errores.
+        '''
+        texto = normalizar(texto)
+        distancia = distancia_maxima(texto) if distancia is None else distancia
+        marcas = list(self.raices) if marca is None else [normalizar(marca)]
+        encontrados: Dict[Tuple[str, str], int] = {}
+        for nombre in marcas:
+            raiz = self.raices.get(nombre)
+            if raiz is None:
+                continue
+            nodo = self._prefijo(raiz, texto)
+            if nodo is not None:
+                for _, modelo in nodo.mejores:
+                    encontrados[(nombre, modelo)] = 0
+            if distancia and (nodo is None or len(nodo.mejores) < limite):
+                self._aproximados(nombre, raiz, texto, distancia, encontrados)
+        ordenados = sorted((errores, len(modelo), marca, modelo) for (marca, modelo), errores in encontrados.items())
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("IndiceModelos.buscar", filas=len(encontrados))
+        return [(errores, marca, modelo) for errores, _, marca, modelo in ordenados[:limite]]
+
+    @staticmethod
+    def _prefijo(nodo: _Nodo, texto: str) -> Optional[_Nodo]:
+        for letra in texto:
+            nodo = nodo.hijos.get(letra)
+            if nodo is None:
+                return None
+        return nodo
+
+    @staticmethod
+    def _aproximados(marca: str, raiz: _Nodo, texto: str, distancia: int, encontrados: Dict[Tuple[str, str], int]) -> None:
+        # Cada elemento de la pila es un nodo y la fila de la matriz de distancia de edición entre el
+        # camino hasta ese nodo y cada prefijo de "texto". El último valor de la fila es la distancia
+        # entre "texto" y el camino: si no supera el máximo, todos los modelos del subárbol son candidatos.
+        pila = [(raiz, list(range(len(texto) + 1)))]
+        while pila:
+            nodo, fila = pila.pop()
+            if fila[-1] <= distancia:
+                for _, modelo in nodo.mejores:
+                    if fila[-1] < encontrados.get((marca, modelo), distancia + 1):
+                        encontrados[(marca, modelo)] = fila[-1]
+            for letra, hijo in nodo.hijos.items():
+                nueva = [fila[0] + 1]
+                for j, esperada in enumerate(texto, start=1):
+                    nueva.append(min(nueva[j - 1] + 1, fila[j] + 1, fila[j - 1] + (letra != esperada)))
+                if min(nueva) <= distancia:
+                    pila.append((hijo, nueva))
+
@@ -0,0 +1,150 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, Set
+
+import persistencia
+import instrumentacion
+from catalogo import validar_producto
+
+# Por debajo de este tamaño el archivo se procesa en el mismo proceso: repartirlo cuesta más de lo que ahorra.
+TAMANIO_MINIMO_PARALELO = 8 * 2 ** 20
+
+# Tamaño aproximado de cada fragmento. Hay más fragmentos que procesos para repartir mejor la carga.
+TAMANIO_FRAGMENTO = 16 * 2 ** 20
+
+REPETIDO = "El producto está repetido en el archivo."
+
+
+def dividir(ruta: str, partes: int) -> List[Tuple[int, int]]:
+    '''
+    Divide un archivo en rangos de bytes que empiezan y terminan en un límite de línea.
+
+    Postcondiciones:
+    - Devuelve a lo sumo "partes" rangos (inicio, fin) contiguos que cubren todo el archivo.
+    '''
+    tamanio = os.path.getsize(ruta)
+    limites = [0]
+    with open(ruta, "rb") as archivo:
+        for parte in range(1, partes):
+            posicion = tamanio * parte // partes
+            if posicion <= limites[-1]:
+                continue
+            archivo.seek(posicion - 1)
+            archivo.readline()
+            if archivo.tell() >= tamanio:
+                break
+            if archivo.tell() > limites[-1]:
+                limites.append(archivo.tell())
+    limites.append(tamanio)
+    return [(inicio, fin) for inicio, fin in zip(limites, limites[1:]) if fin > inicio]
+
+
+def procesar_fragmento(ruta: str, inicio: int, fin: int, cantidad_minima: int = 0,
+                       capitalizar: bool = False) -> Tuple[List[Tuple[int, List[str]]], List[Tuple[int, str]], int]:
+    '''
+    Parsea y valida las líneas de un rango de bytes del archivo. Se ejecuta en un proceso del pool.
+
+    Parámetros:
+    - cantidad_minima, capitalizar: Ver validar_archivo().
+
+    Postcondiciones:
+    - Devuelve las filas válidas y los errores, los dos con su número de línea dentro del fragmento, y la
+      cantidad de líneas del fragmento. Las líneas vacías y el encabezado al comienzo del archivo se saltean.
+    '''
+    with open(ruta, "rb") as archivo:
+        archivo.seek(inicio)
+        datos = archivo.read(fin - inicio)
+    texto = datos.decode("utf-8-sig" if inicio == 0 else "utf-8")
+    lineas = texto.split("\n")
+    if lineas and lineas[-1] == "":
+        lineas.pop()
+
+    filas: List[Tuple[int, List[str]]] = []
+    errores: List[Tuple[int, str]] = []
+    for numero, linea in enumerate(lineas, start=1):
+        fila = linea.strip().split(";")
+        if fila == [""] or (inicio == 0 and numero == 1 and fila[0] == "Marca"):
+            continue
+        if capitalizar:
+            fila[0] = fila[0].capitalize()
+        errores_fila = validar_producto(fila, cantidad_minima)
+        if errores_fila:
+            errores.extend((numero, error) for error in errores_fila)
+        else:
+            filas.append((numero, fila))
+    return filas, errores, len(lineas)
+
+
+@instrumentacion.medir
+def validar_archivo(ruta: str, procesos: Optional[int] = None, cantidad_minima: int = 0,
+                    capitalizar: bool = False,
+                    quitar_repetidos: bool = True) -> Tuple[List[Tuple[int, List[str]]], List[Tuple[int, str]]]:
+    '''
+    Parsea y valida un archivo con el formato de "stock_celulares.csv" repartiendo el trabajo entre procesos.
+
+    Parámetros:
+    - procesos: Cantidad de procesos. Si es None se usa la cantidad de núcleos.
+    - cantidad_minima: Cantidad mínima aceptada por fila (0 para el stock, 1 para productos nuevos).
+    - capitalizar: Si es True, la marca se pasa a mayúscula inicial antes de validar, como al cargar productos.
+    - quitar_repetidos: Si es False, las claves repetidas se devuelven todas, para que quien llama descarte
+      las repetidas recién después de sus propias validaciones (ver funciones.importar_productos()).
+
+    Postcondiciones:
+    - Devuelve las filas válidas, en el orden del archivo y con su número de línea, y el reporte de errores
+      como pares (número de línea, mensaje), ordenado por línea.
+    - Si quitar_repetidos es True, las claves (marca, modelo, almacenamiento) repetidas entre las filas
+      válidas se informan como error a partir de la segunda.
+    - Los archivos chicos se procesan en el mismo proceso.
+    - Es para archivos que vienen de afuera (importaciones y archivos de proveedores). El stock propio se
+      carga al iniciar con persistencia.leer_csv(), sin validar: solo lo escribe este programa, que ya
+      valida cada fila al guardarla, y no llega al tamaño a partir del cual conviene repartirlo.
+    '''
+    tamanio = os.path.getsize(ruta)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or tamanio < TAMANIO_MINIMO_PARALELO:
+        resultados = [procesar_fragmento(ruta, 0, tamanio, cantidad_minima, capitalizar)]
+    else:
+        fragmentos = dividir(ruta, max(procesos, tamanio // TAMANIO_FRAGMENTO))
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            pendientes = [pool.submit(procesar_fragmento, ruta, inicio, fin, cantidad_minima, capitalizar)
+                          for inicio, fin in fragmentos]
+            resultados = [pendiente.result() for pendiente in pendientes]
+
+    filas: List[Tuple[int, List[str]]] = []
+    errores: List[Tuple[int, str]] = []
+    vistos: Set[Tuple[str, str, str]] = set()
+    lineas_anteriores = 0
+    for filas_fragmento, errores_fragmento, lineas in resultados:
+        errores.extend((lineas_anteriores + numero, error) for numero, error in errores_fragmento)
+        for numero, fila in filas_fragmento:
+            clave = (fila[0], fila[1], fila[4])
+            if quitar_repetidos:
+                if clave in vistos:
+                    errores.append((lineas_anteriores + numero, REPETIDO))
+                    continue
+                vistos.add(clave)
+            filas.append((lineas_anteriores + numero, fila))
+        lineas_anteriores += lineas
+    errores.sort(key=lambda error: error[0])
+    if instrumentacion.ACTIVA:
+        instrumentacion.sumar("validar_archivo", filas=lineas_anteriores, bytes_leidos=tamanio)
+    return filas, errores
+
+
+def reporte(errores: List[Tuple[int, str]]) -> List[str]:
+    '''
+    Convierte los errores de validar_archivo() en líneas "Línea N: mensaje", ordenadas por línea.
+    '''
+    return [f"Línea {numero}: {error}" for numero, error in sorted(errores, key=lambda error: error[0])]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga y valida un archivo de stock en paralelo.")
+    parser.add_argument("ruta", nargs="?", default=persistencia.RUTA_ARCHIVO)
+    parser.add_argument("--procesos", type=int)
+    argumentos = parser.parse_args()
+    filas, errores = validar_archivo(argumentos.ruta, argumentos.procesos)
+    for error in reporte(errores):
+        print(error)
+    print(f"Filas válidas: {len(filas)}. Errores: {len(errores)}.")
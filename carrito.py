@@ -0,0 +1,143 @@
+from typing import List, Dict, Tuple, Any
+
+import ventas
+from catalogo import Catalogo, Clave
+
+
+def validar_tarjeta(numero_tarjeta: str, codigo_seguridad: str, dni: int) -> bool:
+    '''
+    Valida los datos de un pago con tarjeta Visa.
+
+    Postcondiciones:
+    - Devuelve True si el número tiene 16 caracteres, el código de seguridad 3 dígitos y el DNI está entre 10000000 y 47000000.
+    '''
+    return len(numero_tarjeta) == 16 and codigo_seguridad.isdigit() and len(codigo_seguridad) == 3 and 10000000 <= dni <= 47000000
+
+
+class ErrorCarrito(Exception):
+    '''
+    Error al armar o confirmar un pedido; el mensaje se le muestra al usuario.
+    '''
+
+
+class Carrito:
+    '''
+    Pedido de varios celulares que se arma de a uno y se vende de una sola vez.
+
+    Cada celular agregado queda reservado en el carrito con su cantidad y con el precio que tenía al
+    agregarlo, y se valida contra el stock del catálogo teniendo en cuenta lo que ya está en el carrito.
+    Al confirmar se vuelve a validar todo el pedido junto y se vende completo o no se vende nada.
+    '''
+
+    def __init__(self, catalogo: Catalogo) -> None:
+        self.catalogo = catalogo
+        self.items: Dict[Clave, int] = {}
+        self.precios: Dict[Clave, int] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def __len__(self) -> int:
+        return sum(self.items.values())
+
+    def agregar(self, marca: str, modelo: str, almacenamiento: Any, cantidad: Any = 1) -> Clave:
+        '''
+        Reserva unidades de un celular en el carrito.
+
+        Postcondiciones:
+        - La marca y el modelo se buscan sin distinguir mayúsculas ni espacios de más (ver Catalogo.resolver()).
+        - Si el celular no existe, la cantidad no es mayor que 0 o no hay stock para lo ya reservado más
+          lo pedido, lanza ErrorCarrito y el carrito queda igual.
+        - Devuelve la clave del celular agregado.
+        '''
+        clave = self.catalogo.resolver(str(marca), str(modelo), str(almacenamiento))
+        if clave is None:
+            raise ErrorCarrito("No se encontró el celular con los datos proporcionados.")
+        cantidad = int(cantidad)
+        if cantidad <= 0:
+            raise ErrorCarrito("La cantidad debe ser mayor que 0.")
+        reservado = self.items.get(clave, 0)
+        disponible = self.catalogo.cantidad(*clave)
+        if reservado + cantidad > disponible:
+            raise ErrorCarrito(f"Solo hay {disponible} unidades de {_nombre(clave)}"
+                               + (f" y ya hay {reservado} en el carrito." if reservado else "."))
+        self.items[clave] = reservado + cantidad
+        self.precios.setdefault(clave, self.catalogo.precio(*clave))
+        return clave
+
+    def quitar(self, clave: Clave) -> None:
+        '''
+        Saca del carrito todas las unidades de un celular.
+        '''
+        self.items.pop(clave, None)
+        self.precios.pop(clave, None)
+
+    def lineas(self) -> List[Tuple[Clave, int, int]]:
+        '''
+        Devuelve el contenido del carrito como tuplas (clave, cantidad, precio unitario), en el orden en que se agregó.
+        '''
+        return [(clave, cantidad, self.precios[clave]) for clave, cantidad in self.items.items()]
+
+    def total(self) -> int:
+        return sum(cantidad * precio for _, cantidad, precio in self.lineas())
+
+    def faltantes(self) -> List[Tuple[Clave, int, int]]:
+        '''
+        Vuelve a comparar el carrito con el stock actual (incluidos los cambios de otras terminales).
+
+        Postcondiciones:
+        - Devuelve las tuplas (clave, cantidad pedida, stock disponible) de los celulares sin stock suficiente.
+        '''
+        self.catalogo.refrescar()
+        faltantes = []
+        for clave, cantidad in self.items.items():
+            disponible = self.catalogo.cantidad(*clave) if clave in self.catalogo else 0
+            if disponible < cantidad:
+                faltantes.append((clave, cantidad, disponible))
+        return faltantes
+
+    def confirmar(self, pago: str, guardar: bool = True) -> List[Tuple[str, str, str, int, int]]:
+        '''
+        Vende todo el carrito de una sola vez y registra las ventas.
+
+        Precondiciones:
+        - El pago del total ya se cobró.
+
+        Parámetros:
+        - pago: "efectivo" o "tarjeta".
+        - guardar: Si es False, solo se descuenta el stock en memoria y quien llama guarda los cambios
+          devueltos con guardar_pedido del motor (como hace el servidor con su escritura de fondo).
+
+        Postcondiciones:
+        - Si hay stock de todo, descuenta el stock, guarda los cambios con una sola escritura, registra en
+          el libro de ventas una venta por unidad al precio reservado, vacía el carrito y devuelve los
+          cambios como tuplas (marca, modelo, almacenamiento, diferencia, nueva cantidad).
+        - Si falta stock de algún celular o no se pudo guardar el pedido, no modifica nada, lanza
+          ErrorCarrito y el carrito queda igual.
+        '''
+        pago = str(pago).lower()
+        if pago not in ventas.PAGOS:
+            raise ErrorCarrito("Opción de pago no válida.")
+        if not self.items:
+            raise ErrorCarrito("El carrito está vacío.")
+        try:
+            cambios = self.catalogo.vender(self.items) if guardar else self.catalogo.descontar(self.items)
+        except ValueError as e:
+            # El motor SQLite rechaza el pedido completo si otra terminal vendió el stock mientras tanto.
+            raise ErrorCarrito(str(e)) from e
+        if cambios is None:
+            detalle = ", ".join(f"{_nombre(clave)} (pedidas {cantidad}, hay {disponible})"
+                                for clave, cantidad, disponible in self.faltantes())
+            raise ErrorCarrito(f"No hay stock suficiente de: {detalle}." if detalle else "No hay stock suficiente.")
+        libro = ventas.abrir()
+        for clave, cantidad, precio in self.lineas():
+            for _ in range(cantidad):
+                libro.registrar(*clave, precio, pago)
+        self.items.clear()
+        self.precios.clear()
+        return cambios
+
+
+def _nombre(clave: Clave) -> str:
+    marca, modelo, almacenamiento = clave
+    return f"{marca} {modelo.strip()} {almacenamiento}GB"
@@ -0,0 +1,632 @@
+import heapq
+import sys
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+from typing import List, Dict, Set, Tuple, Optional, Iterator, Iterable, Callable, Union, Any
+
+import persistencia
+import instrumentacion
+from busqueda import IndiceModelos, CANDIDATOS, normalizar
+
+Clave = Tuple[str, str, str]
+
+
+def a_entero(valor: str) -> int:
+    '''
+    Convierte un campo numérico del archivo a entero, ignorando espacios y el signo "$".
+    '''
+    return int(valor.strip().strip('$'))
+
+
+class Celular:
+    '''
+    Fila del catálogo con los campos numéricos ya convertidos a enteros y las cadenas internadas.
+
+    Se puede usar como la lista de cadenas que devuelve leer_archivo(): celular[0] es la marca,
+    celular[2] la cantidad como cadena, ';'.join(celular) arma la línea del CSV, etc.
+    '''
+    __slots__ = ("marca", "modelo", "cantidad", "precio", "almacenamiento", "anio")
+
+    _CAMPOS = __slots__
+
+    def __init__(self, marca: str, modelo: str, cantidad: int, precio: int, almacenamiento: int, anio: int) -> None:
+        self.marca = sys.intern(marca)
+        self.modelo = sys.intern(modelo)
+        self.cantidad = cantidad
+        self.precio = precio
+        self.almacenamiento = almacenamiento
+        self.anio = anio
+
+    @classmethod
+    def desde_fila(cls, fila: List[str]) -> "Celular":
+        '''
+        Crea un Celular a partir de una fila de cadenas del archivo.
+
+        Precondiciones:
+        - Cantidad, precio, almacenamiento y año deben ser numéricos.
+        '''
+        return cls(fila[0], fila[1], a_entero(fila[2]), a_entero(fila[3]), a_entero(fila[4]), a_entero(fila[5]))
+
+    def __len__(self) -> int:
+        return 6
+
+    def __getitem__(self, indice: Union[int, slice]):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(6)[indice]]
+        valor = getattr(self, self._CAMPOS[indice])
+        return valor if isinstance(valor, str) else str(valor)
+
+    def __setitem__(self, indice: int, valor: str) -> None:
+        campo = self._CAMPOS[indice]
+        setattr(self, campo, sys.intern(valor) if indice < 2 else a_entero(str(valor)))
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(6))
+
+    def __eq__(self, otro: object) -> bool:
+        if isinstance(otro, Celular):
+            return all(getattr(self, c) == getattr(otro, c) for c in self._CAMPOS)
+        if isinstance(otro, list):
+            return list(self) == otro
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Celular({self.marca!r}, {self.modelo!r}, {self.cantidad}, {self.precio}, {self.almacenamiento}, {self.anio})"
+
+
+def clave_fila(fila: List[str]) -> Clave:
+    '''
+    Devuelve la clave compuesta (marca, modelo, almacenamiento) de una fila del archivo.
+
+    Precondiciones:
+    - La fila debe tener el formato de "stock_celulares.csv".
+
+    Postcondiciones:
+    - Devuelve una tupla con la marca, el modelo y el almacenamiento de la fila.
+    '''
+    return (fila[0], fila[1], fila[4])
+
+
+ALMACENAMIENTOS_VALIDOS = ['64', '128', '256', '512', '1024']
+
+
+def validar_producto(fila: List[str], cantidad_minima: int = 1) -> List[str]:
+    '''
+    Valida los datos de un producto con las mismas reglas que funciones.pedir_validar_producto().
+
+    Parámetros:
+    - fila: Lista con marca, modelo, cantidad, precio, almacenamiento y año de lanzamiento.
+    - cantidad_minima: Cantidad mínima aceptada. Un producto nuevo debe tener al menos 1; una fila del
+      stock puede tener 0 (sin stock).
+
+    Postcondiciones:
+    - Devuelve una lista con los errores encontrados. Si el producto es válido, la lista está vacía.
+    '''
+    if len(fila) != 6:
+        return [f"Se esperaban 6 campos y hay {len(fila)}."]
+
+    marca, modelo, cantidad, precio, almacenamiento, anio_lanzamiento = fila
+    errores = []
+    if not marca.isalpha():
+        errores.append("La marca solo puede tener letras.")
+    if len(modelo) == 0:
+        errores.append("El modelo no puede estar vacío.")
+    if not cantidad.isdigit() or int(cantidad) < cantidad_minima or int(cantidad) > 50:
+        errores.append(f"La cantidad debe estar entre {cantidad_minima} y 50.")
+    if not precio.isdigit() or int(precio) <= 0:
+        errores.append("El precio debe ser un número mayor a 0.")
+    if almacenamiento not in ALMACENAMIENTOS_VALIDOS:
+        errores.append("El almacenamiento debe ser 64, 128, 256, 512 o 1024.")
+    if not anio_lanzamiento.isdigit() or int(anio_lanzamiento) < 1983 or int(anio_lanzamiento) > 2024:
+        errores.append("El año de lanzamiento debe estar entre 1983 y 2024.")
+    return errores
+
+
+class Catalogo:
+    '''
+    Catálogo de celulares en memoria con un índice hash sobre la clave compuesta
+    (marca, modelo, almacenamiento), índices por faceta (conjuntos de filas por marca, almacenamiento
+    y año, y el conjunto de filas con stock), índices de precios ordenados, totales de unidades y
+    valor del inventario que se mantienen al día con cada cambio, un índice de búsqueda de modelos
+    por prefijo y con errores de tipeo (ver busqueda) y un índice de claves ordenadas por marca y
+    almacenamiento; estos dos últimos se arman la primera vez que se usan.
+
+    Se construye una sola vez a partir de leer_archivo() y comparte las filas con
+    la lista original, por lo que "archivo" sigue pudiendo escribirse tal cual.
+    Los cambios se guardan con el motor de almacenamiento indicado (ver motores).
+    '''
+
+    @instrumentacion.medir
+    def __init__(self, archivo: List[List[str]], motor=None) -> None:
+        '''
+        Construye el catálogo y su índice a partir de la lista devuelta por leer_archivo().
+
+        Precondiciones:
+        - archivo debe ser una lista de listas cuya primera fila es el encabezado.
+
+        Parámetros:
+        - motor: Objeto con guardar_stock, guardar_precio, guardar_alta, guardar_pedido, lote y cargar (ver
+          motores). Si es None se usa el módulo persistencia, que guarda en el CSV con diario.
+
+        Postcondiciones:
+        - Reemplaza cada fila de datos de "archivo" por un Celular.
+        - Indexa cada fila por su clave compuesta. Si una clave se repite, queda indexada la primera aparición.
+        - Arma los índices por faceta y los índices de precios (por marca y general).
+        - Calcula los totales de unidades y valor (cantidad por precio), generales y por marca, almacenamiento y año.
+          Como en las facetas, la marca se toma en minúsculas, así que "Iphone" e "IPHONE" suman juntas.
+        '''
+        self.archivo = archivo
+        self.motor = motor if motor is not None else persistencia
+        self.indice: Dict[Clave, int] = {}
+        self.indice_precios: Dict[str, List[Tuple[int, int]]] = {}
+        self.precios: List[Tuple[int, int]] = []
+        self.facetas: Dict[str, Dict[object, Set[int]]] = {"marca": {}, "almacenamiento": {}, "anio": {}}
+        self.con_stock: Set[int] = set()
+        self.total: List[int] = [0, 0]
+        self.totales: Dict[str, Dict[object, List[int]]] = {"marca": {}, "almacenamiento": {}, "anio": {}}
+        self._modelos: Optional[IndiceModelos] = None
+        self._claves_ordenadas: Optional[Dict[Tuple[str, int], List[Tuple[Clave, int]]]] = None
+        for i in range(1, len(archivo)):
+            if not isinstance(archivo[i], Celular):
+                archivo[i] = Celular.desde_fila(archivo[i])
+            fila = archivo[i]
+            self.indice.setdefault(clave_fila(fila), i)
+            self.indice_precios.setdefault(fila.marca.lower(), []).append((fila.precio, i))
+            self.precios.append((fila.precio, i))
+            self._indexar_facetas(fila, i)
+        for precios in self.indice_precios.values():
+            precios.sort()
+        self.precios.sort()
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("Catalogo.__init__", filas=len(archivo) - 1)
+
+    def _indexar_facetas(self, fila: Celular, indice_fila: int) -> None:
+        self.facetas["marca"].setdefault(fila.marca.lower(), set()).add(indice_fila)
+        self.facetas["almacenamiento"].setdefault(fila.almacenamiento, set()).add(indice_fila)
+        self.facetas["anio"].setdefault(fila.anio, set()).add(indice_fila)
+        if fila.cantidad > 0:
+            self.con_stock.add(indice_fila)
+        self._sumar_totales(fila, fila.cantidad, fila.cantidad * fila.precio)
+
+    def _sumar_totales(self, fila: Celular, unidades: int, valor: int) -> None:
+        for total in (self.total,
+                      self.totales["marca"].setdefault(fila.marca.lower(), [0, 0]),
+                      self.totales["almacenamiento"].setdefault(fila.almacenamiento, [0, 0]),
+                      self.totales["anio"].setdefault(fila.anio, [0, 0])):
+            total[0] += unidades
+            total[1] += valor
+
+    def __bool__(self) -> bool:
+        return bool(self.archivo)
+
+    def __len__(self) -> int:
+        return max(len(self.archivo) - 1, 0)
+
+    def __contains__(self, clave: Clave) -> bool:
+        return clave in self.indice
+
+    @property
+    def encabezado(self) -> List[str]:
+        return self.archivo[0] if self.archivo else []
+
+    def filas(self) -> Iterator[Celular]:
+        '''
+        Recorre las filas de datos del catálogo, sin el encabezado.
+        '''
+        return iter(self.archivo[1:])
+
+    def buscar(self, marca: str, modelo: str, almacenamiento: str) -> Optional[Celular]:
+        '''
+        Busca un celular por su clave compuesta en O(1).
+
+        Postcondiciones:
+        - Devuelve la fila del celular o None si no existe.
+        '''
+        indice_fila = self.indice.get((marca, modelo, almacenamiento))
+        if indice_fila is None:
+            return None
+        return self.archivo[indice_fila]
+
+    def cantidad(self, marca: str, modelo: str, almacenamiento: str) -> int:
+        '''
+        Devuelve el stock actual del celular indicado.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+        '''
+        return self.buscar(marca, modelo, almacenamiento).cantidad
+
+    def precio(self, marca: str, modelo: str, almacenamiento: str) -> int:
+        '''
+        Devuelve el precio actual del celular indicado.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+        '''
+        return self.buscar(marca, modelo, almacenamiento).precio
+
+    def modificar_cantidad(self, marca: str, modelo: str, almacenamiento: str, diferencia: int) -> int:
+        '''
+        Suma (o resta, si es negativa) la diferencia al stock del celular indicado.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+
+        Postcondiciones:
+        - Actualiza la fila en memoria y devuelve la nueva cantidad.
+        '''
+        return self.fijar_cantidad(marca, modelo, almacenamiento, self.cantidad(marca, modelo, almacenamiento) + diferencia)
+
+    def fijar_cantidad(self, marca: str, modelo: str, almacenamiento: str, cantidad: int) -> int:
+        '''
+        Reemplaza el stock del celular indicado.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+
+        Postcondiciones:
+        - Actualiza la fila en memoria, el conjunto de filas con stock y los totales, y devuelve la nueva cantidad.
+        '''
+        indice_fila = self.indice[(marca, modelo, almacenamiento)]
+        fila = self.archivo[indice_fila]
+        diferencia = cantidad - fila.cantidad
+        self._sumar_totales(fila, diferencia, diferencia * fila.precio)
+        fila.cantidad = cantidad
+        if cantidad > 0:
+            self.con_stock.add(indice_fila)
+        else:
+            self.con_stock.discard(indice_fila)
+        return cantidad
+
+    def fijar_precio(self, marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+        '''
+        Reemplaza el precio del celular indicado.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+
+        Postcondiciones:
+        - Actualiza la fila en memoria, los índices de precios y los totales.
+        '''
+        indice_fila = self.indice[(marca, modelo, almacenamiento)]
+        fila = self.archivo[indice_fila]
+        for precios in (self.indice_precios[fila.marca.lower()], self.precios):
+            del precios[bisect_left(precios, (fila.precio, indice_fila))]
+            insort(precios, (precio, indice_fila))
+        self._sumar_totales(fila, 0, fila.cantidad * (precio - fila.precio))
+        fila.precio = precio
+
+    def actualizar_stock(self, marca: str, modelo: str, almacenamiento: str, diferencia: int) -> Optional[int]:
+        '''
+        Suma la diferencia al stock del celular indicado y guarda el cambio en disco.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+
+        Postcondiciones:
+        - Si el stock resultante queda entre 0 y 50, aplica y guarda el cambio y devuelve la nueva cantidad.
+        - Si no, no modifica nada y devuelve None.
+        - Si falla la escritura (por ejemplo, el motor SQLite rechaza el cambio porque otra terminal dejó el
+          stock fuera de rango), se deshace el cambio en memoria y se propaga el error.
+        '''
+        nueva_cantidad = self.cantidad(marca, modelo, almacenamiento) + diferencia
+        if nueva_cantidad < 0 or nueva_cantidad > 50:
+            return None
+        self.modificar_cantidad(marca, modelo, almacenamiento, diferencia)
+        try:
+            self.motor.guardar_stock(self.archivo, marca, modelo, almacenamiento, diferencia, nueva_cantidad)
+        except BaseException:
+            self.fijar_cantidad(marca, modelo, almacenamiento, nueva_cantidad - diferencia)
+            raise
+        return nueva_cantidad
+
+    def actualizar_precio(self, marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+        '''
+        Reemplaza el precio del celular indicado y guarda el cambio en disco.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+        '''
+        self.fijar_precio(marca, modelo, almacenamiento, precio)
+        self.motor.guardar_precio(self.archivo, marca, modelo, almacenamiento, precio)
+
+    def dar_de_alta(self, fila: List[str]) -> bool:
+        '''
+        Agrega un celular nuevo al catálogo y guarda el alta en disco.
+
+        Postcondiciones:
+        - Devuelve True si se agregó o False si la clave ya existía (en ese caso no se modifica nada).
+        '''
+        if not self.agregar(fila):
+            return False
+        self.motor.guardar_alta(self.archivo, list(fila))
+        return True
+
+    def descontar(self, pedido: Dict[Clave, int]) -> Optional[List[Tuple[str, str, str, int, int]]]:
+        '''
+        Descuenta del stock en memoria todas las unidades de un pedido, o ninguna.
+
+        Parámetros:
+        - pedido: Cantidad a vender (mayor que 0) de cada celular, por clave.
+
+        Postcondiciones:
+        - Si todos los celulares existen y tienen stock suficiente, descuenta las cantidades y devuelve
+          los cambios como tuplas (marca, modelo, almacenamiento, diferencia, nueva cantidad).
+        - Si no, no modifica nada y devuelve None.
+        '''
+        for clave, cantidad in pedido.items():
+            if clave not in self.indice or cantidad <= 0 or self.cantidad(*clave) < cantidad:
+                return None
+        return [clave + (-cantidad, self.modificar_cantidad(*clave, -cantidad)) for clave, cantidad in pedido.items()]
+
+    def vender(self, pedido: Dict[Clave, int]) -> Optional[List[Tuple[str, str, str, int, int]]]:
+        '''
+        Vende todas las unidades de un pedido y guarda los cambios juntos en disco.
+
+        Postcondiciones:
+        - Si hay stock de todo el pedido, lo descuenta (ver descontar()), lo guarda con guardar_pedido del
+          motor, que lo escribe todo o nada, y devuelve los cambios.
+        - Si falta stock de algún celular, no modifica nada y devuelve None.
+        - Si falla la escritura, se deshacen los cambios en memoria y se propaga el error.
+        '''
+        cambios = self.descontar(pedido)
+        if cambios is None:
+            return None
+        try:
+            self.motor.guardar_pedido(self.archivo, cambios)
+        except BaseException:
+            for marca, modelo, almacenamiento, diferencia, nueva_cantidad in cambios:
+                self.fijar_cantidad(marca, modelo, almacenamiento, nueva_cantidad - diferencia)
+            raise
+        return cambios
+
+    def en_lote(self, cambio: Callable[[], Any]) -> Any:
+        '''
+        Ejecuta un lote de cambios que se guardan juntos.
+
+        Parámetros:
+        - cambio: Función sin parámetros que valida los cambios contra el catálogo, los aplica en memoria
+          (con modificar_cantidad(), fijar_precio() o agregar()) y los guarda con el motor.
+
+        Postcondiciones:
+        - Los cambios que "cambio" guarda con el motor se escriben juntos al terminar, en un solo lote del
+          motor (ver persistencia.lote() y MotorSQLite.lote()).
+        - Si "cambio" lanza una excepción (por ejemplo, el motor SQLite rechaza uno de los cambios), no se
+          guarda ningún cambio del lote, el catálogo en memoria se vuelve a leer del motor y se propaga la excepción.
+        - Devuelve lo que devuelva "cambio".
+        '''
+        try:
+            with self.motor.lote():
+                return cambio()
+        except BaseException:
+            self.recargar()
+            raise
+
+    def recargar(self) -> None:
+        '''
+        Vuelve a leer todo el catálogo del motor, descartando los cambios en memoria que no se guardaron.
+        '''
+        Catalogo.__init__(self, self.motor.cargar(), self.motor)
+
+    def refrescar(self) -> None:
+        '''
+        Trae a memoria los cambios guardados por otras terminales. Un catálogo que no se comparte no
+        tiene cambios externos, así que no hace nada (ver CatalogoCompartido).
+        '''
+
+    def agregar(self, fila: List[str]) -> bool:
+        '''
+        Agrega una fila nueva al catálogo.
+
+        Postcondiciones:
+        - Devuelve True si se agregó o False si la clave ya existía (en ese caso no se modifica nada).
+        '''
+        clave = clave_fila(fila)
+        if clave in self.indice:
+            return False
+        if not isinstance(fila, Celular):
+            fila = Celular.desde_fila(fila)
+        self.archivo.append(fila)
+        indice_fila = len(self.archivo) - 1
+        self.indice[clave] = indice_fila
+        insort(self.indice_precios.setdefault(fila.marca.lower(), []), (fila.precio, indice_fila))
+        insort(self.precios, (fila.precio, indice_fila))
+        self._indexar_facetas(fila, indice_fila)
+        if self._modelos is not None:
+            self._modelos.agregar(fila.marca, fila.modelo, indice_fila)
+        if self._claves_ordenadas is not None:
+            insort(self._claves_ordenadas.setdefault((fila.marca.lower(), fila.almacenamiento), []), (clave, indice_fila))
+        return True
+
+    @property
+    def modelos(self) -> IndiceModelos:
+        '''
+        Índice de búsqueda de modelos. Se arma al primer uso para no demorar la carga del catálogo.
+        '''
+        if self._modelos is None:
+            self._modelos = IndiceModelos()
+            self._modelos.agregar_todos((fila.marca, fila.modelo, i) for i, fila in enumerate(self.archivo[1:], start=1))
+        return self._modelos
+
+    def por_clave(self, marca: Optional[str] = None, almacenamiento: Optional[int] = None,
+                  con_stock: bool = False) -> Iterator[Celular]:
+        '''
+        Recorre los celulares de una marca y un almacenamiento ordenados por clave (marca, modelo, almacenamiento).
+
+        Parámetros:
+        - marca, almacenamiento, con_stock: Como en consultar().
+
+        Postcondiciones:
+        - Usa un índice de claves ordenadas por marca y almacenamiento, que se arma al primer uso y se
+          mantiene al agregar filas, así que no ordena nada en cada llamada: si se pide más de una lista
+          (por ejemplo, sin almacenamiento), las listas ya ordenadas se mezclan con heapq.merge.
+        '''
+        if self._claves_ordenadas is None:
+            self._claves_ordenadas = {}
+            for i, fila in enumerate(self.archivo[1:], start=1):
+                self._claves_ordenadas.setdefault((fila.marca.lower(), fila.almacenamiento), []).append((clave_fila(fila), i))
+            for claves in self._claves_ordenadas.values():
+                claves.sort()
+        buscada = (marca.lower() if marca is not None else None, int(almacenamiento) if almacenamiento is not None else None)
+        if None not in buscada:
+            listas = [self._claves_ordenadas.get(buscada, [])]
+        else:
+            listas = [claves for faceta, claves in self._claves_ordenadas.items()
+                      if buscada[0] in (None, faceta[0]) and buscada[1] in (None, faceta[1])]
+        filas = (self.archivo[i] for _, i in heapq.merge(*listas))
+        return (fila for fila in filas if fila.cantidad > 0) if con_stock else filas
+
+    def sugerir(self, marca: Optional[str], modelo: str, almacenamiento: Optional[str] = None,
+                limite: int = CANDIDATOS) -> List[Celular]:
+        '''
+        Busca los celulares cuyo modelo empieza con "modelo" o se le parece, para elegir entre ellos.
+
+        Parámetros:
+        - marca: Marca del celular, sin distinguir mayúsculas. Si es None se busca en todas.
+        - almacenamiento: Si se indica, solo se devuelven celulares con ese almacenamiento. Si no es un
+          número (por ejemplo "512GB"), se ignora y se sugieren todos los almacenamientos.
+
+        Postcondiciones:
+        - Devuelve hasta "limite" celulares, primero los que coinciden sin errores y los de nombre más
+          corto; los de un mismo modelo, ordenados por almacenamiento.
+        - El tiempo depende del largo de lo escrito y no del tamaño del catálogo.
+        '''
+        try:
+            almacenamiento = a_entero(str(almacenamiento)) if almacenamiento is not None else None
+        except ValueError:
+            almacenamiento = None
+        resultado: List[Celular] = []
+        for _, marca_normalizada, modelo_normalizado in self.modelos.buscar(marca, modelo, limite=limite):
+            filas = sorted((self.archivo[i] for i in self.modelos.filas[(marca_normalizada, modelo_normalizado)]),
+                           key=lambda fila: fila.almacenamiento)
+            resultado.extend(fila for fila in filas if almacenamiento is None or fila.almacenamiento == almacenamiento)
+            if len(resultado) >= limite:
+                break
+        return resultado[:limite]
+
+    def resolver(self, marca: str, modelo: str, almacenamiento: str) -> Optional[Clave]:
+        '''
+        Busca la clave exacta de un celular sin distinguir mayúsculas ni espacios de más en la marca y el modelo.
+
+        Postcondiciones:
+        - Devuelve la clave tal como está en el catálogo (por ejemplo ("Apple", "15 Pro ", "256")), o
+          None si no hay un celular con esos datos.
+        - Si la clave coincide exactamente se resuelve con el índice hash, sin armar el índice de búsqueda.
+        '''
+        if (marca, modelo, str(almacenamiento)) in self.indice:
+            return (marca, modelo, str(almacenamiento))
+        try:
+            almacenamiento_buscado = a_entero(str(almacenamiento))
+        except ValueError:
+            return None
+        for i in self.modelos.filas.get((normalizar(marca), normalizar(modelo)), ()):
+            fila = self.archivo[i]
+            if fila.almacenamiento == almacenamiento_buscado:
+                return clave_fila(fila)
+        return None
+
+    @instrumentacion.medir
+    def buscar_por_precio(self, marca: str, minimo: int = 0, maximo: Optional[int] = None,
+                          limite: Optional[int] = None, descendente: bool = False) -> List[Celular]:
+        '''
+        Busca los celulares de una marca con precio dentro del rango [minimo, maximo] usando bisección
+        sobre el índice de precios de la marca, en O(log n + k).
+
+        Parámetros:
+        - marca: Marca de celular (no distingue mayúsculas y minúsculas).
+        - minimo: Precio mínimo, inclusive.
+        - maximo: Precio máximo, inclusive. Si es None no hay tope.
+        - limite: Cantidad máxima de resultados. Si es None se devuelven todos.
+        - descendente: Si es True se recorre desde el precio más alto.
+
+        Postcondiciones:
+        - Devuelve las filas encontradas ordenadas por precio.
+        '''
+        precios = self.indice_precios.get(marca.lower(), [])
+        desde = bisect_left(precios, (minimo, 0))
+        hasta = len(precios) if maximo is None else bisect_right(precios, (maximo, len(self.archivo)))
+        rango = range(hasta - 1, desde - 1, -1) if descendente else range(desde, hasta)
+        if limite is not None:
+            rango = rango[:max(limite, 0)]
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("Catalogo.buscar_por_precio", filas=len(rango))
+        return [self.archivo[precios[i][1]] for i in rango]
+
+    @instrumentacion.medir
+    def consultar(self, marca: Optional[str] = None, almacenamiento: Optional[int] = None,
+                  anio_desde: Optional[int] = None, anio_hasta: Optional[int] = None,
+                  precio_minimo: Optional[int] = None, precio_maximo: Optional[int] = None,
+                  con_stock: bool = False) -> List[Celular]:
+        '''
+        Busca celulares combinando filtros sobre los índices, sin recorrer todo el catálogo.
+
+        Parámetros:
+        - marca: Marca de celular (no distingue mayúsculas y minúsculas). Si es None no se filtra.
+        - almacenamiento: Almacenamiento exacto. Si es None no se filtra.
+        - anio_desde, anio_hasta: Rango de años de lanzamiento, inclusive. None deja el extremo abierto.
+        - precio_minimo, precio_maximo: Rango de precios, inclusive. None deja el extremo abierto.
+        - con_stock: Si es True, solo devuelve celulares con cantidad mayor a 0.
+
+        Postcondiciones:
+        - Devuelve las filas que cumplen todos los filtros, en el orden del archivo.
+        - Los conjuntos de las facetas se intersectan empezando por el más chico. Si un rango (de años o de
+          precios) tiene menos filas que todos ellos, se empieza por ese rango. Los rangos restantes se
+          comprueban sobre cada fila, del más chico al más grande.
+        '''
+        conjuntos: List[Set[int]] = []
+        if marca is not None:
+            conjuntos.append(self.facetas["marca"].get(marca.lower(), set()))
+        if almacenamiento is not None:
+            conjuntos.append(self.facetas["almacenamiento"].get(int(almacenamiento), set()))
+        if con_stock:
+            conjuntos.append(self.con_stock)
+
+        # Cada rango es (cantidad de filas, filas que lo cumplen, predicado sobre una fila).
+        rangos: List[Tuple[int, Iterable[int], Callable[[Celular], bool]]] = []
+        if anio_desde is not None or anio_hasta is not None:
+            desde = anio_desde if anio_desde is not None else -sys.maxsize
+            hasta = anio_hasta if anio_hasta is not None else sys.maxsize
+            anios = [conjunto for anio, conjunto in self.facetas["anio"].items() if desde <= anio <= hasta]
+            rangos.append((sum(len(conjunto) for conjunto in anios), chain.from_iterable(anios),
+                           lambda fila: desde <= fila.anio <= hasta))
+        if precio_minimo is not None or precio_maximo is not None:
+            minimo = precio_minimo if precio_minimo is not None else -sys.maxsize
+            maximo = precio_maximo if precio_maximo is not None else sys.maxsize
+            # Con marca se usa su índice de precios, que ya combina las dos condiciones.
+            precios = self.indice_precios.get(marca.lower(), []) if marca is not None else self.precios
+            inicio = bisect_left(precios, (minimo, 0))
+            fin = bisect_right(precios, (maximo, len(self.archivo)))
+            rangos.append((fin - inicio, (precios[j][1] for j in range(inicio, fin)),
+                           lambda fila: minimo <= fila.precio <= maximo))
+
+        if not conjuntos and not rangos:
+            return list(self.filas())
+        conjuntos.sort(key=len)
+        rangos.sort(key=lambda rango: rango[0])
+        if conjuntos and (not rangos or len(conjuntos[0]) <= rangos[0][0]):
+            recorridas = len(conjuntos[0])
+            candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        else:
+            recorridas = rangos[0][0]
+            candidatos = set(rangos.pop(0)[1]).intersection(*conjuntos)
+
+        filas: Iterable[Celular] = (self.archivo[i] for i in sorted(candidatos))
+        for _, _, predicado in rangos:
+            filas = filter(predicado, filas)
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("Catalogo.consultar", filas=recorridas)
+        return list(filas)
+
+    def resumen_inventario(self) -> Dict[str, object]:
+        '''
+        Devuelve los totales del inventario sin recorrer las filas.
+
+        Postcondiciones:
+        - Devuelve un diccionario con "unidades" y "valor" generales, y en "marca", "almacenamiento" y
+          "anio" los pares [unidades, valor] de cada valor de la faceta, ordenados por clave. Las marcas
+          están en minúsculas, con las mismas claves que las facetas (ver consultar()).
+        '''
+        resumen: Dict[str, object] = {"unidades": self.total[0], "valor": self.total[1]}
+        for faceta, totales in self.totales.items():
+            resumen[faceta] = {clave: list(total) for clave, total in sorted(totales.items())}
+        return resumen
@@ -0,0 +1,265 @@
+import argparse
+import json
+import sys
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import motores
+import ventas
+from carrito import Carrito, ErrorCarrito, validar_tarjeta
+from catalogo import Catalogo, validar_producto
+
+
+class ErrorComando(Exception):
+    '''
+    Error en los datos de un comando; se informa en el resultado con "ok": false.
+    '''
+
+
+#logica sin entrada/salida inicio
+def _clave(catalogo: Catalogo, marca: str, modelo: str, almacenamiento: Any) -> tuple:
+    clave = catalogo.resolver(str(marca), str(modelo), str(almacenamiento))
+    if clave is None:
+        parecidos = ", ".join(f"{fila.marca} {fila.modelo.strip()} {fila.almacenamiento}"
+                              for fila in catalogo.sugerir(str(marca), str(modelo), str(almacenamiento), limite=3))
+        raise ErrorComando("No se encontró el celular con los datos proporcionados."
+                           + (f" Celulares parecidos: {parecidos}." if parecidos else ""))
+    return clave
+
+
+def consultar(catalogo: Catalogo, marca: Optional[str] = None, almacenamiento: Any = None,
+              anio_desde: Any = None, anio_hasta: Any = None, precio_minimo: Any = None, precio_maximo: Any = None,
+              con_stock: bool = False) -> List[List[str]]:
+    '''
+    Opción 1 y búsqueda avanzada: devuelve los celulares que cumplen todos los filtros indicados.
+    '''
+    numeros = [None if valor is None else int(valor) for valor in (almacenamiento, anio_desde, anio_hasta, precio_minimo, precio_maximo)]
+    return [list(fila) for fila in catalogo.consultar(marca, *numeros, con_stock=bool(con_stock))]
+
+
+def sugerir(catalogo: Catalogo, modelo: str, marca: Optional[str] = None, almacenamiento: Any = None,
+            limite: Any = 10) -> List[List[str]]:
+    '''
+    Opciones 3 y 4: devuelve los celulares cuyo modelo empieza con "modelo" o se le parece, de más a menos parecido.
+    '''
+    return [list(fila) for fila in catalogo.sugerir(marca, str(modelo), almacenamiento, int(limite))]
+
+
+def agregar(catalogo: Catalogo, marca: str, modelo: str, cantidad: Any, precio: Any, almacenamiento: Any, anio: Any) -> List[str]:
+    '''
+    Opción 2: da de alta un celular nuevo, con las mismas validaciones que pedir_validar_producto().
+    '''
+    fila = [str(marca).capitalize(), str(modelo), str(cantidad), str(precio), str(almacenamiento), str(anio)]
+    errores = validar_producto(fila)
+    if errores:
+        raise ErrorComando(" ".join(errores))
+    if not catalogo.dar_de_alta(fila):
+        raise ErrorComando("El celular ya existe.")
+    return fila
+
+
+def cambiar_stock(catalogo: Catalogo, marca: str, modelo: str, almacenamiento: Any, diferencia: Any) -> int:
+    '''
+    Opción 3: suma la diferencia al stock; el resultado debe quedar entre 0 y 50.
+    '''
+    nueva_cantidad = catalogo.actualizar_stock(*_clave(catalogo, marca, modelo, almacenamiento), int(diferencia))
+    if nueva_cantidad is None:
+        raise ErrorComando("No se puede restar más de la cantidad actual o sumar más de 50.")
+    return nueva_cantidad
+
+
+def cambiar_precio(catalogo: Catalogo, marca: str, modelo: str, almacenamiento: Any, precio: Any) -> int:
+    '''
+    Opción 4: reemplaza el precio; debe estar entre 0 y 10000.
+    '''
+    clave = _clave(catalogo, marca, modelo, almacenamiento)
+    if int(precio) < 0 or int(precio) > 10000:
+        raise ErrorComando("El precio debe estar entre 0 y 10000.")
+    catalogo.actualizar_precio(*clave, int(precio))
+    return int(precio)
+
+
+def presupuesto(catalogo: Catalogo, marca: str, presupuesto: Any, minimo: Any = 0, limite: Optional[int] = None) -> List[List[str]]:
+    '''
+    Opción 5: devuelve los celulares de la marca dentro del presupuesto, del más caro al más barato.
+    '''
+    if int(presupuesto) <= 0:
+        raise ErrorComando("El presupuesto debe ser mayor que 0.")
+    filas = catalogo.buscar_por_precio(marca, minimo=int(minimo), maximo=int(presupuesto), limite=limite, descendente=True)
+    return [list(fila) for fila in filas]
+
+
+def validar_pago(precio: float, pago: str, monto: Any = 0, numero_tarjeta: Any = "", codigo_seguridad: Any = "", dni: Any = 0) -> float:
+    '''
+    Valida un pago en efectivo o con tarjeta con las mismas reglas que efectivo() y tarjeta().
+
+    Postcondiciones:
+    - Devuelve el cambio a entregar (0 si se paga con tarjeta) o lanza ErrorComando si el pago no es válido.
+    '''
+    if str(pago).lower() == "efectivo":
+        if float(monto) < precio:
+            raise ErrorComando("El monto ingresado es insuficiente.")
+        return float(monto) - precio
+    if str(pago).lower() == "tarjeta":
+        if not validar_tarjeta(str(numero_tarjeta), str(codigo_seguridad), int(dni)):
+            raise ErrorComando("Datos de tarjeta o DNI inválidos.")
+        return 0.0
+    raise ErrorComando("Opción de pago no válida.")
+
+
+def comprar(catalogo: Catalogo, marca: str, modelo: str, almacenamiento: Any, pago: str, **datos_pago: Any) -> Dict[str, Any]:
+    '''
+    Opción 6: vende una unidad. Verifica que haya stock y que el pago sea válido antes de descontarla.
+    '''
+    clave = _clave(catalogo, marca, modelo, almacenamiento)
+    if catalogo.cantidad(*clave) <= 0:
+        raise ErrorComando("No hay stock disponible de ese celular.")
+    precio = float(catalogo.precio(*clave))
+    cambio = validar_pago(precio, pago, **datos_pago)
+    nueva_cantidad = cambiar_stock(catalogo, *clave, -1)
+    ventas.abrir().registrar(*clave, precio, pago)
+    return {"factura": {"marca": clave[0], "modelo": clave[1], "almacenamiento": clave[2], "precio": precio},
+            "cambio": cambio, "stock": nueva_cantidad}
+
+
+def armar_carrito(catalogo: Catalogo, items: List[Dict[str, Any]]) -> Carrito:
+    '''
+    Arma un carrito con ítems {"marca", "modelo", "almacenamiento", "cantidad"} y verifica el stock de todos.
+    '''
+    carrito = Carrito(catalogo)
+    try:
+        for item in items:
+            carrito.agregar(**item)
+    except ErrorCarrito as e:
+        raise ErrorComando(str(e))
+    if not carrito:
+        raise ErrorComando("El carrito está vacío.")
+    return carrito
+
+
+def factura_pedido(lineas: List[tuple], cambios: List[tuple], cambio: float) -> Dict[str, Any]:
+    stock = {(marca, modelo, almacenamiento): nueva_cantidad for marca, modelo, almacenamiento, _, nueva_cantidad in cambios}
+    items = [{"marca": clave[0], "modelo": clave[1], "almacenamiento": clave[2], "cantidad": cantidad,
+              "precio": precio, "subtotal": cantidad * precio, "stock": stock[clave]} for clave, cantidad, precio in lineas]
+    return {"factura": {"items": items, "total": sum(item["subtotal"] for item in items)}, "cambio": cambio}
+
+
+def pedido(catalogo: Catalogo, items: List[Dict[str, Any]], pago: str, **datos_pago: Any) -> Dict[str, Any]:
+    '''
+    Opción 6 con varios celulares: reserva todos los ítems, valida un solo pago por el total y vende el
+    pedido completo con una sola escritura, o no vende nada.
+    '''
+    carrito = armar_carrito(catalogo, items)
+    lineas = carrito.lineas()
+    cambio = validar_pago(float(carrito.total()), pago, **datos_pago)
+    try:
+        cambios = carrito.confirmar(pago)
+    except ErrorCarrito as e:
+        raise ErrorComando(str(e))
+    return factura_pedido(lineas, cambios, cambio)
+
+
+def resumen(catalogo: Catalogo) -> Dict[str, Any]:
+    '''
+    Opción 8: devuelve las unidades y el valor del inventario, en total y por marca, almacenamiento y año.
+    '''
+    return catalogo.resumen_inventario()
+
+
+def reporte_ventas(catalogo: Catalogo, desde: Optional[str] = None, hasta: Optional[str] = None, por: Any = ("dia",),
+                   marca: Optional[str] = None, modelo: Optional[str] = None) -> List[Dict[str, Any]]:
+    '''
+    Opción 9: devuelve las unidades vendidas y los ingresos de un rango de días (por defecto, hoy).
+    '''
+    return ventas.abrir().totales(desde or ventas.hoy(), hasta, tuple(por), marca, modelo)
+#logica sin entrada/salida final
+
+
+COMANDOS = {
+    "query": consultar,
+    "suggest": sugerir,
+    "add": agregar,
+    "stock": cambiar_stock,
+    "price": cambiar_precio,
+    "budget": presupuesto,
+    "buy": comprar,
+    "order": pedido,
+    "summary": resumen,
+    "sales": reporte_ventas,
+}
+
+
+def ejecutar(catalogo: Catalogo, comando: Dict[str, Any]) -> Dict[str, Any]:
+    '''
+    Ejecuta un comando con el formato {"cmd": nombre, ...parámetros}.
+
+    Postcondiciones:
+    - Devuelve {"ok": True, "resultado": ...} o {"ok": False, "error": ...}. Nunca lanza por datos inválidos.
+    '''
+    comando = dict(comando)
+    funcion = COMANDOS.get(comando.pop("cmd", None))
+    if funcion is None:
+        return {"ok": False, "error": "Comando desconocido."}
+    try:
+        return {"ok": True, "resultado": funcion(catalogo, **comando)}
+    except ErrorComando as e:
+        return {"ok": False, "error": str(e)}
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": f"Comando inválido: {e}"}
+
+
+def procesar(lineas: Iterable[str], catalogo: Catalogo, cada: int = 0) -> Iterator[Dict[str, Any]]:
+    '''
+    Ejecuta un flujo de comandos JSON, uno por línea, sobre un único catálogo cargado.
+
+    Parámetros:
+    - lineas: Líneas JSON. Se saltean las vacías y las que empiezan con "#".
+    - cada: Cantidad de comandos entre puntos de control. Si es 0, los cambios se guardan una sola vez al final.
+
+    Postcondiciones:
+    - Devuelve un generador con el resultado de cada comando, con el número de línea en "linea".
+    - Los comandos entre dos puntos de control se ejecutan como un lote del catálogo (ver Catalogo.en_lote()):
+      sus cambios se guardan juntos al terminar el tramo. Con un CatalogoCompartido, el tramo se ejecuta
+      con el bloqueo exclusivo tomado y el catálogo al día, así que no pisa cambios de otras terminales.
+    - Los resultados de cada tramo se devuelven una vez guardado el tramo.
+    '''
+    numeradas = enumerate(lineas, start=1)
+    terminado = False
+
+    def tramo() -> List[Dict[str, Any]]:
+        nonlocal terminado
+        resultados = []
+        for numero, linea in numeradas:
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                resultado = ejecutar(catalogo, json.loads(linea))
+            except ValueError as e:
+                resultado = {"ok": False, "error": f"JSON inválido: {e}"}
+            resultado["linea"] = numero
+            resultados.append(resultado)
+            if cada and len(resultados) == cada:
+                return resultados
+        terminado = True
+        return resultados
+
+    while not terminado:
+        yield from catalogo.en_lote(tramo)
+        ventas.abrir().volcar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ejecuta comandos de inventario sin menú (un JSON por línea).")
+    parser.add_argument("archivo", nargs="?", help="Archivo de comandos. Si no se indica, se lee la entrada estándar.")
+    parser.add_argument("--cada", type=int, default=0, help="Guardar cada N comandos (0: solo al final).")
+    argumentos = parser.parse_args()
+
+    catalogo = motores.abrir_catalogo(compartido=True)
+    entrada = open(argumentos.archivo, encoding="utf-8") if argumentos.archivo else sys.stdin
+    try:
+        for resultado in procesar(entrada, catalogo, argumentos.cada):
+            print(json.dumps(resultado, ensure_ascii=False))
+        ventas.abrir().volcar()
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
@@ -0,0 +1,253 @@
+from typing import List, Dict, Optional, Tuple, Callable, Any
+
+import persistencia
+from catalogo import Catalogo, Clave
+
+# Cantidad de intentos optimistas antes de hacer el cambio con el bloqueo tomado desde el principio.
+REINTENTOS = 3
+
+
+class CatalogoCompartido(Catalogo):
+    '''
+    Catálogo para usar desde varias terminales a la vez sobre el mismo "stock_celulares.csv".
+
+    Guarda la versión del stock en disco que vio por última vez (ver persistencia.version_en_disco()).
+    Por defecto trabaja sobre "stock_celulares.csv" y su diario; con otra ruta y otro motor (por ejemplo,
+    el de una sucursal, ver sucursales.MotorSucursal), lleva la versión de ese archivo.
+    Cada cambio se valida sobre los datos en memoria y se escribe solo si la versión en disco no cambió
+    mientras tanto; si cambió, se traen los cambios de las otras terminales y se vuelve a intentar.
+    El bloqueo exclusivo solo se toma para comparar la versión y agregar el registro al diario, así que
+    las terminales no quedan esperando a que termine la sesión de otra.
+    '''
+
+    def __init__(self, archivo: List[List[str]], version: Tuple[int, int, int], motor=None,
+                 ruta: str = persistencia.RUTA_ARCHIVO, ruta_diario: Optional[str] = None) -> None:
+        '''
+        Construye el catálogo a partir de datos leídos en la versión indicada.
+
+        Precondiciones:
+        - "archivo" debe haberse leído del disco cuando la versión era "version". Usar cargar() para garantizarlo.
+        - Si se indica "motor", debe guardar los cambios en "ruta" y su diario en "ruta_diario", con los
+          registros de persistencia.
+
+        Parámetros:
+        - ruta, ruta_diario: CSV y diario del stock. Si ruta_diario es None se usa persistencia.RUTA_DIARIO.
+        '''
+        super().__init__(archivo, motor)
+        self.ruta = ruta
+        self.ruta_diario = ruta_diario
+        self.version = version
+        self.desplazamiento_diario = version[2]
+        # Si es True, hay un en_lote() en curso: el bloqueo exclusivo ya está tomado y el catálogo al día.
+        self._en_lote = False
+
+    @classmethod
+    def cargar(cls, cargador=None, motor=None, ruta: str = persistencia.RUTA_ARCHIVO,
+               ruta_diario: Optional[str] = None) -> "CatalogoCompartido":
+        '''
+        Lee el stock del disco con el bloqueo compartido tomado y registra su versión.
+
+        Parámetros:
+        - cargador: Función sin parámetros que devuelve los datos con el formato de leer_archivo().
+          Por defecto se lee el CSV y se aplica el diario.
+        - motor, ruta, ruta_diario: Ver __init__().
+        '''
+        with persistencia.bloquear(exclusivo=False):
+            version = persistencia.version_en_disco(ruta, ruta_diario)
+            archivo = cargador() if cargador is not None else _leer(ruta, ruta_diario)
+        return cls(archivo, version, motor, ruta, ruta_diario)
+
+    def _version(self) -> Tuple[int, int, int]:
+        return persistencia.version_en_disco(self.ruta, self.ruta_diario)
+
+    def refrescar(self) -> None:
+        '''
+        Trae a memoria los cambios que guardaron otras terminales.
+
+        Postcondiciones:
+        - Si solo se agregaron registros al diario, se aplican los nuevos sobre las filas en memoria.
+        - Si cambió el CSV (por una compactación, una reescritura o filas agregadas), se vuelve a leer todo.
+        '''
+        with persistencia.bloquear(exclusivo=False):
+            version = self._version()
+            if version == self.version:
+                return
+            if version[:2] == self.version[:2]:
+                registros, desplazamiento = persistencia.leer_diario_desde(self.desplazamiento_diario, self.ruta_diario)
+                if desplazamiento >= 0:
+                    for registro in registros:
+                        self._aplicar_registro(registro)
+                    self.version = version[:2] + (desplazamiento,)
+                    self.desplazamiento_diario = desplazamiento
+                    return
+            self.recargar()
+
+    def recargar(self) -> None:
+        '''
+        Vuelve a leer todo el stock del disco (ver Catalogo.recargar()) y registra su versión.
+        '''
+        with persistencia.bloquear(exclusivo=False):
+            version = self._version()
+            archivo = _leer(self.ruta, self.ruta_diario)
+        Catalogo.__init__(self, archivo, self.motor)
+        self.version = version
+        self.desplazamiento_diario = version[2]
+
+    def _aplicar_registro(self, registro: List[str]) -> None:
+        if len(registro) < 5:
+            return
+        clave = (registro[1], registro[2], registro[3])
+        if registro[0] == "A" and len(registro) == 7:
+            self.agregar(persistencia.fila_de_alta(registro))
+            return
+        if clave not in self:
+            return
+        if registro[0] == "P" and len(registro) == 5:
+            self.fijar_precio(*clave, int(registro[4]))
+        elif registro[0] == "S" and len(registro) == 6:
+            self.fijar_cantidad(*clave, int(registro[5]))
+
+    def _confirmar_si_vigente(self, forzar: bool, cambio) -> Tuple[bool, Optional[int]]:
+        with persistencia.bloquear():
+            if forzar:
+                self.refrescar()
+            elif self._version() != self.version:
+                return False, None
+            resultado = cambio()
+            self.motor.confirmar()
+            self.version = self._version()
+            self.desplazamiento_diario = self.version[2]
+        return True, resultado
+
+    def _con_reintentos(self, cambio):
+        if self._en_lote:
+            return cambio()
+        for intento in range(REINTENTOS + 1):
+            confirmado, resultado = self._confirmar_si_vigente(intento == REINTENTOS, cambio)
+            if confirmado:
+                return resultado
+            self.refrescar()
+
+    def actualizar_stock(self, marca: str, modelo: str, almacenamiento: str, diferencia: int) -> Optional[int]:
+        '''
+        Suma la diferencia al stock del celular indicado, validando sobre los datos más recientes del disco.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+
+        Postcondiciones:
+        - Si el stock resultante queda entre 0 y 50, aplica y guarda el cambio y devuelve la nueva cantidad.
+        - Si no, no modifica nada y devuelve None.
+        - Ningún cambio de otra terminal se pierde: si la versión en disco cambió, se reintenta con datos frescos.
+        '''
+        return self._con_reintentos(lambda: Catalogo.actualizar_stock(self, marca, modelo, almacenamiento, diferencia))
+
+    def actualizar_precio(self, marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+        '''
+        Reemplaza el precio del celular indicado sin pisar cambios de otras terminales.
+
+        Precondiciones:
+        - El celular debe existir en el catálogo.
+        '''
+        self._con_reintentos(lambda: Catalogo.actualizar_precio(self, marca, modelo, almacenamiento, precio))
+
+    def dar_de_alta(self, fila: List[str]) -> bool:
+        '''
+        Agrega un celular nuevo sin pisar cambios de otras terminales.
+
+        Postcondiciones:
+        - Devuelve True si se agregó o False si la clave ya existía, contando las altas de otras terminales.
+        '''
+        return self._con_reintentos(lambda: Catalogo.dar_de_alta(self, fila))
+
+    def vender(self, pedido: Dict[Clave, int]) -> Optional[List[Tuple[str, str, str, int, int]]]:
+        '''
+        Vende todas las unidades de un pedido, validando el stock sobre los datos más recientes del disco.
+
+        Postcondiciones:
+        - Si hay stock de todo el pedido, lo descuenta, lo guarda como un solo registro del diario y
+          devuelve los cambios (ver Catalogo.vender()).
+        - Si falta stock de algún celular, contando las ventas de otras terminales, no modifica nada y
+          devuelve None.
+        '''
+        return self._con_reintentos(lambda: Catalogo.vender(self, pedido))
+
+    def en_lote(self, cambio: Callable[[], Any]) -> Any:
+        '''
+        Ejecuta un lote de cambios (ver Catalogo.en_lote()) sin pisar cambios de otras terminales.
+
+        Postcondiciones:
+        - "cambio" se ejecuta una sola vez, con el bloqueo exclusivo tomado y el catálogo al día con el
+          disco, así que valida y aplica los cambios sobre el stock vigente.
+        - Dentro de "cambio" se pueden usar actualizar_stock(), vender() y los demás cambios del catálogo:
+          se validan sobre los mismos datos y se guardan con el resto del lote.
+        '''
+        def en_bloqueo() -> Any:
+            anterior, self._en_lote = self._en_lote, True
+            try:
+                return Catalogo.en_lote(self, cambio)
+            finally:
+                self._en_lote = anterior
+
+        return self._con_reintentos(en_bloqueo)
+
+    def guardar_diferidos(self, cambios: List[Tuple[str, tuple]], archivo: Optional[List[List[str]]] = None) -> List[str]:
+        '''
+        Guarda cambios que ya se aplicaron en memoria sin validarlos contra el disco (como los del servidor,
+        que se escriben de fondo), sin pisar los cambios de otras terminales.
+
+        Parámetros:
+        - cambios: Tuplas (tipo, datos). Con tipo "stock", datos es (marca, modelo, almacenamiento, diferencia,
+          nueva cantidad); con "pedido", una tupla con la lista de esos cambios; con "precio", (marca, modelo,
+          almacenamiento, precio).
+        - archivo: Datos a escribir completos si no se usa el diario. Por defecto, los del catálogo.
+
+        Precondiciones:
+        - Mientras se ejecuta, el catálogo en memoria no se modifica ni se refresca.
+
+        Postcondiciones:
+        - Con el bloqueo exclusivo tomado, si otra terminal guardó cambios desde la versión vista, la cantidad
+          de cada cambio de stock se vuelve a calcular sumando su diferencia al stock guardado en disco. Un
+          cambio que así quedaría fuera del rango de 0 a 50 no se guarda (un pedido, completo).
+        - Los cambios se guardan como un solo lote. Si nadie más había guardado cambios, el catálogo queda
+          en la versión nueva; si no, el catálogo en memoria no se toca y el próximo refrescar() trae los
+          cambios de las otras terminales y las cantidades recalculadas.
+        - Devuelve los motivos de los cambios que no se guardaron.
+        '''
+        archivo = self.archivo if archivo is None else archivo
+        rechazados: List[str] = []
+        with persistencia.bloquear():
+            vigente = self._version() == self.version
+            if not vigente:
+                en_disco = {(fila[0], fila[1], fila[4]): int(fila[2])
+                            for fila in _leer(self.ruta, self.ruta_diario)[1:]}
+            with self.motor.lote():
+                for tipo, datos in cambios:
+                    if tipo == "precio":
+                        self.motor.guardar_precio(archivo, *datos)
+                        continue
+                    items = list(datos[0]) if tipo == "pedido" else [datos]
+                    if not vigente:
+                        items = [(marca, modelo, almacenamiento, diferencia,
+                                  en_disco.get((marca, modelo, almacenamiento), nueva - diferencia) + diferencia)
+                                 for marca, modelo, almacenamiento, diferencia, nueva in items]
+                        fuera = [f"{marca} {modelo} {almacenamiento}GB" for marca, modelo, almacenamiento, _, nueva in items
+                                 if not 0 <= nueva <= 50]
+                        if fuera:
+                            rechazados.append(f"El stock de {', '.join(fuera)} quedaría fuera del rango de 0 a 50.")
+                            continue
+                        for marca, modelo, almacenamiento, _, nueva in items:
+                            en_disco[(marca, modelo, almacenamiento)] = nueva
+                    if tipo == "pedido":
+                        self.motor.guardar_pedido(archivo, items)
+                    else:
+                        self.motor.guardar_stock(archivo, *items[0])
+            if vigente:
+                self.version = self._version()
+                self.desplazamiento_diario = self.version[2]
+        return rechazados
+
+
+def _leer(ruta: str, ruta_diario: Optional[str]) -> List[List[str]]:
+    # Lee el CSV y le aplica su diario, como persistencia.cargar() pero sin confirmar cambios pendientes.
+    return persistencia.aplicar_diario(persistencia.leer_csv(ruta), ruta_diario)
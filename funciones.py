@@ -1,8 +1,17 @@
-from typing import List, Dict, Tuple, Set
-
+from typing import List, Dict, Tuple, Iterable, Optional, Set
+from catalogo import Catalogo, Clave, clave_fila, validar_producto, ALMACENAMIENTOS_VALIDOS
+from carrito import Carrito, ErrorCarrito, validar_tarjeta
+from sucursales import Sucursales
+import motores
+import ventas
+import carga_paralela
+import instrumentacion
+
+@instrumentacion.medir
 def leer_archivo() -> List[List[str]]:
     '''
-    Lee el archivo CSV "stock_celulares.csv" y devuelve una lista de listas con los datos.
+    Lee el stock guardado con el motor de almacenamiento activo (por defecto, el archivo CSV
+    "stock_celulares.csv" con el diario de cambios aplicado) y devuelve una lista de listas con los datos.
 
     Precondiciones:
     - El archivo "stock_celulares.csv" debe existir en la ruta proporcionada, en este caso la carpeta.
@@ -13,9 +22,8 @@ def leer_archivo() -> List[List[str]]:
     
     '''
     try:
-        with open("stock_celulares.csv", "rt", encoding="utf-8-sig") as archivo:
-            return [lineas.strip().split(";") for lineas in archivo]
-        
+        return motores.abrir().cargar()
+
     except FileNotFoundError:
         print("El archivo no se encontró.")
         return []
@@ -24,7 +32,61 @@ def leer_archivo() -> List[List[str]]:
         print(f"Ocurrió un error: {e}")
         return []
 
+def abrir_catalogo(motor) -> Optional[Catalogo]:
+    '''
+    Carga el catálogo del motor de almacenamiento con el que trabaja el menú (ver motores.abrir_catalogo()).
+
+    Postcondiciones:
+    - Devuelve un catálogo compartido entre terminales.
+    - Si el archivo "stock_celulares.csv" no existe, imprime "El archivo no se encontró." y devuelve None.
+    - Si la base SQLite está vacía (por ejemplo, porque todavía no se importó el CSV), lo informa junto con
+      cómo importarlo y devuelve None.
+    '''
+    try:
+        catalogo = motores.abrir_catalogo(motor, compartido=True)
+    except FileNotFoundError:
+        print("El archivo no se encontró.")
+        return None
+    if not len(catalogo) and isinstance(motor, motores.MotorSQLite):
+        print(f"La base {motor.ruta} no tiene celulares. Para importar el stock del CSV ejecute: python motores.py csv sqlite")
+        return None
+    return catalogo
+
+_cache_archivo: Dict[str, object] = {"firma": None, "datos": []}
+
+@instrumentacion.medir
+def leer_archivo_cacheado() -> List[List[str]]:
+    '''
+    Devuelve los datos del stock ya parseados, volviendo a leerlos solo si cambió la versión guardada
+    por el motor de almacenamiento (para el CSV, la fecha de modificación y el tamaño del archivo y del diario).
+
+    Precondiciones:
+    - El archivo "stock_celulares.csv" debe existir en la carpeta.
+
+    Postcondiciones:
+    - Devuelve la misma lista de listas que leer_archivo().
+    - Con la instrumentación activa, cuenta un acierto ("cache_stock.aciertos") o un fallo
+      ("cache_stock.fallos"), que se muestran en el resumen al salir.
+    - Si el archivo no se encuentra, devuelve una lista vacía.
+    '''
+    motor = motores.abrir()
+    motor.confirmar()
+    firma = motor.version()
+
+    if firma == _cache_archivo["firma"]:
+        if instrumentacion.ACTIVA:
+            instrumentacion.contar("cache_stock.aciertos")
+        return _cache_archivo["datos"]
+
+    if instrumentacion.ACTIVA:
+        instrumentacion.contar("cache_stock.fallos")
+    datos = leer_archivo()
+    _cache_archivo["firma"] = firma if datos else None
+    _cache_archivo["datos"] = datos
+    return datos
+
 #opcion 1 inicio
+@instrumentacion.medir
 def lista_celulares() -> Dict[int, str]:
     '''
     Obtiene la lista de marcas de celulares que contiene el archivo "stock_celulares.csv".
@@ -37,7 +99,7 @@ def lista_celulares() -> Dict[int, str]:
     
     - Si el archivo no se encuentra o está vacío, devuelve una lista vacía.
     '''
-    archivo = leer_archivo()
+    archivo = leer_archivo_cacheado()
     
     if archivo:
         equipos = sorted(set(lineas[0] for lineas in archivo[1:]))
@@ -45,6 +107,7 @@ def lista_celulares() -> Dict[int, str]:
     else:
         return []
 
+@instrumentacion.medir
 def lista_almacenamiento() -> Dict[int, str]:
     '''
     Obtiene la lista de opciones de almacenamiento que contiene el archivo "stock_celulares.csv".
@@ -57,13 +120,14 @@ def lista_almacenamiento() -> Dict[int, str]:
     
     - Si el archivo no se encuentra o está vacío, devuelve una lista vacía.
     '''
-    archivo = leer_archivo()
+    archivo = leer_archivo_cacheado()
     if archivo:
         almacenamientos = sorted(set(lineas[4] for lineas in archivo[1:]))
         return {k: v for k, v in enumerate(almacenamientos)}
     else:
         return []
 
+@instrumentacion.medir
 def modelos_cel(elegido1: str, elegido2: str) -> List[List[str]]:
     '''
     Filtra los modelos de celulares según la marca y el almacenamiento especificados.
@@ -77,10 +141,14 @@ def modelos_cel(elegido1: str, elegido2: str) -> List[List[str]]:
 
     Postcondiciones:
     - Devuelve una lista de listas con los modelos de celulares que coinciden con la marca y el almacenamiento especificados.
+    - Filtra el stock cacheado (ver leer_archivo_cacheado()), que la opción 1 ya leyó para listar las
+      marcas y los almacenamientos, así que el archivo no se vuelve a leer.
     - Si el archivo no se encuentra o está vacío, devuelve una lista vacía.
     '''
-    archivo = leer_archivo()
+    archivo = leer_archivo_cacheado()
     if archivo:
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("modelos_cel", filas=len(archivo) - 1)
         return [elem for elem in archivo[1:] if elem[0] == elegido1 and elem[4] == elegido2]
     else:
         return []
@@ -97,7 +165,7 @@ def print_opcion1() -> None:
     '''
     modelos = lista_celulares()
     almacenamientos = lista_almacenamiento()
-    encabezado = leer_archivo()[0]
+    encabezado = leer_archivo_cacheado()[0]
     while True:
         try:
             if modelos and almacenamientos:
@@ -153,7 +221,7 @@ def pedir_validar_producto() -> List[str]:
                 precio = input("Ingrese un precio válido del celular (Solo números y mayor a 0): ")
 
             almacenamiento = input("Ingrese el almacenamiento del celular: ")
-            while almacenamiento not in ['64', '128', '256', '512', '1024']:
+            while almacenamiento not in ALMACENAMIENTOS_VALIDOS:
                 almacenamiento = input("Ingrese un almacenamiento válido (64, 128, 256, 512, 1024): ")
 
             anio_lanzamiento = input("Ingrese el año que se lanzó el modelo del celular: ")
@@ -169,41 +237,140 @@ def pedir_validar_producto() -> List[str]:
 
     return datos
 
-def agregar_datos() -> None:
+@instrumentacion.medir
+def importar_productos(ruta: str, catalogo: Catalogo, combinar: bool = False) -> Tuple[int, int, List[str]]:
+    '''
+    Importa en un solo lote los productos de un archivo con el formato de "stock_celulares.csv".
+
+    Precondiciones:
+    - El archivo debe existir. Puede tener o no la línea de encabezado.
+
+    Parámetros:
+    - ruta: Archivo a importar.
+    - catalogo: Catálogo en memoria; se actualiza con los productos importados.
+    - combinar: Si es True, un producto que ya existe suma su cantidad al stock actual y toma el precio
+      del archivo. Si es False, se informa como duplicado y no se importa.
+
+    Postcondiciones:
+    - Valida todo el lote antes de escribir. Los archivos grandes se parsean y validan en paralelo
+      (ver carga_paralela.validar_archivo()). Un producto repetido en el archivo se informa como error
+      solo si ya se aceptó una fila anterior con la misma clave. Los productos nuevos se guardan como
+      altas (ver persistencia.agregar_filas()) y, junto con los combinados, en una sola escritura.
+    - La comparación con el stock y la escritura se hacen juntas como un lote del catálogo (ver
+      Catalogo.en_lote()), así que con varias terminales se compara con el stock vigente.
+    - Devuelve la cantidad de productos agregados, la cantidad de productos combinados y la lista de errores por línea.
+      Si el motor rechaza alguno de los cambios, no se importa nada: devuelve 0, 0 y el motivo como único error.
+    '''
+    filas, errores_archivo = carga_paralela.validar_archivo(ruta, cantidad_minima=1, capitalizar=True,
+                                                            quitar_repetidos=False)
+
+    def importar() -> Tuple[int, int, List[Tuple[int, str]]]:
+        nuevos: List[List[str]] = []
+        combinados: List[Tuple[List[str], int]] = []
+        errores = list(errores_archivo)
+        aceptados: Set[Clave] = set()
+        for numero, fila in filas:
+            clave = (fila[0], fila[1], fila[4])
+            if clave in aceptados:
+                errores.append((numero, carga_paralela.REPETIDO))
+            elif clave not in catalogo:
+                nuevos.append(fila)
+                aceptados.add(clave)
+            elif not combinar:
+                errores.append((numero, "El producto ya existe en el stock."))
+            elif catalogo.cantidad(*clave) + int(fila[2]) > 50:
+                errores.append((numero, "La cantidad combinada supera 50."))
+            else:
+                combinados.append((fila, int(fila[2])))
+                aceptados.add(clave)
+
+        for fila in nuevos:
+            catalogo.agregar(fila)
+        catalogo.motor.agregar_filas(catalogo.archivo, nuevos)
+
+        for fila, cantidad in combinados:
+            marca, modelo, almacenamiento = fila[0], fila[1], fila[4]
+            nueva_cantidad = catalogo.modificar_cantidad(marca, modelo, almacenamiento, cantidad)
+            catalogo.motor.guardar_stock(catalogo.archivo, marca, modelo, almacenamiento, cantidad, nueva_cantidad)
+            if catalogo.precio(marca, modelo, almacenamiento) != int(fila[3]):
+                catalogo.fijar_precio(marca, modelo, almacenamiento, int(fila[3]))
+                catalogo.motor.guardar_precio(catalogo.archivo, marca, modelo, almacenamiento, int(fila[3]))
+        return len(nuevos), len(combinados), errores
+
+    try:
+        agregados, combinados, errores = catalogo.en_lote(importar)
+    except ValueError as error:
+        return 0, 0, [f"No se importó ningún producto: {error}"]
+    return agregados, combinados, carga_paralela.reporte(errores)
+
+def agregar_datos(catalogo: Catalogo) -> None:
     '''
-    Agrega nuevos datos de productos al archivo "stock_celulares.csv".
+    Agrega nuevos datos de productos al archivo "stock_celulares.csv", de a uno o importando un archivo.
 
     Postcondiciones:
-    - Agrega nuevos datos de productos al archivo "stock_celulares.csv".
+    - Agrega nuevos datos de productos al archivo "stock_celulares.csv" y al catálogo en memoria.
+    
+    - No agrega productos que ya existen (misma marca, modelo y almacenamiento).
     
     - Imprime un mensaje indicando que los datos se han agregado exitosamente.
     '''
-    datos = pedir_validar_producto()
-    with open("stock_celulares.csv", 'a', newline='') as archivo_csv:
-        for fila in datos:
-            fila_str = ';'.join(fila) + '\n'
-            archivo_csv.write(fila_str)
+    ruta = input("Ingrese la ruta de un archivo a importar (o Enter para cargar un solo producto): ").strip()
+    if ruta:
+        combinar = input("¿Sumar el stock de los productos que ya existen? (s/n): ").lower() == "s"
+        try:
+            agregados, combinados, errores = importar_productos(ruta, catalogo, combinar)
+        except OSError:
+            print("No se pudo leer el archivo.")
+            return
+        for error in errores:
+            print(error)
+        print(f"Productos agregados: {agregados}. Productos combinados: {combinados}. Errores: {len(errores)}.")
+        return
+
+    agregados = 0
+    for fila in pedir_validar_producto():
+        if catalogo.dar_de_alta(fila):
+            agregados += 1
+        else:
+            print(f"El celular {fila[0]} {fila[1]} de {fila[4]}GB ya existe. Use la opción 3 para modificar su stock.")
 
-    print("Datos agregados al archivo CSV.")
+    if agregados:
+        print("Datos agregados al stock.")
 #opcion 2 final
     
 #opcion 3 incio
-def obtener_conjuntos_unicos(archivo: List[List[str]]) -> Tuple[Set[str], Set[str], Set[str]]:
+def elegir_celular(catalogo: Catalogo) -> Optional[Tuple[str, str, str]]:
     '''
-    Obtiene conjuntos de datos únicos de marcas, modelos y almacenamientos presentes en el archivo "stock_celulares.csv".
-
-    Precondiciones:
-    - El archivo "stock_celulares.csv" debe existir y contener datos.
+    Pide la marca, el modelo y el almacenamiento de un celular del catálogo.
 
     Postcondiciones:
-    - Devuelve conjuntos únicos que representan marcas, modelos y almacenamientos presentes en el archivo.
+    - Si los datos coinciden con un celular, sin distinguir mayúsculas ni espacios de más, lo devuelve
+      directamente.
+    - Si no, muestra los modelos que empiezan con lo escrito o se le parecen (ver Catalogo.sugerir) y
+      devuelve la clave del que elija el usuario, o None si no hay candidatos o no elige ninguno.
     '''
-    marcas = set(elem[0] for elem in archivo[1:])
-    modelos = set(elem[1] for elem in archivo[1:])
-    almacenamientos = set(elem[4] for elem in archivo[1:])
-    return marcas, modelos, almacenamientos
+    marca_elegida = input("Ingrese la marca de celular: ").strip()
+    modelo_elegido = input("Ingrese el modelo de celular (o el comienzo del nombre): ")
+    almacenamiento_elegido = input("Ingrese el almacenamiento del celular (Enter para todos): ").strip()
+
+    clave = catalogo.resolver(marca_elegida, modelo_elegido, almacenamiento_elegido)
+    if clave is not None:
+        return clave
+
+    candidatos = catalogo.sugerir(marca_elegida, modelo_elegido, almacenamiento_elegido)
+    if not candidatos:
+        print("Los datos ingresados no existen en el archivo.")
+        return None
+
+    print("No hay un celular con esos datos exactos. Celulares parecidos:")
+    for num, celular in enumerate(candidatos, start=1):
+        print(f"{num} - {celular.marca} {celular.modelo.strip()} {celular.almacenamiento}GB")
+    numero = pedir_numero_opcional("Elija un número (Enter para cancelar): ")
+    if numero is None or not 1 <= numero <= len(candidatos):
+        return None
+    return clave_fila(candidatos[numero - 1])
 
-def opciones_stock(archivo: List[List[str]]) -> None:
+def opciones_stock(catalogo: Catalogo) -> None:
     '''
     Permite al usuario modificar el stock de un producto específico en el archivo "stock_celulares.csv".
 
@@ -215,21 +382,13 @@ def opciones_stock(archivo: List[List[str]]) -> None:
     
     - Imprime un mensaje indicando que el stock se ha modificado exitosamente.
     '''
-    marcas = set(elem[0] for elem in archivo[1:])
-    modelos = set(elem[1] for elem in archivo[1:])
-    almacenamientos = set(elem[4] for elem in archivo[1:])
-
-    marca_elegida = input("Ingrese la marca de celular: ").capitalize()
-    modelo_elegido = input("Ingrese el modelo de celular: ")
-    almacenamiento_elegido = input("Ingrese el almacenamiento del celular: ")
-
-    if marca_elegida not in marcas or modelo_elegido not in modelos or almacenamiento_elegido not in almacenamientos:
-        print("Los datos ingresados no existen en el archivo.")
+    clave = elegir_celular(catalogo)
+    if clave is None:
         return
 
-    modificar_stock(marca_elegida, modelo_elegido, almacenamiento_elegido, archivo)
+    modificar_stock(*clave, catalogo)
 
-def modificar_stock(marca: str, modelo: str, almacenamiento: str, archivo: List[List[str]]):
+def modificar_stock(marca: str, modelo: str, almacenamiento: str, catalogo: Catalogo):
     '''
     Modifica el stock de un producto específico en el archivo "stock_celulares.csv".
 
@@ -241,13 +400,11 @@ def modificar_stock(marca: str, modelo: str, almacenamiento: str, archivo: List[
     
     - Imprime un mensaje indicando que el stock se ha modificado exitosamente.
     '''
-    indice_fila = [i for i, elem in enumerate(archivo[1:]) if elem[0] == marca and elem[1] == modelo and elem[4] == almacenamiento]
-    if not indice_fila:
+    if catalogo.buscar(marca, modelo, almacenamiento) is None:
         print("No se encontró el celular con los datos proporcionados.")
         return
 
-    indice_fila = indice_fila[0] + 1
-    cantidad_actual = int(archivo[indice_fila][2])
+    cantidad_actual = catalogo.cantidad(marca, modelo, almacenamiento)
 
     print(f"La cantidad actual de {marca} {modelo} con almacenamiento {almacenamiento} es: {cantidad_actual}")
 
@@ -259,22 +416,22 @@ def modificar_stock(marca: str, modelo: str, almacenamiento: str, archivo: List[
 
         cantidad = int(input("Ingrese la cantidad a modificar: "))
 
-        if (opcion == '-' and cantidad > cantidad_actual) or (opcion == '+' and cantidad_actual + cantidad > 50):
+        try:
+            nueva_cantidad = catalogo.actualizar_stock(marca, modelo, almacenamiento, cantidad if opcion == '+' else -cantidad)
+        except ValueError as e:
+            # El motor SQLite rechaza el cambio si otra terminal dejó el stock fuera de rango mientras tanto.
+            print(e)
+            return
+        if nueva_cantidad is None:
             print("No se puede restar más de la cantidad actual o sumar más de 50.")
         else:
-            archivo[indice_fila][2] = str(cantidad_actual + cantidad if opcion == '+' else cantidad_actual - cantidad)
             break
 
-    with open("stock_celulares.csv", 'w') as archivo_csv:
-        for fila in archivo:
-            fila_str = ';'.join(fila) + '\n'
-            archivo_csv.write(fila_str)
-
     print("Stock modificado exitosamente.")
 #opcion 3 final
     
 #opcion 4 incio
-def opciones_precio(archivo: List[List[str]]) -> None:
+def opciones_precio(catalogo: Catalogo) -> None:
     '''
     Permite al usuario modificar el precio de un producto específico en el archivo "stock_celulares.csv".
 
@@ -286,20 +443,14 @@ def opciones_precio(archivo: List[List[str]]) -> None:
     
     - Imprime un mensaje indicando que el precio se ha modificado exitosamente.
     '''
-    marcas, modelos, almacenamientos = obtener_conjuntos_unicos(archivo)
-
-    marca_elegida = input("Ingrese la marca de celular: ").capitalize()
-    modelo_elegido = input("Ingrese el modelo de celular: ")
-    almacenamiento_elegido = input("Ingrese el almacenamiento del celular: ")
-
-    if marca_elegida not in marcas or modelo_elegido not in modelos or almacenamiento_elegido not in almacenamientos:
-        print("Los datos ingresados no existen en el archivo.")
+    clave = elegir_celular(catalogo)
+    if clave is None:
         return
 
-    modificar_precio(marca_elegida, modelo_elegido, almacenamiento_elegido, archivo)
+    modificar_precio(*clave, catalogo)
 
 
-def modificar_precio(marca: str, modelo: str, almacenamiento: str, archivo: List[List[str]]):
+def modificar_precio(marca: str, modelo: str, almacenamiento: str, catalogo: Catalogo):
     '''
     Modifica el precio de un producto específico en el archivo "stock_celulares.csv".
 
@@ -311,13 +462,11 @@ def modificar_precio(marca: str, modelo: str, almacenamiento: str, archivo: List
     
     - Imprime un mensaje indicando que el precio se ha modificado exitosamente.
     '''
-    indice_fila = [i for i, elem in enumerate(archivo[1:]) if elem[0] == marca and elem[1] == modelo and elem[4] == almacenamiento]
-    if not indice_fila:
+    if catalogo.buscar(marca, modelo, almacenamiento) is None:
         print("No se encontró el celular con los datos proporcionados.")
         return
 
-    indice_fila = indice_fila[0] + 1
-    precio_actual = int(archivo[indice_fila][3].strip())
+    precio_actual = catalogo.precio(marca, modelo, almacenamiento)
 
     print(f"El precio actual de {marca} {modelo} con almacenamiento {almacenamiento} es: ${precio_actual}")
 
@@ -327,21 +476,123 @@ def modificar_precio(marca: str, modelo: str, almacenamiento: str, archivo: List
             if nuevo_precio < 0 or nuevo_precio > 10000:
                 print("El precio debe estar entre 0 y 10000.")
             else:
-                archivo[indice_fila][3] = f"{nuevo_precio}"
+                catalogo.actualizar_precio(marca, modelo, almacenamiento, nuevo_precio)
                 break
         except ValueError:
             print("Ingrese un número válido.")
 
-    with open("stock_celulares.csv", 'w') as archivo_csv:
-        for fila in archivo:
-            fila_str = ';'.join(fila) + '\n'
-            archivo_csv.write(fila_str)
-
     print("Precio modificado exitosamente.")
 #opcion 4 final
 
+#actualizacion por lotes inicio
+@instrumentacion.medir
+def aplicar_lote(cambios: Iterable[List[str]], catalogo: Catalogo) -> Tuple[int, List[str]]:
+    '''
+    Aplica un lote de cambios de stock y de precio con una sola escritura.
+
+    Parámetros:
+    - cambios: Filas con marca, modelo, almacenamiento, tipo ("stock" o "precio") y valor. Para "stock" el valor
+      es la diferencia a sumar (por ejemplo "+5" o "-3") y para "precio" es el nuevo precio.
+    - catalogo: Catálogo en memoria sobre el que se aplican los cambios.
+
+    Postcondiciones:
+    - Valida cada cambio con los mismos límites que las opciones 3 y 4: el stock resultante debe quedar entre 0 y 50
+      (teniendo en cuenta los cambios anteriores del mismo lote) y el precio entre 0 y 10000.
+    - Aplica los cambios válidos y los guarda como un único grupo de cambios.
+    - La validación y la escritura se hacen juntas como un lote del catálogo (ver Catalogo.en_lote()), así
+      que con varias terminales los límites se comprueban sobre el stock vigente.
+    - Devuelve la cantidad de cambios aplicados y la lista de errores, indicando el número de línea.
+      Las líneas vacías se saltean.
+    - Si el motor rechaza alguno de los cambios (por ejemplo, la base SQLite porque otra terminal dejó el stock
+      fuera de rango), no se guarda ninguno: devuelve 0 y el motivo como único error.
+    '''
+    cambios = list(cambios)
+
+    def aplicar() -> Tuple[int, List[str]]:
+        validos: List[Tuple[str, str, str, str, int]] = []
+        errores: List[str] = []
+        stock_lote: Dict[Tuple[str, str, str], int] = {}
+
+        for numero, cambio in enumerate(cambios, start=1):
+            if cambio == [""]:
+                continue
+            if len(cambio) != 5:
+                errores.append(f"Línea {numero}: Se esperaban 5 campos y hay {len(cambio)}.")
+                continue
+            marca, modelo, almacenamiento, tipo, valor = cambio
+            clave = (marca.capitalize(), modelo, almacenamiento)
+            tipo = tipo.strip().lower()
+            if clave not in catalogo:
+                errores.append(f"Línea {numero}: No se encontró el celular {' '.join(clave)}.")
+                continue
+            try:
+                valor = int(valor.strip())
+            except ValueError:
+                errores.append(f"Línea {numero}: El valor debe ser un número entero.")
+                continue
+
+            if tipo == "stock":
+                cantidad = stock_lote.get(clave, catalogo.cantidad(*clave)) + valor
+                if cantidad < 0 or cantidad > 50:
+                    errores.append(f"Línea {numero}: El stock quedaría en {cantidad}; debe estar entre 0 y 50.")
+                    continue
+                stock_lote[clave] = cantidad
+            elif tipo == "precio":
+                if valor < 0 or valor > 10000:
+                    errores.append(f"Línea {numero}: El precio debe estar entre 0 y 10000.")
+                    continue
+            else:
+                errores.append(f"Línea {numero}: El tipo de cambio debe ser \"stock\" o \"precio\".")
+                continue
+            validos.append(clave + (tipo, valor))
+
+        for marca, modelo, almacenamiento, tipo, valor in validos:
+            if tipo == "stock":
+                nueva_cantidad = catalogo.modificar_cantidad(marca, modelo, almacenamiento, valor)
+                catalogo.motor.guardar_stock(catalogo.archivo, marca, modelo, almacenamiento, valor, nueva_cantidad)
+            else:
+                catalogo.fijar_precio(marca, modelo, almacenamiento, valor)
+                catalogo.motor.guardar_precio(catalogo.archivo, marca, modelo, almacenamiento, valor)
+        return len(validos), errores
+
+    try:
+        return catalogo.en_lote(aplicar)
+    except ValueError as error:
+        return 0, [f"No se aplicó ningún cambio del lote: {error}"]
+
+def aplicar_lote_archivo(ruta: str, catalogo: Catalogo) -> Tuple[int, List[str]]:
+    '''
+    Aplica el lote de cambios guardado en un archivo separado por ";" (una línea por cambio, ver aplicar_lote()).
+
+    Precondiciones:
+    - El archivo debe existir.
+
+    Postcondiciones:
+    - Devuelve la cantidad de cambios aplicados y la lista de errores por línea.
+    '''
+    with open(ruta, "rt", encoding="utf-8-sig") as archivo:
+        return aplicar_lote([linea.rstrip("\r\n").split(";") for linea in archivo], catalogo)
+
+def actualizar_por_lotes(catalogo: Catalogo) -> None:
+    '''
+    Opción 11: aplica los cambios de stock y de precio de un archivo (ver aplicar_lote_archivo()).
+
+    Postcondiciones:
+    - Imprime los errores por línea y la cantidad de cambios aplicados.
+    '''
+    ruta = input("Ingrese la ruta del archivo de cambios (marca;modelo;almacenamiento;stock o precio;valor): ").strip()
+    try:
+        aplicados, errores = aplicar_lote_archivo(ruta, catalogo)
+    except OSError:
+        print("No se pudo leer el archivo.")
+        return
+    for error in errores:
+        print(error)
+    print(f"Cambios aplicados: {aplicados}. Errores: {len(errores)}.")
+#actualizacion por lotes final
+
 #opcion 5 incio
-def presupuesto(archivo: List[List[str]]) -> None:
+def presupuesto(catalogo: Catalogo) -> None:
     '''
     Imprime la lista de celulares disponibles de una marca específica dentro del presupuesto del usuario.
 
@@ -351,8 +602,6 @@ def presupuesto(archivo: List[List[str]]) -> None:
     Postcondiciones:
     - Imprime la lista de celulares disponibles de una marca específica dentro del presupuesto del usuario.
     '''
-    precios = set(int(elem[3].strip()) for elem in archivo[1:])
-
     while True:
         try:
             presupuesto_usuario = int(input("Ingrese su presupuesto: "))
@@ -366,31 +615,103 @@ def presupuesto(archivo: List[List[str]]) -> None:
     marca_elegida = input("Ingrese la marca de celular que busca: ")
 
     print(f"Celulares disponibles de la marca {marca_elegida} dentro del presupuesto de ${presupuesto_usuario}:")
-    for precio in range(presupuesto_usuario, -1, -1):
-        if precio in precios:
-            celulares = [elem for elem in archivo[1:] if int(elem[3].strip()) == precio and elem[0].lower() == marca_elegida.lower()]
-            for celular in celulares:
-                print(f"Marca: {celular[0]}, Modelo: {celular[1]}, Precio: {celular[3]}")
+    for celular in catalogo.buscar_por_precio(marca_elegida, maximo=presupuesto_usuario, descendente=True):
+        print(f"Marca: {celular.marca}, Modelo: {celular.modelo}, Precio: {celular.precio}")
 #opcion 5 final
 
 #opcion 6 incio
-def compra(archivo: List[List[str]]) -> None:
+def compra(catalogo: Catalogo) -> None:
     '''
-    Realiza la compra de un celular según la elección del usuario y actualiza el stock en el archivo "stock_celulares.csv".
+    Vende uno o varios celulares en un solo pedido y actualiza el stock en el archivo "stock_celulares.csv".
 
     Precondiciones:
     - El archivo "stock_celulares.csv" debe existir y contener datos.
 
     Postcondiciones:
-    - Realiza la compra de un celular según la elección del usuario.
+    - Arma un carrito con los celulares y cantidades que elija el usuario, verificando el stock de cada uno.
+      Antes de cobrar se puede quitar del carrito un celular agregado.
     
-    - Actualiza el stock en el archivo "stock_celulares.csv".
+    - Cobra el total una sola vez, en efectivo o con tarjeta, y vende todo el pedido con una sola escritura.
+    
+    - Si mientras tanto otra terminal se quedó con el stock de algún celular, no se vende nada y se anula el pago.
     '''
-    if not archivo:
+    if not catalogo:
         print("No se encontró el archivo.")
         return
+
+    carrito = Carrito(catalogo)
+    opcion = "s"
+    while opcion in ("s", "q"):
+        if opcion == "s":
+            clave = elegir_celular_compra(catalogo)
+            if clave is not None:
+                cantidad = pedir_cantidad_compra()
+                try:
+                    carrito.agregar(*clave, cantidad)
+                except ErrorCarrito as e:
+                    print(e)
+        else:
+            quitar_del_carrito(carrito)
+        imprimir_carrito(carrito)
+        opcion = input("¿Desea agregar otro celular (s), quitar uno del carrito (q) o terminar (n)?: ").lower()
+
+    if not carrito:
+        print("El carrito está vacío.")
+        return
+    faltantes = carrito.faltantes()
+    if faltantes:
+        for (marca, modelo, almacenamiento), cantidad, disponible in faltantes:
+            print(f"Ya no hay stock suficiente de {marca} {modelo} {almacenamiento}GB: pidió {cantidad} y hay {disponible}.")
+        print("No se realizó la compra.")
+        return
+
+    cobrar_pedido(carrito)
+
+def cobrar_pedido(carrito: Carrito) -> bool:
+    '''
+    Cobra el total del carrito una sola vez, en efectivo o con tarjeta, y vende todo el pedido.
+
+    Postcondiciones:
+    - Si el pedido se vendió, imprime el cambio y la factura y devuelve True.
+    
+    - Si la opción de pago no es válida o ya no hay stock de algún celular, no se vende nada y devuelve False.
+    '''
+    lineas = carrito.lineas()
+    total = carrito.total()
+    efectivo_o_tarjeta = input("Elige una opción de pago (Efectivo/Tarjeta): ").lower()
+    if efectivo_o_tarjeta == "efectivo":
+        cambio = efectivo(total)
+    elif efectivo_o_tarjeta == "tarjeta":
+        tarjeta(total)
+        cambio = 0.0
+    else:
+        print("Opción de pago no válida.")
+        return False
+
+    try:
+        carrito.confirmar(efectivo_o_tarjeta)
+    except ErrorCarrito as e:
+        print(e)
+        print("El pedido se anuló y se devuelve el pago.")
+        return False
+    if efectivo_o_tarjeta == "efectivo":
+        print(f"Su cambio es de ${cambio}")
+    print("Factura:")
+    for (marca, modelo, almacenamiento), cantidad, precio in lineas:
+        print(f"{cantidad} x {marca} {modelo} {almacenamiento}GB - ${precio} c/u - Subtotal: ${cantidad * precio}")
+    print(f"Total: ${total}")
+    return True
+
+def elegir_celular_compra(catalogo: Catalogo) -> Optional[Tuple[str, str, str]]:
+    '''
+    Pide la marca, el almacenamiento y el modelo de un celular eligiéndolos de listas numeradas.
+
+    Postcondiciones:
+    - Devuelve la clave (marca, modelo, almacenamiento) del celular elegido, o None si no hay modelos
+      de esa marca con ese almacenamiento.
+    '''
+    archivo = catalogo.archivo
     marcas = sorted(set(linea[0] for linea in archivo[1:]))
-    modelos = sorted(set(linea[1] for linea in archivo[1:]))
     almacenamientos = sorted(set(linea[4] for linea in archivo[1:]))
 
     print("Marcas disponibles:")
@@ -423,99 +744,99 @@ def compra(archivo: List[List[str]]) -> None:
         except ValueError:
             print("Ingrese un número.")
 
+    modelos_disponibles = [linea for linea in archivo[1:] if linea[0] == marca_elegida and linea[4] == almacenamiento_elegido]
+    if not modelos_disponibles:
+        print("No hay modelos disponibles.")
+        return None
     print(f"\nModelos disponibles de {marca_elegida} con {almacenamiento_elegido}GB:")
-    modelos_disponibles = [linea[1] for linea in archivo[1:] if linea[0] == marca_elegida and linea[4] == almacenamiento_elegido]
-    for num, modelo in enumerate(modelos_disponibles, start=1):
-        print(f"{num}. {modelo}")
+    for num, linea in enumerate(modelos_disponibles, start=1):
+        print(f"{num}. {linea[1]} (stock: {linea[2]})")
 
     while True:
         try:
             modelo_num = int(input("Ingrese el número del modelo: "))
             if 1 <= modelo_num <= len(modelos_disponibles):
-                modelo_elegido = modelos_disponibles[modelo_num - 1]
-                break
+                return clave_fila(modelos_disponibles[modelo_num - 1])
             else:
                 print("Ingrese un número válido.")
         except ValueError:
             print("Ingrese un número.")
 
-    efectivo_o_tarjeta = input("Elige una opción de pago (Efectivo/Tarjeta): ").lower()
+def pedir_cantidad_compra() -> int:
+    '''
+    Pide cuántas unidades del celular elegido se quieren comprar.
 
-    if efectivo_o_tarjeta == "efectivo":
-        for linea in archivo[1:]:
-            if linea[0] == marca_elegida and linea[1] == modelo_elegido and linea[4] == almacenamiento_elegido:
-                precio = float(linea[3].strip('$'))
-                efectivo(marca_elegida, modelo_elegido, almacenamiento_elegido, precio)
-                # Actualizar el stock
-                for l in archivo[1:]:
-                    if l[0] == marca_elegida and l[1] == modelo_elegido and l[4] == almacenamiento_elegido:
-                        l[2] = str(int(l[2]) - 1)
-                with open("stock_celulares.csv", 'w') as file:
-                    for line in archivo:
-                        file.write(';'.join(line) + '\n')
-                break
-    elif efectivo_o_tarjeta == "tarjeta":
-        for linea in archivo[1:]:
-            if linea[0] == marca_elegida and linea[1] == modelo_elegido and linea[4] == almacenamiento_elegido:
-                precio = float(linea[3].strip('$'))
-                tarjeta(marca_elegida, modelo_elegido, almacenamiento_elegido, precio)
-                # Actualizar el stock
-                for l in archivo[1:]:
-                    if l[0] == marca_elegida and l[1] == modelo_elegido and l[4] == almacenamiento_elegido:
-                        l[2] = str(int(l[2]) - 1)
-                with open("stock_celulares.csv", 'w') as file:
-                    for line in archivo:
-                        file.write(';'.join(line) + '\n')
-                break
-    else:
-        print("Opción de pago no válida.")
-        
-        
-def efectivo(marca: str, modelo: str, almacenamiento: str, precio: float) -> None:
+    Postcondiciones:
+    - Devuelve un número entero mayor que 0.
     '''
-    Realiza una transacción en efectivo para la compra de un celular.
+    while True:
+        try:
+            cantidad = int(input("Ingrese la cantidad de unidades: "))
+            if cantidad > 0:
+                return cantidad
+            print("La cantidad debe ser mayor que 0.")
+        except ValueError:
+            print("Ingrese un número.")
+
+def imprimir_carrito(carrito: Carrito) -> None:
+    '''
+    Imprime el contenido del carrito y el total.
+    '''
+    print("\nCarrito:")
+    for (marca, modelo, almacenamiento), cantidad, precio in carrito.lineas():
+        print(f"{cantidad} x {marca} {modelo} {almacenamiento}GB - ${precio} c/u")
+    print(f"Total: ${carrito.total()} ({len(carrito)} unidades)\n")
+
+def quitar_del_carrito(carrito: Carrito) -> None:
+    '''
+    Muestra los celulares del carrito numerados y saca todas las unidades del que elija el usuario.
+    '''
+    lineas = carrito.lineas()
+    if not lineas:
+        print("El carrito está vacío.")
+        return
+    for num, ((marca, modelo, almacenamiento), cantidad, _) in enumerate(lineas, start=1):
+        print(f"{num} - {cantidad} x {marca} {modelo} {almacenamiento}GB")
+    numero = pedir_numero_opcional("Elija el número del celular a quitar (Enter para cancelar): ")
+    if numero is None or not 1 <= numero <= len(lineas):
+        return
+    carrito.quitar(lineas[numero - 1][0])
+
+def efectivo(total: float) -> float:
+    '''
+    Cobra en efectivo el total de un pedido.
 
     Precondiciones:
-    - La marca, el modelo y el almacenamiento deben ser cadenas no vacías.
-    
-    - El precio debe ser un número positivo mayor que 0.
+    - El total debe ser un número positivo mayor que 0.
 
     Postcondiciones:
-    - Imprime información sobre el celular y realiza una transacción en efectivo.
+    - Pide el monto con el que se paga hasta que alcance para el total.
     
-    - Imprime la factura con los detalles de la compra.
+    - Devuelve el cambio a entregar.
     '''
-    print(f"El celular {marca} {modelo} de {almacenamiento}GB cuesta ${precio}")
+    print(f"El total del pedido es ${total}")
 
     while True:
         try:
             monto_pagado = float(input("Ingrese con cuánto va a pagar: $"))
-            if monto_pagado >= precio:
-                cambio = monto_pagado - precio
-                print(f"Su cambio es de ${cambio}")
-                print("Factura:")
-                print(f"Marca: {marca}\nModelo: {modelo}\nAlmacenamiento: {almacenamiento}\nPrecio: ${precio}")
-                break
+            if monto_pagado >= total:
+                return monto_pagado - total
             else:
                 print("El monto ingresado es insuficiente.")
         except ValueError:
             print("Ingrese un monto válido.")
             
-def tarjeta(marca: str, modelo: str, almacenamiento: str, precio: float) -> None:
+def tarjeta(total: float) -> None:
     '''
-        Realiza una transacción con tarjeta Visa para la compra de un celular.
+    Cobra con tarjeta Visa el total de un pedido.
 
     Precondiciones:
-    - La marca, el modelo y el almacenamiento deben ser cadenas no vacías.
-    
-    - El precio debe ser un número positivo mayor que 0.
+    - El total debe ser un número positivo mayor que 0.
 
     Postcondiciones:
-    - Realiza una transacción con tarjeta Visa.
-    
-    - Imprime la factura con los detalles de la compra.
+    - Pide los datos de la tarjeta hasta que sean válidos.
     '''
-    print("Procesando pago con tarjeta...")
+    print(f"Procesando pago con tarjeta por ${total}...")
 
     while True:
         try:
@@ -523,10 +844,8 @@ def tarjeta(marca: str, modelo: str, almacenamiento: str, precio: float) -> None
             codigo_seguridad = input("Ingrese el código de seguridad (3 dígitos): ")
             dni = int(input("Ingrese su DNI: "))
             
-            if len(numero_tarjeta) == 16 and codigo_seguridad.isdigit() and len(codigo_seguridad) == 3 and 10000000 <= dni <= 47000000:
+            if validar_tarjeta(numero_tarjeta, codigo_seguridad, dni):
                 print("Pago con tarjeta exitoso.")
-                print("Factura:")
-                print(f"Marca: {marca}\nModelo: {modelo}\nAlmacenamiento: {almacenamiento}\nPrecio: ${precio}")
                 break
             else:
                 print("Datos de tarjeta o DNI inválidos.")
@@ -534,6 +853,163 @@ def tarjeta(marca: str, modelo: str, almacenamiento: str, precio: float) -> None
             print("Ingrese un DNI válido.")
 
 #opcion 6 final           
+
+#opcion 7 inicio
+def pedir_numero_opcional(mensaje: str) -> Optional[int]:
+    '''
+    Pide un número entero que se puede dejar vacío.
+
+    Postcondiciones:
+    - Devuelve el número ingresado o None si el usuario presiona Enter.
+    '''
+    while True:
+        valor = input(mensaje).strip().strip("$")
+        if not valor:
+            return None
+        try:
+            return int(valor)
+        except ValueError:
+            print("Ingrese un número válido o Enter para no filtrar.")
+
+def busqueda_avanzada(catalogo: Catalogo) -> None:
+    '''
+    Imprime los celulares que cumplen los filtros que elija el usuario: marca, almacenamiento, rango de
+    años, rango de precios y solo con stock. Los filtros que se dejan vacíos no se aplican.
+    '''
+    marca = input("Marca (Enter para todas): ").strip() or None
+    almacenamiento = pedir_numero_opcional("Almacenamiento (Enter para todos): ")
+    anio_desde = pedir_numero_opcional("Año de lanzamiento desde (Enter para no filtrar): ")
+    anio_hasta = pedir_numero_opcional("Año de lanzamiento hasta (Enter para no filtrar): ")
+    precio_minimo = pedir_numero_opcional("Precio mínimo (Enter para no filtrar): ")
+    precio_maximo = pedir_numero_opcional("Precio máximo (Enter para no filtrar): ")
+    con_stock = input("¿Solo celulares con stock? (s/n): ").lower() == "s"
+
+    resultados = catalogo.consultar(marca, almacenamiento, anio_desde, anio_hasta, precio_minimo, precio_maximo, con_stock)
+    if not resultados:
+        print("No hay modelos disponibles.")
+        return
+    print(f"\nResultados ({len(resultados)}):")
+    print(" | ".join(catalogo.encabezado))
+    for celular in resultados:
+        print(" | ".join(celular))
+#opcion 7 final
+
+#opcion 8 inicio
+def reporte_inventario(catalogo: Catalogo) -> None:
+    '''
+    Imprime las unidades en stock y el valor del inventario, en total y por marca, almacenamiento y año.
+    Los totales se mantienen al día en el catálogo, así que no se recorren las filas.
+    '''
+    resumen = catalogo.resumen_inventario()
+    print(f"Unidades en stock: {resumen['unidades']} | Valor del inventario: ${resumen['valor']}")
+    for faceta, titulo in (("marca", "Marca"), ("almacenamiento", "Almacenamiento"), ("anio", "Año")):
+        print(f"\n{titulo:<16}{'Unidades':>10}{'Valor':>14}")
+        for clave, (unidades, valor) in resumen[faceta].items():
+            nombre = clave.capitalize() if faceta == "marca" else str(clave)
+            print(f"{nombre:<16}{unidades:>10}{'$' + str(valor):>14}")
+#opcion 8 final
+
+#opcion 9 inicio
+def reporte_ventas() -> None:
+    '''
+    Imprime las unidades vendidas y los ingresos de un rango de días, agrupados por día, marca o modelo.
+    Solo se leen del libro de ventas los días pedidos.
+    '''
+    desde = input("Desde el día (AAAA-MM-DD, Enter para hoy): ").strip() or ventas.hoy()
+    hasta = input(f"Hasta el día (AAAA-MM-DD, Enter para {desde}): ").strip() or desde
+    agrupaciones = {"1": ("dia",), "2": ("marca",), "3": ("marca", "modelo"), "4": ("dia", "marca")}
+    opcion = input("Agrupar por: 1-Día | 2-Marca | 3-Modelo | 4-Día y marca (Enter para día): ").strip() or "1"
+    por = agrupaciones.get(opcion, ("dia",))
+
+    filas = ventas.abrir().totales(desde, hasta, por)
+    if not filas:
+        print("No hay ventas en ese período.")
+        return
+    for fila in filas:
+        grupo = " ".join(str(fila[campo]) for campo in por)
+        print(f"{grupo:<32}{fila['unidades']:>8} unidades{'$' + str(fila['ingresos']):>14}")
+    print(f"{'Total':<32}{sum(f['unidades'] for f in filas):>8} unidades{'$' + str(sum(f['ingresos'] for f in filas)):>14}")
+#opcion 9 final
+
+#opcion 10 inicio
+def opciones_sucursales(red: Sucursales) -> None:
+    '''
+    Consultas y compras sobre el stock de todas las sucursales (ver sucursales).
+
+    Precondiciones:
+    - La carpeta de sucursales debe tener un archivo de stock por sucursal.
+
+    Postcondiciones:
+    - Ejecuta la consulta elegida. El stock de cada sucursal se carga la primera vez que se necesita.
+    '''
+    if not red:
+        print(f"No hay sucursales: agregue un archivo de stock por sucursal en la carpeta \"{red.carpeta}\".")
+        return
+    print("Sucursales: " + ", ".join(sucursal.nombre for sucursal in red))
+    opcion = input("1-Celulares por marca y almacenamiento | 2-Celulares por presupuesto | "
+                   "3-Stock de un celular por sucursal | 4-Compra desde la sucursal con stock: ").strip()
+
+    if opcion == "1":
+        marca = input("Ingrese la marca de celular: ").strip()
+        almacenamiento = pedir_numero_opcional("Ingrese el almacenamiento (Enter para todos): ")
+        resultados = red.modelos(marca, almacenamiento)
+        if not resultados:
+            print("No hay modelos disponibles.")
+        for (marca, modelo, almacenamiento), total, precio, stock in resultados:
+            detalle = ", ".join(f"{nombre}: {unidades}" for nombre, unidades in stock.items())
+            print(f"{marca} {modelo} {almacenamiento}GB | Stock total: {total} | Desde ${precio} | {detalle}")
+    elif opcion == "2":
+        marca = input("Ingrese la marca de celular que busca: ").strip()
+        maximo = pedir_numero_opcional("Ingrese su presupuesto: ")
+        if maximo is None or maximo <= 0:
+            print("El presupuesto debe ser mayor que 0.")
+            return
+        for nombre, celular in red.presupuesto(marca, maximo):
+            print(f"Sucursal: {nombre}, Marca: {celular.marca}, Modelo: {celular.modelo}, "
+                  f"Almacenamiento: {celular.almacenamiento}GB, Precio: {celular.precio}, Stock: {celular.cantidad}")
+    elif opcion == "3":
+        disponible = red.disponibilidad(input("Ingrese la marca de celular: "), input("Ingrese el modelo de celular: "),
+                                        input("Ingrese el almacenamiento del celular: "))
+        if not disponible:
+            print("Ninguna sucursal tiene ese celular.")
+            return
+        for nombre, unidades in disponible.items():
+            print(f"{nombre}: {unidades}")
+        print(f"Total: {sum(disponible.values())}")
+    elif opcion == "4":
+        compra_sucursal(red)
+    else:
+        print("Opción no válida.")
+
+def compra_sucursal(red: Sucursales) -> None:
+    '''
+    Vende un celular desde la sucursal que tenga stock, prefiriendo la que indique el usuario.
+
+    Postcondiciones:
+    - Si ninguna sucursal tiene la cantidad pedida, no se vende nada.
+    
+    - Si no, se cobra y se descuenta el stock de la sucursal elegida (ver Sucursales.elegir()).
+    '''
+    marca = input("Ingrese la marca de celular: ").strip()
+    modelo = input("Ingrese el modelo de celular: ")
+    almacenamiento = input("Ingrese el almacenamiento del celular: ").strip()
+    cantidad = pedir_cantidad_compra()
+    preferida = input("Sucursal preferida (Enter para cualquiera): ").strip() or None
+
+    sucursal = red.elegir(marca, modelo, almacenamiento, cantidad, preferida)
+    if sucursal is None:
+        print(f"Ninguna sucursal tiene {cantidad} unidades de ese celular.")
+        return
+    if preferida is not None and sucursal.nombre != preferida:
+        print(f"La sucursal {preferida} no tiene stock suficiente.")
+    print(f"Se vende desde la sucursal {sucursal.nombre}.")
+
+    carrito = Carrito(sucursal.catalogo)
+    carrito.agregar(marca, modelo, almacenamiento, cantidad)
+    imprimir_carrito(carrito)
+    cobrar_pedido(carrito)
+#opcion 10 final
+
 def menu()-> None:
    print(
        "--MENU--\n"
@@ -542,7 +1018,12 @@ def menu()-> None:
        "3-Modificacion de stock\n"
        "4-Modificacion de precio\n"
        "5-Celulares por presupuesto de usuario\n"
-       "6-Compra de celular\n"
+       "6-Compra de celulares\n"
+       "7-Busqueda avanzada\n"
+       "8-Resumen de inventario\n"
+       "9-Reporte de ventas\n"
+       "10-Sucursales\n"
+       "11-Actualizacion por lotes desde un archivo\n"
        "0-Salir\n"
        )
 
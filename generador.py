@@ -0,0 +1,90 @@
+import argparse
+import random
+from typing import List, Tuple
+
+ENCABEZADO = ["Marca", "Modelo", "Cantidad", "Precio", "Almacenamiento", "Anio_de_lanzamiento"]
+
+# Marcas con su peso relativo en el catálogo y los nombres de sus líneas de modelos.
+MARCAS: List[Tuple[str, int, List[str]]] = [
+    ("Samsung", 30, ["Galaxy S", "Galaxy A", "Galaxy Z Fold", "Galaxy Z Flip", "Galaxy M"]),
+    ("Iphone", 25, ["", "Mini ", "Plus ", "Pro ", "Pro Max "]),
+    ("Xiaomi", 20, ["", "Lite ", "Pro ", "Redmi Note ", "Poco X"]),
+    ("Motorola", 10, ["Moto G", "Moto E", "Edge ", "Razr "]),
+    ("Oppo", 5, ["Reno ", "Find X", "A"]),
+    ("Realme", 5, ["GT ", "C", "Narzo "]),
+    ("Nokia", 3, ["G", "X", "C"]),
+    ("Huawei", 2, ["P", "Mate ", "Nova "]),
+]
+
+# Almacenamientos válidos con su peso relativo y el factor que aplican sobre el precio base.
+ALMACENAMIENTOS: List[Tuple[str, int, float]] = [
+    ("64", 15, 0.8), ("128", 35, 1.0), ("256", 30, 1.2), ("512", 15, 1.5), ("1024", 5, 2.0),
+]
+
+
+def generar_filas(cantidad: int, semilla: int = 0):
+    '''
+    Genera filas sintéticas con el formato de "stock_celulares.csv", sin repetir (marca, modelo, almacenamiento).
+
+    Parámetros:
+    - cantidad: Cantidad de filas a generar.
+    - semilla: Semilla del generador aleatorio, para poder repetir un catálogo.
+
+    Postcondiciones:
+    - Devuelve un generador de filas (listas de cadenas) que cumplen las reglas de pedir_validar_producto():
+      cantidad entre 0 y 50, precio entre 50 y 10000, almacenamiento válido y año entre 1983 y 2024.
+    - Los precios dependen de la marca, el año y el almacenamiento, para que los rangos sean realistas.
+    '''
+    azar = random.Random(semilla)
+    marcas = [marca for marca, _, _ in MARCAS]
+    pesos_marcas = [peso for _, peso, _ in MARCAS]
+    lineas = {marca: series for marca, _, series in MARCAS}
+    base_marca = {marca: 250 + 60 * peso for marca, peso, _ in MARCAS}
+    contador = {marca: 0 for marca in marcas}
+
+    generadas = 0
+    while generadas < cantidad:
+        marca = azar.choices(marcas, pesos_marcas)[0]
+        contador[marca] += 1
+        numero = contador[marca]
+        serie = lineas[marca][numero % len(lineas[marca])]
+        modelo = f"{serie}{numero}"
+        anio = azar.choices(range(2010, 2025), weights=range(1, 16))[0]
+
+        # Cada modelo sale en una o más variantes de almacenamiento.
+        variantes = azar.sample(ALMACENAMIENTOS, azar.randint(1, 3))
+        for almacenamiento, _, factor in sorted(variantes, key=lambda v: int(v[0])):
+            if generadas == cantidad:
+                break
+            precio = base_marca[marca] * factor * (1 + (anio - 2010) / 10) * azar.uniform(0.7, 1.3)
+            stock = 0 if azar.random() < 0.1 else azar.randint(1, 50)
+            yield [marca, modelo, str(stock), str(min(max(int(precio), 50), 10000)), almacenamiento, str(anio)]
+            generadas += 1
+
+
+def generar_catalogo(ruta: str, cantidad: int, semilla: int = 0) -> None:
+    '''
+    Escribe un catálogo sintético en un archivo CSV con el formato de "stock_celulares.csv".
+
+    Postcondiciones:
+    - El archivo tiene el encabezado y "cantidad" filas. Se escribe de a bloques, sin tener todo el
+      catálogo en memoria, así que sirve para tamaños de hasta 10^7 filas.
+    '''
+    with open(ruta, "w", encoding="utf-8", buffering=1 << 20) as archivo:
+        archivo.write(";".join(ENCABEZADO) + "\n")
+        bloque = []
+        for fila in generar_filas(cantidad, semilla):
+            bloque.append(";".join(fila) + "\n")
+            if len(bloque) == 10000:
+                archivo.writelines(bloque)
+                bloque = []
+        archivo.writelines(bloque)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético de celulares.")
+    parser.add_argument("ruta")
+    parser.add_argument("filas", type=int)
+    parser.add_argument("--semilla", type=int, default=0)
+    argumentos = parser.parse_args()
+    generar_catalogo(argumentos.ruta, argumentos.filas, argumentos.semilla)
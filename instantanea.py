@@ -0,0 +1,286 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import List, Dict, Optional, Iterator
+
+import persistencia
+from catalogo import Celular
+
+RUTA_INSTANTANEA = "stock_celulares.bin"
+
+# Encabezado: firma, versión, cantidad de filas, cantidad de cadenas y cantidad de columnas del encabezado del CSV.
+_FIRMA = b"CELU"
+_VERSION = 1
+_ENCABEZADO = struct.Struct("<4sI3I")
+_COLUMNAS = ("marca", "modelo", "cantidad", "precio", "almacenamiento", "anio")
+
+
+def exportar(archivo: List[List[str]], ruta: str = RUTA_INSTANTANEA) -> None:
+    '''
+    Guarda el catálogo en el formato binario de instantánea.
+
+    Precondiciones:
+    - archivo debe tener el formato devuelto por leer_archivo() (encabezado y filas), o filas Celular.
+
+    Postcondiciones:
+    - Escribe un archivo con columnas numéricas de ancho fijo (enteros de 32 bits, little-endian) y una
+      tabla de cadenas para las marcas, los modelos y el encabezado.
+    - La escritura es atómica: se escribe un temporal en la misma carpeta y después se reemplaza el
+      archivo (como en persistencia.escribir_archivo()). Si falla, el temporal se borra.
+    '''
+    encabezado = archivo[0] if archivo else []
+    cadenas: List[str] = list(encabezado)
+    ids: Dict[str, int] = {}
+    columnas = [array("i") for _ in _COLUMNAS]
+
+    def id_cadena(cadena: str) -> int:
+        if cadena not in ids:
+            ids[cadena] = len(cadenas)
+            cadenas.append(cadena)
+        return ids[cadena]
+
+    for fila in archivo[1:]:
+        celular = fila if isinstance(fila, Celular) else Celular.desde_fila(fila)
+        columnas[0].append(id_cadena(celular.marca))
+        columnas[1].append(id_cadena(celular.modelo))
+        columnas[2].append(celular.cantidad)
+        columnas[3].append(celular.precio)
+        columnas[4].append(celular.almacenamiento)
+        columnas[5].append(celular.anio)
+
+    datos_cadenas = [cadena.encode("utf-8") for cadena in cadenas]
+    desplazamientos = array("I", [0])
+    for dato in datos_cadenas:
+        desplazamientos.append(desplazamientos[-1] + len(dato))
+
+    if sys.byteorder != "little":
+        for columna in columnas:
+            columna.byteswap()
+        desplazamientos.byteswap()
+
+    carpeta, nombre = os.path.split(os.path.abspath(ruta))
+    descriptor, ruta_temporal = tempfile.mkstemp(prefix=f".{nombre}.", suffix=".tmp", dir=carpeta)
+    try:
+        with os.fdopen(descriptor, "wb") as salida:
+            salida.write(_ENCABEZADO.pack(_FIRMA, _VERSION, len(archivo[1:]), len(cadenas), len(encabezado)))
+            for columna in columnas:
+                columna.tofile(salida)
+            desplazamientos.tofile(salida)
+            salida.write(b"".join(datos_cadenas))
+            salida.flush()
+            os.fsync(salida.fileno())
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+class Instantanea:
+    '''
+    Instantánea binaria del catálogo abierta con mmap.
+
+    Es solo una copia en caché del CSV en otro formato: cargar el catálogo completo desde la instantánea
+    no es más rápido que leer el CSV, porque armar las filas Celular lleva casi todo el tiempo.
+    Las columnas numéricas se leen directamente del archivo mapeado y las cadenas se decodifican una
+    sola vez, la primera vez que se piden.
+    '''
+
+    def __init__(self, ruta: str = RUTA_INSTANTANEA) -> None:
+        '''
+        Abre y mapea la instantánea.
+
+        Precondiciones:
+        - El archivo debe existir y haber sido generado por exportar().
+
+        Postcondiciones:
+        - Si el archivo no es una instantánea válida, lanza ValueError.
+        '''
+        with open(ruta, "rb") as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._columnas = []
+        self._desplazamientos = None
+        try:
+            firma, version, self.n_filas, self.n_cadenas, n_encabezado = _ENCABEZADO.unpack_from(self._mapa, 0)
+            if firma != _FIRMA or version != _VERSION:
+                raise ValueError("El archivo no es una instantánea válida.")
+
+            posicion = _ENCABEZADO.size
+            if posicion + 4 * (len(_COLUMNAS) * self.n_filas + self.n_cadenas + 1) > len(self._mapa):
+                raise ValueError("La instantánea está incompleta.")
+            for _ in _COLUMNAS:
+                self._columnas.append(self._enteros(posicion, self.n_filas, "i"))
+                posicion += 4 * self.n_filas
+            self._desplazamientos = self._enteros(posicion, self.n_cadenas + 1, "I")
+            self._inicio_cadenas = posicion + 4 * (self.n_cadenas + 1)
+            if self._inicio_cadenas + self._desplazamientos[-1] > len(self._mapa):
+                raise ValueError("La instantánea está incompleta.")
+        except (struct.error, ValueError):
+            self.cerrar()
+            raise ValueError("El archivo no es una instantánea válida.")
+
+        self._cadenas: List[Optional[str]] = [None] * self.n_cadenas
+        self.encabezado = [self.cadena(i) for i in range(n_encabezado)]
+
+    def _enteros(self, posicion: int, cantidad: int, tipo: str):
+        if sys.byteorder == "little":
+            return memoryview(self._mapa)[posicion:posicion + 4 * cantidad].cast(tipo)
+        valores = array(tipo, self._mapa[posicion:posicion + 4 * cantidad])
+        valores.byteswap()
+        return valores
+
+    def __len__(self) -> int:
+        return self.n_filas
+
+    def cadena(self, indice: int) -> str:
+        '''
+        Devuelve la cadena de la tabla de cadenas con ese índice.
+        '''
+        cadena = self._cadenas[indice]
+        if cadena is None:
+            desde = self._inicio_cadenas + self._desplazamientos[indice]
+            hasta = self._inicio_cadenas + self._desplazamientos[indice + 1]
+            cadena = sys.intern(self._mapa[desde:hasta].decode("utf-8"))
+            self._cadenas[indice] = cadena
+        return cadena
+
+    def cadenas(self) -> List[str]:
+        '''
+        Devuelve toda la tabla de cadenas, decodificando de una sola vez las que no se pidieron antes.
+        '''
+        if None in self._cadenas:
+            datos = self._mapa[self._inicio_cadenas:self._inicio_cadenas + self._desplazamientos[-1]]
+            limites = self._desplazamientos.tolist()
+            self._cadenas = [sys.intern(datos[desde:hasta].decode("utf-8")) for desde, hasta in zip(limites, limites[1:])]
+        return self._cadenas
+
+    def columna(self, nombre: str) -> List:
+        '''
+        Devuelve una columna completa como lista: "marca" y "modelo" como cadenas y las demás
+        ("cantidad", "precio", "almacenamiento", "anio") como enteros, convertidas de una sola vez desde
+        el archivo mapeado.
+        '''
+        valores = self._columnas[_COLUMNAS.index(nombre)].tolist()
+        if nombre in ("marca", "modelo"):
+            cadenas = self.cadenas()
+            return [cadenas[i] for i in valores]
+        return valores
+
+    def fila(self, indice: int) -> Celular:
+        '''
+        Devuelve la fila pedida como un Celular.
+        '''
+        marcas, modelos, cantidades, precios, almacenamientos, anios = self._columnas
+        return Celular(self.cadena(marcas[indice]), self.cadena(modelos[indice]), cantidades[indice],
+                       precios[indice], almacenamientos[indice], anios[indice])
+
+    def filas(self) -> Iterator[Celular]:
+        '''
+        Recorre todas las filas de la instantánea.
+        '''
+        return (self.fila(i) for i in range(self.n_filas))
+
+    def a_archivo(self) -> List[List[str]]:
+        '''
+        Devuelve el catálogo con el mismo formato que leer_archivo(): el encabezado y después las filas.
+
+        Postcondiciones:
+        - Las filas se arman columna por columna (ver columna()) y no de a una con fila(), que es más lento.
+        '''
+        return [list(self.encabezado)] + list(map(Celular, *(self.columna(nombre) for nombre in _COLUMNAS)))
+
+    def cerrar(self) -> None:
+        '''
+        Libera el archivo mapeado.
+        '''
+        for vista in getattr(self, "_columnas", []) + [getattr(self, "_desplazamientos", None)]:
+            if isinstance(vista, memoryview):
+                vista.release()
+        self._columnas = []
+        self._desplazamientos = None
+        self._mapa.close()
+
+
+def importar(ruta_instantanea: str = RUTA_INSTANTANEA, ruta_csv: str = persistencia.RUTA_ARCHIVO) -> None:
+    '''
+    Reconstruye un archivo CSV a partir de una instantánea.
+
+    Postcondiciones:
+    - El CSV queda con el encabezado y las filas de la instantánea, escrito de forma atómica.
+    '''
+    instantanea = Instantanea(ruta_instantanea)
+    try:
+        persistencia.escribir_archivo(instantanea.a_archivo(), ruta_csv)
+    finally:
+        instantanea.cerrar()
+
+
+def _sin_cambios_posteriores(ruta: str) -> bool:
+    # La instantánea es más nueva que el CSV y el diario está vacío o no existe. Alcanza con el tamaño
+    # del diario, sin leerlo.
+    try:
+        if os.stat(ruta).st_mtime_ns < os.stat(persistencia.RUTA_ARCHIVO).st_mtime_ns:
+            return False
+    except OSError:
+        return False
+    try:
+        return os.path.getsize(persistencia.RUTA_DIARIO) == 0
+    except OSError:
+        return True
+
+
+def esta_vigente(ruta: str = RUTA_INSTANTANEA) -> bool:
+    '''
+    Indica si la instantánea refleja el estado actual de "stock_celulares.csv".
+
+    Postcondiciones:
+    - Devuelve True si la instantánea existe, es válida, es más nueva que el CSV y el diario está vacío
+      o no existe. El diario no se lee: solo se mira su tamaño.
+    '''
+    if not _sin_cambios_posteriores(ruta):
+        return False
+    try:
+        Instantanea(ruta).cerrar()
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def cargar_si_vigente(ruta: str = RUTA_INSTANTANEA) -> List[List[str]]:
+    '''
+    Carga el catálogo desde la instantánea si está vigente.
+
+    Postcondiciones:
+    - Devuelve el catálogo con el formato de leer_archivo(), o una lista vacía si la instantánea
+      no existe, no está vigente o no es válida.
+    - La instantánea se abre y se valida una sola vez.
+    '''
+    if not _sin_cambios_posteriores(ruta):
+        return []
+    try:
+        instantanea = Instantanea(ruta)
+    except (OSError, ValueError):
+        return []
+    try:
+        return instantanea.a_archivo()
+    finally:
+        instantanea.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta el stock a la instantánea binaria o reconstruye el CSV desde ella.")
+    parser.add_argument("accion", choices=["exportar", "importar"])
+    parser.add_argument("--instantanea", default=RUTA_INSTANTANEA)
+    parser.add_argument("--csv", default=persistencia.RUTA_ARCHIVO)
+    argumentos = parser.parse_args()
+    if argumentos.accion == "exportar":
+        archivo = persistencia.cargar() if argumentos.csv == persistencia.RUTA_ARCHIVO else persistencia.leer_csv(argumentos.csv)
+        exportar(archivo, argumentos.instantanea)
+        print(f"Se exportaron {len(archivo) - 1} filas a {argumentos.instantanea}.")
+    else:
+        importar(argumentos.instantanea, argumentos.csv)
+        print(f"Se reconstruyó {argumentos.csv} desde {argumentos.instantanea}.")
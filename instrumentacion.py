@@ -0,0 +1,88 @@
+import functools
+import json
+import os
+import time
+from typing import Dict, Callable
+
+# Se activa con la variable de entorno CELULARES_METRICAS ("1" o "tabla" para una tabla, "json" para JSON).
+# Si está apagada, medir() devuelve la función sin envolver y el resto de los llamados se saltean con
+# "if instrumentacion.ACTIVA", así que no agrega costo.
+_VARIABLE = os.environ.get("CELULARES_METRICAS", "").strip().lower()
+ACTIVA = _VARIABLE not in ("", "0", "no")
+FORMATO = "json" if _VARIABLE == "json" else "tabla"
+
+_CAMPOS = ("llamadas", "segundos", "filas", "bytes_leidos", "bytes_escritos")
+
+metricas: Dict[str, Dict[str, float]] = {}
+
+
+def _metrica(operacion: str) -> Dict[str, float]:
+    if operacion not in metricas:
+        metricas[operacion] = dict.fromkeys(_CAMPOS, 0)
+    return metricas[operacion]
+
+
+def medir(funcion: Callable) -> Callable:
+    '''
+    Decorador que cuenta las llamadas y el tiempo de reloj de una función.
+
+    Postcondiciones:
+    - Si la instrumentación está apagada, devuelve la misma función sin cambios.
+    '''
+    if not ACTIVA:
+        return funcion
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            metrica = _metrica(funcion.__qualname__)
+            metrica["llamadas"] += 1
+            metrica["segundos"] += time.perf_counter() - inicio
+    return envoltura
+
+
+def sumar(operacion: str, filas: int = 0, bytes_leidos: int = 0, bytes_escritos: int = 0) -> None:
+    '''
+    Suma filas recorridas y bytes leídos o escritos a la operación indicada.
+
+    Precondiciones:
+    - Llamarla solo si ACTIVA es True.
+    '''
+    metrica = _metrica(operacion)
+    metrica["filas"] += filas
+    metrica["bytes_leidos"] += bytes_leidos
+    metrica["bytes_escritos"] += bytes_escritos
+
+
+def contar(operacion: str, veces: int = 1) -> None:
+    '''
+    Cuenta un evento que no es una llamada medida (por ejemplo, un acierto de caché) como llamadas de la operación.
+
+    Precondiciones:
+    - Llamarla solo si ACTIVA es True.
+    '''
+    _metrica(operacion)["llamadas"] += veces
+
+
+def resumen() -> str:
+    '''
+    Devuelve el resumen de las métricas como tabla de texto o como JSON, según FORMATO.
+    '''
+    if FORMATO == "json":
+        return json.dumps(metricas, indent=2)
+    lineas = [f"{'Operación':<26}{'Llamadas':>10}{'Segundos':>12}{'Filas':>12}{'Leídos':>14}{'Escritos':>14}"]
+    for operacion, metrica in sorted(metricas.items()):
+        lineas.append(f"{operacion:<26}{metrica['llamadas']:>10}{metrica['segundos']:>12.4f}{metrica['filas']:>12}"
+                      f"{metrica['bytes_leidos']:>14}{metrica['bytes_escritos']:>14}")
+    return "\n".join(lineas)
+
+
+def imprimir_resumen() -> None:
+    '''
+    Imprime el resumen de las métricas si la instrumentación está activa.
+    '''
+    if ACTIVA:
+        print(resumen())
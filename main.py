@@ -1,4 +1,8 @@
 import funciones as fn
+import motores
+import ventas
+import sucursales
+import instrumentacion
 
 
 def main() -> None:
@@ -13,8 +17,10 @@ def main() -> None:
     Postcondiciones:
     - Inicia un bucle de menú que permite al usuario interactuar con el sistema hasta que elija salir.
     '''
-    archivo = fn.leer_archivo()
-    if archivo:
+    motor = motores.abrir()
+    catalogo = fn.abrir_catalogo(motor)
+    red = sucursales.Sucursales()
+    if catalogo:
         while True:
             fn.menu()
             try:
@@ -29,17 +35,31 @@ def main() -> None:
                 if opcion == 1:
                     fn.print_opcion1()
                 elif opcion == 2:
-                    fn.agregar_datos()
+                    fn.agregar_datos(catalogo)
                 elif opcion == 3:
-                    fn.opciones_stock(archivo)
+                    fn.opciones_stock(catalogo)
                 elif opcion == 4:
-                    fn.opciones_precio(archivo)
+                    fn.opciones_precio(catalogo)
                 elif opcion == 5:
-                    fn.presupuesto(archivo)
+                    fn.presupuesto(catalogo)
                 elif opcion == 6:
-                    fn.compra(archivo)
+                    fn.compra(catalogo)
+                elif opcion == 7:
+                    fn.busqueda_avanzada(catalogo)
+                elif opcion == 8:
+                    fn.reporte_inventario(catalogo)
+                elif opcion == 9:
+                    fn.reporte_ventas()
+                elif opcion == 10:
+                    fn.opciones_sucursales(red)
+                elif opcion == 11:
+                    fn.actualizar_por_lotes(catalogo)
                 elif opcion == 0:
+                    motor.cerrar()
+                    red.cerrar()
+                    ventas.abrir().volcar()
                     print("Ha salido con éxito.")
+                    instrumentacion.imprimir_resumen()
                     break
 
 
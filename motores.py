@@ -0,0 +1,269 @@
+import argparse
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Optional, Iterator
+
+import persistencia
+import instantanea
+import instrumentacion
+from catalogo import Catalogo, a_entero
+from concurrencia import CatalogoCompartido
+
+# Motor de almacenamiento por defecto: "csv" (stock_celulares.csv con diario) o "sqlite" (stock_celulares.db).
+# Se elige con la variable de entorno CELULARES_MOTOR.
+MOTOR = os.environ.get("CELULARES_MOTOR", "csv").strip().lower() or "csv"
+
+RUTA_SQLITE = "stock_celulares.db"
+
+_INSERTAR = ("INSERT OR IGNORE INTO celulares (marca, modelo, cantidad, precio, almacenamiento, anio) "
+             "VALUES (?, ?, ?, ?, ?, ?)")
+
+ENCABEZADO = ["Marca", "Modelo", "Cantidad", "Precio", "Almacenamiento", "Anio_de_lanzamiento"]
+
+
+class MotorCSV:
+    '''
+    Motor de almacenamiento sobre "stock_celulares.csv": los cambios de una fila se agregan al diario y
+    el diario se vuelca sobre el CSV al compactar (ver persistencia).
+    '''
+    nombre = "csv"
+
+    guardar_stock = staticmethod(persistencia.guardar_stock)
+    guardar_precio = staticmethod(persistencia.guardar_precio)
+    guardar_alta = staticmethod(persistencia.guardar_alta)
+    guardar_pedido = staticmethod(persistencia.guardar_pedido)
+    agregar_filas = staticmethod(persistencia.agregar_filas)
+    confirmar = staticmethod(persistencia.confirmar)
+    lote = staticmethod(persistencia.lote)
+    reemplazar = staticmethod(persistencia.reemplazar)
+    version = staticmethod(persistencia.version_en_disco)
+    cargar = staticmethod(persistencia.cargar)
+
+    def cerrar(self) -> None:
+        '''
+        Guarda los cambios pendientes, vuelca el diario sobre el CSV y actualiza la instantánea binaria.
+        '''
+        persistencia.confirmar()
+        if persistencia.leer_diario():
+            persistencia.compactar()
+        if not instantanea.esta_vigente():
+            instantanea.exportar(self.cargar())
+
+
+class MotorSQLite:
+    '''
+    Motor de almacenamiento sobre una base SQLite con un índice único en (marca, modelo, almacenamiento) y
+    otro en el precio. Cada cambio de una fila es un UPDATE o INSERT indexado en su propia transacción,
+    salvo dentro de un lote(), donde todos los cambios forman una sola transacción.
+    '''
+    nombre = "sqlite"
+
+    def __init__(self, ruta: str = RUTA_SQLITE) -> None:
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        with self.conexion:
+            self.conexion.execute("BEGIN")
+            self.conexion.execute(
+                "CREATE TABLE IF NOT EXISTS celulares ("
+                " orden INTEGER PRIMARY KEY, marca TEXT NOT NULL, modelo TEXT NOT NULL,"
+                " cantidad INTEGER NOT NULL, precio INTEGER NOT NULL, almacenamiento INTEGER NOT NULL,"
+                " anio INTEGER NOT NULL)")
+            self.conexion.execute("CREATE UNIQUE INDEX IF NOT EXISTS celulares_clave ON celulares (marca, modelo, almacenamiento)")
+            self.conexion.execute("CREATE INDEX IF NOT EXISTS celulares_precio ON celulares (precio)")
+
+    @contextmanager
+    def lote(self) -> Iterator[None]:
+        '''
+        Ejecuta los cambios del bloque "with" en una sola transacción.
+
+        Postcondiciones:
+        - Al salir del bloque se confirma la transacción; si el bloque termina con una excepción (por ejemplo,
+          la base rechaza un cambio), se deshacen todos sus cambios y se propaga la excepción.
+        - Si ya hay una transacción abierta (por ejemplo, la de un lote que contiene a este), el bloque forma
+          parte de ella.
+        '''
+        if self.conexion.in_transaction:
+            yield
+            return
+        with self.conexion:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            yield
+
+    def _ejecutar(self, consulta: str, parametros: tuple) -> int:
+        with self.lote():
+            return self.conexion.execute(consulta, parametros).rowcount
+
+    @instrumentacion.medir
+    def cargar(self) -> List[List[str]]:
+        '''
+        Lee todas las filas de la base, en el orden en que se agregaron.
+
+        Postcondiciones:
+        - Devuelve el catálogo con el formato de leer_archivo(), encabezado incluido.
+        '''
+        filas = self.conexion.execute(
+            "SELECT marca, modelo, cantidad, precio, almacenamiento, anio FROM celulares ORDER BY orden").fetchall()
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("MotorSQLite.cargar", filas=len(filas))
+        return [list(ENCABEZADO)] + [[str(valor) for valor in fila] for fila in filas]
+
+    @instrumentacion.medir
+    def guardar_stock(self, archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str,
+                      diferencia: int, nueva_cantidad: int) -> None:
+        '''
+        Guarda un cambio de stock ya aplicado en memoria con un UPDATE sobre el índice de la clave.
+
+        Postcondiciones:
+        - Se suma la diferencia a la cantidad de la base, así que los cambios de otras terminales no se pierden.
+        - Si con los cambios de otras terminales el stock de la base quedaría fuera del rango de 0 a 50, no se
+          guarda nada y se lanza ValueError.
+        '''
+        actualizadas = self._ejecutar(
+            "UPDATE celulares SET cantidad = cantidad + ? "
+            "WHERE marca = ? AND modelo = ? AND almacenamiento = ? AND cantidad + ? BETWEEN 0 AND 50",
+            (int(diferencia), marca, modelo, int(almacenamiento), int(diferencia)))
+        if actualizadas != 1:
+            raise ValueError(f"El stock de {marca} {modelo} {almacenamiento}GB quedaría fuera del rango de 0 a 50.")
+
+    @instrumentacion.medir
+    def guardar_precio(self, archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+        '''
+        Guarda un cambio de precio ya aplicado en memoria con un UPDATE sobre el índice de la clave.
+        '''
+        self._ejecutar("UPDATE celulares SET precio = ? WHERE marca = ? AND modelo = ? AND almacenamiento = ?",
+                       (int(precio), marca, modelo, int(almacenamiento)))
+
+    @instrumentacion.medir
+    def guardar_pedido(self, archivo: List[List[str]], cambios: List[Tuple[str, str, str, int, int]]) -> None:
+        '''
+        Guarda los cambios de stock de un pedido ya aplicados en memoria en una sola transacción.
+
+        Postcondiciones:
+        - Si en la base no alcanza el stock de algún celular (por ventas de otras terminales), no se guarda
+          ningún cambio y se lanza ValueError.
+        '''
+        with self.lote():
+            for marca, modelo, almacenamiento, diferencia, _ in cambios:
+                actualizadas = self.conexion.execute(
+                    "UPDATE celulares SET cantidad = cantidad + ? "
+                    "WHERE marca = ? AND modelo = ? AND almacenamiento = ? AND cantidad + ? >= 0",
+                    (int(diferencia), marca, modelo, int(almacenamiento), int(diferencia))).rowcount
+                if actualizadas != 1:
+                    raise ValueError(f"No hay stock suficiente de {marca} {modelo} {almacenamiento}GB.")
+
+    @instrumentacion.medir
+    def guardar_alta(self, archivo: List[List[str]], fila: List[str]) -> None:
+        '''
+        Guarda el alta de un celular ya agregado en memoria con un INSERT.
+        '''
+        self._ejecutar(_INSERTAR, _valores(fila))
+
+    @instrumentacion.medir
+    def agregar_filas(self, archivo: List[List[str]], filas: List[List[str]]) -> None:
+        '''
+        Guarda varias altas juntas en una sola transacción.
+        '''
+        if not filas:
+            return
+        with self.lote():
+            self.conexion.executemany(_INSERTAR, (_valores(fila) for fila in filas))
+
+    def confirmar(self) -> None:
+        '''
+        No hace nada: cada cambio ya se confirma en su propia transacción (o en la de su lote).
+        '''
+
+    def reemplazar(self, archivo: List[List[str]]) -> None:
+        '''
+        Reemplaza todas las filas de la base por las de "archivo" (sin el encabezado) en una sola transacción.
+        '''
+        with self.lote():
+            self.conexion.execute("DELETE FROM celulares")
+            self.conexion.executemany(_INSERTAR, (_valores(fila) for fila in archivo[1:]))
+
+    def version(self) -> Tuple[int, ...]:
+        '''
+        Devuelve la fecha de modificación y el tamaño de la base y de su archivo WAL.
+        '''
+        version: Tuple[int, ...] = ()
+        for ruta in (self.ruta, self.ruta + "-wal"):
+            try:
+                estado = os.stat(ruta)
+                version += (estado.st_mtime_ns, estado.st_size)
+            except OSError:
+                version += (0, 0)
+        return version
+
+    def cerrar(self) -> None:
+        self.conexion.close()
+
+
+def _valores(fila: List[str]) -> tuple:
+    marca, modelo, cantidad, precio, almacenamiento, anio = list(fila)
+    return (marca, modelo, a_entero(cantidad), a_entero(precio), a_entero(almacenamiento), a_entero(anio))
+
+
+MOTORES = {"csv": MotorCSV, "sqlite": MotorSQLite}
+
+_abiertos: Dict[str, object] = {}
+
+
+def abrir(nombre: Optional[str] = None):
+    '''
+    Devuelve el motor de almacenamiento indicado, o el de CELULARES_MOTOR si no se indica.
+
+    Postcondiciones:
+    - Devuelve siempre la misma instancia para el mismo nombre.
+    - Si el nombre no es un motor conocido, lanza ValueError.
+    '''
+    nombre = (nombre or MOTOR).lower()
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor de almacenamiento desconocido: {nombre}")
+    if nombre not in _abiertos:
+        _abiertos[nombre] = MOTORES[nombre]()
+    return _abiertos[nombre]
+
+
+def abrir_catalogo(motor=None, compartido: bool = False) -> Catalogo:
+    '''
+    Carga el catálogo desde un motor de almacenamiento y lo deja guardando sus cambios en ese motor.
+
+    Parámetros:
+    - motor: Motor a usar. Si es None se usa abrir().
+    - compartido: Con el motor CSV, devuelve un CatalogoCompartido para trabajar desde varias terminales.
+
+    Postcondiciones:
+    - Con el motor CSV se carga desde la instantánea binaria si está vigente (es solo una copia en caché
+      del CSV, ver instantanea.Instantanea).
+    '''
+    motor = motor if motor is not None else abrir()
+    if isinstance(motor, MotorCSV):
+        cargador = lambda: instantanea.cargar_si_vigente() or motor.cargar()
+        if compartido:
+            return CatalogoCompartido.cargar(cargador)
+        return Catalogo(cargador(), motor)
+    return Catalogo(motor.cargar(), motor)
+
+
+def convertir(origen, destino) -> int:
+    '''
+    Copia todo el stock de un motor a otro (por ejemplo, para importar el CSV a SQLite o exportarlo de vuelta).
+
+    Postcondiciones:
+    - El destino queda con las mismas filas que el origen. Devuelve la cantidad de filas copiadas.
+    '''
+    archivo = origen.cargar()
+    destino.reemplazar(archivo)
+    return max(len(archivo) - 1, 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copia el stock entre motores de almacenamiento.")
+    parser.add_argument("origen", choices=sorted(MOTORES))
+    parser.add_argument("destino", choices=sorted(MOTORES))
+    argumentos = parser.parse_args()
+    copiadas = convertir(abrir(argumentos.origen), abrir(argumentos.destino))
+    print(f"Se copiaron {copiadas} filas de {argumentos.origen} a {argumentos.destino}.")
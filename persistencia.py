@@ -0,0 +1,718 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Tuple, Iterator, Optional, Callable
+
+import instrumentacion
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+RUTA_ARCHIVO = "stock_celulares.csv"
+RUTA_DIARIO = "stock_celulares.diario"
+RUTA_BLOQUEO = "stock_celulares.lock"
+
+# Si está activo, los cambios de stock y precio se agregan al diario en lugar de reescribir el CSV.
+MODO_DIARIO = True
+
+# Umbrales a partir de los cuales el diario se vuelca sobre el CSV.
+MAX_REGISTROS_DIARIO = 500
+MAX_BYTES_DIARIO = 64 * 1024
+
+# Confirmación agrupada: los cambios se acumulan y se escriben juntos al llegar a
+# GRUPO_MAX_CAMBIOS cambios o al pasar GRUPO_VENTANA_SEGUNDOS desde el primero pendiente
+# (un temporizador confirma el grupo al vencer la ventana aunque no lleguen más cambios).
+GRUPO_MAX_CAMBIOS = 1
+GRUPO_VENTANA_SEGUNDOS = 0.0
+
+_estado_diario: Dict[str, int] = {"registros": -1}
+_pendiente: Dict[str, object] = {"registros": [], "archivo": None, "cambios": 0, "desde": 0.0}
+_grupo: Dict[str, float] = {"max_cambios": GRUPO_MAX_CAMBIOS, "ventana": GRUPO_VENTANA_SEGUNDOS}
+# Estado del bloqueo de cada hilo (archivo, profundidad, exclusivo). _cerrojo hace que un solo hilo del
+# proceso esté dentro de bloquear() a la vez: el flock es del proceso y no distingue hilos.
+_bloqueo = threading.local()
+_cerrojo = threading.RLock()
+
+
+@contextmanager
+def bloquear(exclusivo: bool = True) -> Iterator[None]:
+    '''
+    Toma el bloqueo consultivo entre procesos sobre el stock ("stock_celulares.lock").
+
+    Parámetros:
+    - exclusivo: Si es False se toma un bloqueo compartido, que solo excluye a quien escribe.
+
+    Postcondiciones:
+    - Se puede anidar dentro del mismo hilo; el bloqueo se libera al salir del bloque más externo.
+      Si se pide exclusivo dentro de uno compartido, se sube a exclusivo mientras dura el bloque interno.
+    - Entre hilos del mismo proceso el bloqueo también es excluyente: un hilo espera a que otro salga
+      de su bloque más externo.
+    - En sistemas sin fcntl se usa msvcrt, donde todos los bloqueos son exclusivos.
+    '''
+    with _cerrojo:
+        if getattr(_bloqueo, "profundidad", 0):
+            subir = exclusivo and not _bloqueo.exclusivo and fcntl is not None
+            if subir:
+                fcntl.flock(_bloqueo.archivo.fileno(), fcntl.LOCK_EX)
+                _bloqueo.exclusivo = True
+            _bloqueo.profundidad += 1
+            try:
+                yield
+            finally:
+                _bloqueo.profundidad -= 1
+                if subir:
+                    fcntl.flock(_bloqueo.archivo.fileno(), fcntl.LOCK_SH)
+                    _bloqueo.exclusivo = False
+            return
+
+        archivo = open(RUTA_BLOQUEO, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+            elif msvcrt is not None:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            _bloqueo.archivo = archivo
+            _bloqueo.profundidad = 1
+            _bloqueo.exclusivo = exclusivo or fcntl is None
+            try:
+                yield
+            finally:
+                _bloqueo.profundidad = 0
+                _bloqueo.archivo = None
+                if fcntl is not None:
+                    fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    archivo.seek(0)
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            archivo.close()
+
+
+def version_en_disco(ruta: str = RUTA_ARCHIVO, ruta_diario: Optional[str] = None) -> Tuple[int, int, int]:
+    '''
+    Devuelve la versión del stock guardado en disco.
+
+    Parámetros:
+    - ruta, ruta_diario: CSV y diario del stock. Si ruta_diario es None se usa RUTA_DIARIO.
+
+    Postcondiciones:
+    - Devuelve la fecha de modificación y el tamaño del CSV y el tamaño del diario. Cualquier cambio guardado
+      por cualquier proceso cambia la versión. Si un archivo no existe, sus valores son 0.
+    '''
+    try:
+        estado = os.stat(ruta)
+        csv = (estado.st_mtime_ns, estado.st_size)
+    except OSError:
+        csv = (0, 0)
+    try:
+        diario = os.path.getsize(ruta_diario or RUTA_DIARIO)
+    except OSError:
+        diario = 0
+    return csv + (diario,)
+
+
+@instrumentacion.medir
+def leer_csv(ruta: str = RUTA_ARCHIVO) -> List[List[str]]:
+    '''
+    Lee y parsea un archivo CSV con el formato de "stock_celulares.csv", sin aplicar el diario.
+
+    Precondiciones:
+    - El archivo debe existir.
+
+    Postcondiciones:
+    - Devuelve una lista de listas con los datos del archivo.
+    '''
+    with open(ruta, "rt", encoding="utf-8-sig") as archivo:
+        datos = [lineas.strip().split(";") for lineas in archivo]
+    if instrumentacion.ACTIVA:
+        instrumentacion.sumar("leer_csv", filas=len(datos), bytes_leidos=os.path.getsize(ruta))
+    return datos
+
+
+def es_archivo_stock(ruta: str) -> bool:
+    '''
+    Indica si "ruta" es el archivo de stock ("stock_celulares.csv"), aunque esté escrita de otra forma
+    (por ejemplo "./stock_celulares.csv" o una ruta absoluta).
+    '''
+    try:
+        return os.path.samefile(ruta, RUTA_ARCHIVO)
+    except OSError:
+        return os.path.abspath(ruta) == os.path.abspath(RUTA_ARCHIVO)
+
+
+def leer_filtrado(ruta: str = RUTA_ARCHIVO, marca: Optional[str] = None, almacenamiento: Optional[str] = None,
+                  precio_minimo: Optional[int] = None, precio_maximo: Optional[int] = None,
+                  stock_minimo: Optional[int] = None, predicado: Optional[Callable[[List[str]], bool]] = None,
+                  tamanio_buffer: int = 1 << 20) -> Iterator[List[str]]:
+    '''
+    Recorre un archivo CSV con el formato de "stock_celulares.csv" devolviendo de a una las filas que
+    cumplen los filtros, sin cargar el archivo completo en memoria.
+
+    Parámetros:
+    - ruta: Archivo a leer.
+    - marca: Marca exacta.
+    - almacenamiento: Almacenamiento exacto (por ejemplo "128").
+    - precio_minimo, precio_maximo: Rango de precios, inclusive.
+    - stock_minimo: Cantidad mínima en stock.
+    - predicado: Función adicional que recibe la fila y devuelve True si debe incluirse.
+    - tamanio_buffer: Tamaño en bytes del buffer de lectura.
+
+    Postcondiciones:
+    - Devuelve un generador de filas (listas de cadenas), sin el encabezado.
+    - El filtro de marca se evalúa antes de separar la línea, así que las líneas descartadas casi no cuestan.
+    - Si se lee "stock_celulares.csv" (con cualquier ruta, ver es_archivo_stock()), se aplican los cambios
+      y las altas pendientes del diario.
+    '''
+    cambios: Dict[Tuple[str, str, str], List[str]] = {}
+    if es_archivo_stock(ruta):
+        confirmar()
+        for registro in leer_diario():
+            cambios.setdefault((registro[1], registro[2], registro[3]), []).append(registro)
+
+    def cumple(fila: List[str]) -> bool:
+        if precio_minimo is not None or precio_maximo is not None:
+            precio = int(fila[3].strip().strip('$'))
+            if precio_minimo is not None and precio < precio_minimo:
+                return False
+            if precio_maximo is not None and precio > precio_maximo:
+                return False
+        if stock_minimo is not None and int(fila[2]) < stock_minimo:
+            return False
+        return predicado is None or predicado(fila)
+
+    prefijo = marca + ';' if marca is not None else None
+    recorridas = 0
+    with open(ruta, "rt", encoding="utf-8-sig", buffering=tamanio_buffer) as archivo:
+        next(archivo, None)
+        for linea in archivo:
+            recorridas += 1
+            if prefijo is not None and not linea.startswith(prefijo):
+                continue
+            fila = linea.strip().split(";")
+            if almacenamiento is not None and fila[4] != almacenamiento:
+                continue
+            for registro in cambios.pop((fila[0], fila[1], fila[4]), ()):
+                aplicar_registro(fila, registro)
+            if cumple(fila):
+                yield fila
+
+    # Los celulares dados de alta en el diario todavía no están en el CSV.
+    for (marca_alta, _, almacenamiento_alta), registros in cambios.items():
+        if registros[0][0] != "A" or marca not in (None, marca_alta) or almacenamiento not in (None, almacenamiento_alta):
+            continue
+        fila = fila_de_alta(registros[0])
+        for registro in registros[1:]:
+            aplicar_registro(fila, registro)
+        if cumple(fila):
+            yield fila
+    if instrumentacion.ACTIVA:
+        instrumentacion.sumar("leer_filtrado", filas=recorridas, bytes_leidos=os.path.getsize(ruta))
+
+
+@instrumentacion.medir
+def escribir_archivo(archivo: List[List[str]], ruta: str = RUTA_ARCHIVO) -> None:
+    '''
+    Escribe el catálogo completo en el archivo CSV de forma atómica.
+
+    Postcondiciones:
+    - El archivo queda con una línea por fila de "archivo", encabezado incluido.
+    - Se escribe primero un archivo temporal en la misma carpeta y después se reemplaza el original,
+      así que un corte a mitad de escritura deja el archivo anterior intacto.
+    '''
+    carpeta, nombre = os.path.split(os.path.abspath(ruta))
+    descriptor, ruta_temporal = tempfile.mkstemp(prefix=f".{nombre}.", suffix=".tmp", dir=carpeta)
+    try:
+        if os.path.exists(ruta):
+            os.chmod(ruta_temporal, os.stat(ruta).st_mode & 0o777)
+        with os.fdopen(descriptor, 'w') as archivo_csv:
+            archivo_csv.writelines(';'.join(fila) + '\n' for fila in archivo)
+            archivo_csv.flush()
+            os.fsync(archivo_csv.fileno())
+            if instrumentacion.ACTIVA:
+                instrumentacion.sumar("escribir_archivo", filas=len(archivo), bytes_escritos=archivo_csv.tell())
+        os.replace(ruta_temporal, ruta)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+@instrumentacion.medir
+def agregar_filas(archivo: List[List[str]], filas: List[List[str]]) -> None:
+    '''
+    Guarda en disco, todas juntas, varias altas ya agregadas en memoria.
+
+    Postcondiciones:
+    - En modo diario agrega un registro de alta por fila al diario; si no, programa la reescritura de
+      "archivo" completo, que se hace de forma atómica (ver escribir_archivo()).
+    - Los cambios se confirman en una sola escritura (ver lote()); dentro de otro lote, con el resto del lote.
+    - Si no hay filas, no hace nada.
+    '''
+    if not filas:
+        return
+    with lote():
+        if MODO_DIARIO:
+            for fila in filas:
+                registrar_alta(fila)
+        else:
+            guardar_archivo(archivo)
+    if instrumentacion.ACTIVA:
+        instrumentacion.sumar("agregar_filas", filas=len(filas))
+
+
+def guardar_archivo(archivo: List[List[str]]) -> None:
+    '''
+    Programa la escritura completa del catálogo en el CSV dentro del grupo de cambios actual.
+
+    Postcondiciones:
+    - Si el grupo se completa, el archivo se escribe en ese momento; si no, se escribe al confirmar.
+    - Varios cambios del mismo grupo producen una sola escritura.
+    '''
+    with _cerrojo:
+        _pendiente["archivo"] = archivo
+        _anotar_cambio()
+
+
+def _anotar_cambio() -> None:
+    if not _pendiente["cambios"]:
+        _pendiente["desde"] = time.monotonic()
+        _programar_vencimiento(_pendiente["desde"])
+    _pendiente["cambios"] += 1
+    if (_pendiente["cambios"] >= _grupo["max_cambios"]
+            or time.monotonic() - _pendiente["desde"] >= _grupo["ventana"]):
+        confirmar()
+
+
+def _programar_vencimiento(desde: float) -> None:
+    # Un grupo con ventana finita se confirma al vencer la ventana aunque no lleguen más cambios.
+    # El temporizador identifica su grupo por "desde": si ese grupo ya se confirmó, no hace nada.
+    ventana = _grupo["ventana"]
+    if _grupo["max_cambios"] <= 1 or not 0 < ventana < float("inf"):
+        return
+    temporizador = threading.Timer(ventana, _confirmar_vencido, args=(desde,))
+    temporizador.daemon = True
+    temporizador.start()
+
+
+def _confirmar_vencido(desde: float) -> None:
+    with _cerrojo:
+        if _pendiente["cambios"] and _pendiente["desde"] == desde:
+            confirmar()
+
+
+@instrumentacion.medir
+def confirmar() -> None:
+    '''
+    Escribe en disco todos los cambios pendientes del grupo actual.
+
+    Postcondiciones:
+    - Los registros pendientes se agregan al diario en una sola escritura sincronizada con el disco.
+    - Si había una escritura completa pendiente, el CSV se reescribe una sola vez.
+    - Si el diario supera sus umbrales, se compacta.
+    - La escritura se hace con el bloqueo exclusivo tomado. Se puede llamar desde otro hilo (por ejemplo,
+      el temporizador de la ventana del grupo).
+    '''
+    with _cerrojo:
+        registros = _pendiente["registros"]
+        archivo = _pendiente["archivo"]
+        _pendiente["registros"] = []
+        _pendiente["archivo"] = None
+        _pendiente["cambios"] = 0
+
+        if not registros and archivo is None:
+            return
+
+        with bloquear():
+            if registros:
+                descartar_linea_incompleta(RUTA_DIARIO)
+                with open(RUTA_DIARIO, 'a', encoding='utf-8') as diario:
+                    diario.writelines(registros)
+                    diario.flush()
+                    os.fsync(diario.fileno())
+                    tamanio = diario.tell()
+                    if instrumentacion.ACTIVA:
+                        instrumentacion.sumar("confirmar", filas=len(registros), bytes_escritos=sum(len(r.encode()) for r in registros))
+
+                if _estado_diario["registros"] < 0:
+                    _estado_diario["registros"] = len(leer_diario())
+                else:
+                    _estado_diario["registros"] += len(registros)
+
+                if _estado_diario["registros"] >= MAX_REGISTROS_DIARIO or tamanio >= MAX_BYTES_DIARIO:
+                    compactar()
+
+            if archivo is not None:
+                escribir_archivo(archivo)
+
+
+@contextmanager
+def agrupar(max_cambios: int = 1000, ventana: float = 5.0) -> Iterator[None]:
+    '''
+    Agrupa los cambios hechos dentro del bloque "with" para escribirlos juntos.
+
+    Parámetros:
+    - max_cambios: Cantidad de cambios a partir de la cual se confirma el grupo.
+    - ventana: Segundos desde el primer cambio pendiente a partir de los cuales se confirma el grupo.
+      Si es finita y mayor que 0, un temporizador confirma el grupo al vencer aunque no lleguen más cambios.
+
+    Postcondiciones:
+    - Al salir del bloque se confirman los cambios que queden pendientes y se restauran los valores anteriores.
+    '''
+    anterior = dict(_grupo)
+    _grupo["max_cambios"] = max_cambios
+    _grupo["ventana"] = ventana
+    try:
+        yield
+    finally:
+        _grupo.update(anterior)
+        confirmar()
+
+
+@contextmanager
+def lote() -> Iterator[None]:
+    '''
+    Escribe juntos todos los cambios hechos dentro del bloque "with", o ninguno.
+
+    Postcondiciones:
+    - Al salir del bloque se confirman los cambios en una sola escritura.
+    - Si el bloque termina con una excepción, se descartan los cambios que agregó (los pendientes de antes
+      siguen pendientes) y se propaga la excepción.
+    - Mientras dura el bloque, ningún otro hilo del proceso confirma cambios.
+    '''
+    with _cerrojo:
+        anterior = dict(_grupo)
+        registros = len(_pendiente["registros"])
+        archivo, cambios = _pendiente["archivo"], _pendiente["cambios"]
+        _grupo["max_cambios"] = sys.maxsize
+        _grupo["ventana"] = float("inf")
+        try:
+            yield
+        except BaseException:
+            del _pendiente["registros"][registros:]
+            _pendiente["archivo"], _pendiente["cambios"] = archivo, cambios
+            raise
+        finally:
+            _grupo.update(anterior)
+        confirmar()
+
+
+def cargar() -> List[List[str]]:
+    '''
+    Lee el CSV y le aplica el diario de cambios, después de confirmar los cambios pendientes.
+
+    Postcondiciones:
+    - Devuelve el catálogo con el formato de leer_archivo(), encabezado incluido.
+    - Si el archivo no existe, lanza FileNotFoundError.
+    '''
+    confirmar()
+    with bloquear(exclusivo=False):
+        return aplicar_diario(leer_csv())
+
+
+def guardar_stock(archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str,
+                  diferencia: int, nueva_cantidad: int) -> None:
+    '''
+    Guarda en disco un cambio de stock ya aplicado en memoria.
+
+    Postcondiciones:
+    - En modo diario agrega un registro al diario de cambios; si no, programa la reescritura de "archivo" completo.
+    '''
+    if MODO_DIARIO:
+        registrar_stock(marca, modelo, almacenamiento, diferencia, nueva_cantidad)
+    else:
+        guardar_archivo(archivo)
+
+
+def guardar_alta(archivo: List[List[str]], fila: List[str]) -> None:
+    '''
+    Guarda en disco el alta de un celular ya agregado en memoria.
+
+    Postcondiciones:
+    - En modo diario agrega un registro de alta al diario de cambios; si no, programa la reescritura de "archivo" completo.
+    '''
+    if MODO_DIARIO:
+        registrar_alta(fila)
+    else:
+        guardar_archivo(archivo)
+
+
+def guardar_pedido(archivo: List[List[str]], cambios: List[Tuple[str, str, str, int, int]]) -> None:
+    '''
+    Guarda en disco, todos juntos, los cambios de stock de un pedido ya aplicados en memoria.
+
+    Parámetros:
+    - cambios: Tuplas (marca, modelo, almacenamiento, diferencia, nueva cantidad), una por celular.
+
+    Postcondiciones:
+    - En modo diario agrega un único registro de pedido al diario, así que al reproducirlo se aplican
+      todos los cambios o ninguno; si no, programa la reescritura de "archivo" completo.
+    '''
+    if MODO_DIARIO:
+        registrar_pedido(cambios)
+    else:
+        guardar_archivo(archivo)
+
+
+def guardar_precio(archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+    '''
+    Guarda en disco un cambio de precio ya aplicado en memoria.
+
+    Postcondiciones:
+    - En modo diario agrega un registro al diario de cambios; si no, programa la reescritura de "archivo" completo.
+    '''
+    if MODO_DIARIO:
+        registrar_precio(marca, modelo, almacenamiento, precio)
+    else:
+        guardar_archivo(archivo)
+
+
+#diario de cambios inicio
+def registrar_stock(marca: str, modelo: str, almacenamiento: str, diferencia: int, nueva_cantidad: int) -> None:
+    '''
+    Agrega al diario un cambio de stock.
+
+    Postcondiciones:
+    - Se guarda la diferencia aplicada y la cantidad resultante. Al reproducir el diario se usa la
+      cantidad resultante, así que reproducirlo dos veces no altera el stock.
+    - El registro se escribe al confirmar el grupo de cambios actual.
+    '''
+    _agregar_registro(["S", marca, modelo, almacenamiento, str(diferencia), str(nueva_cantidad)])
+
+
+def registrar_pedido(cambios: List[Tuple[str, str, str, int, int]]) -> None:
+    '''
+    Agrega al diario los cambios de stock de un pedido en un solo registro "V" (una sola línea).
+
+    Postcondiciones:
+    - Si el programa se corta mientras se escribe, la línea queda incompleta y se ignora entera. El próximo
+      grupo que se confirma la recorta antes de escribir (ver descartar_linea_incompleta()), así que sigue
+      ignorada aunque después se agreguen otros registros.
+    - Al leer el diario, el registro se separa en un registro de stock por celular (ver _separar_pedidos()).
+    '''
+    _agregar_registro(registro_pedido(cambios))
+
+
+def registro_pedido(cambios: List[Tuple[str, str, str, int, int]]) -> List[str]:
+    '''
+    Arma el registro "V" del diario con los cambios de stock de un pedido.
+    '''
+    registro = ["V"]
+    for marca, modelo, almacenamiento, diferencia, nueva_cantidad in cambios:
+        registro += [marca, modelo, almacenamiento, str(diferencia), str(nueva_cantidad)]
+    return registro
+
+
+def registrar_precio(marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+    '''
+    Agrega al diario un cambio de precio.
+
+    Postcondiciones:
+    - El registro se escribe al confirmar el grupo de cambios actual.
+    '''
+    _agregar_registro(["P", marca, modelo, almacenamiento, str(precio)])
+
+
+def registrar_alta(fila: List[str]) -> None:
+    '''
+    Agrega al diario el alta de un celular nuevo (fila con el formato de "stock_celulares.csv").
+
+    Postcondiciones:
+    - El registro se escribe al confirmar el grupo de cambios actual. Al compactar, el celular pasa al CSV.
+    '''
+    marca, modelo, cantidad, precio, almacenamiento, anio = list(fila)
+    _agregar_registro(["A", marca, modelo, almacenamiento, cantidad, precio, anio])
+
+
+def fila_de_alta(registro: List[str]) -> List[str]:
+    '''
+    Arma la fila con el formato de "stock_celulares.csv" a partir de un registro de alta del diario.
+    '''
+    return [registro[1], registro[2], registro[4], registro[5], registro[3], registro[6]]
+
+
+def _agregar_registro(registro: List[str]) -> None:
+    with _cerrojo:
+        _pendiente["registros"].append(';'.join(registro) + '\n')
+        _anotar_cambio()
+
+
+def _separar_pedidos(registros: List[List[str]]) -> List[List[str]]:
+    # Reemplaza cada registro de pedido por los registros de stock que contiene, así el resto del
+    # código solo ve registros "S", "P" y "A".
+    if not any(registro[0] == "V" for registro in registros):
+        return registros
+    separados = []
+    for registro in registros:
+        if registro[0] == "V":
+            separados.extend(["S"] + registro[i:i + 5] for i in range(1, len(registro) - 4, 5))
+        else:
+            separados.append(registro)
+    return separados
+
+
+@instrumentacion.medir
+def leer_diario(ruta: Optional[str] = None) -> List[List[str]]:
+    '''
+    Lee los registros del diario de cambios.
+
+    Parámetros:
+    - ruta: Diario a leer. Si es None se usa RUTA_DIARIO.
+
+    Postcondiciones:
+    - Devuelve una lista de registros, o una lista vacía si no hay diario.
+    - Ignora una última línea incompleta (por ejemplo, si el programa se cortó mientras escribía).
+    '''
+    try:
+        with open(ruta or RUTA_DIARIO, "rt", encoding="utf-8") as diario:
+            contenido = diario.read()
+    except FileNotFoundError:
+        return []
+    lineas = contenido.split('\n')
+    if instrumentacion.ACTIVA:
+        instrumentacion.sumar("leer_diario", filas=len(lineas) - 1, bytes_leidos=len(contenido.encode()))
+    return _separar_pedidos([linea.split(';') for linea in lineas[:-1] if linea])
+
+
+def descartar_linea_incompleta(ruta: str) -> None:
+    '''
+    Recorta del diario una última línea incompleta, por ejemplo la que deja un proceso que se cortó mientras escribía.
+
+    Precondiciones:
+    - Se debe tener el bloqueo exclusivo (ver bloquear()).
+
+    Postcondiciones:
+    - El diario queda terminado en un salto de línea (o vacío), así un registro agregado después no
+      queda pegado a la línea incompleta ni se reproduce como si estuviera completo.
+    - Si el diario ya termina bien, solo se lee su último byte.
+    '''
+    try:
+        with open(ruta, 'r+b') as diario:
+            fin = diario.seek(0, os.SEEK_END)
+            if fin == 0:
+                return
+            diario.seek(fin - 1)
+            if diario.read(1) == b'\n':
+                return
+            while fin > 0:
+                inicio = max(0, fin - 4096)
+                diario.seek(inicio)
+                salto = diario.read(fin - inicio).rfind(b'\n')
+                if salto >= 0:
+                    diario.truncate(inicio + salto + 1)
+                    return
+                fin = inicio
+            diario.truncate(0)
+    except FileNotFoundError:
+        return
+
+
+def leer_diario_desde(desplazamiento: int, ruta: Optional[str] = None) -> Tuple[List[List[str]], int]:
+    '''
+    Lee los registros agregados al diario a partir de una posición en bytes.
+
+    Parámetros:
+    - ruta: Diario a leer. Si es None se usa RUTA_DIARIO.
+
+    Postcondiciones:
+    - Devuelve los registros completos leídos y la posición donde termina el último de ellos.
+    - Si el diario es más corto que la posición (porque se compactó), devuelve una lista vacía y -1.
+    '''
+    try:
+        with open(ruta or RUTA_DIARIO, "rb") as diario:
+            diario.seek(0, os.SEEK_END)
+            if diario.tell() < desplazamiento:
+                return [], -1
+            diario.seek(desplazamiento)
+            datos = diario.read()
+    except FileNotFoundError:
+        return ([], 0) if desplazamiento == 0 else ([], -1)
+
+    completos = datos[:datos.rfind(b'\n') + 1]
+    registros = _separar_pedidos([linea.split(';') for linea in completos.decode("utf-8").split('\n') if linea])
+    return registros, desplazamiento + len(completos)
+
+
+def aplicar_diario(archivo: List[List[str]], ruta_diario: Optional[str] = None) -> List[List[str]]:
+    '''
+    Reproduce el diario de cambios sobre los datos leídos del CSV base.
+
+    Parámetros:
+    - ruta_diario: Diario a reproducir. Si es None se usa RUTA_DIARIO.
+
+    Postcondiciones:
+    - Modifica "archivo" en el lugar y lo devuelve. Las altas se agregan al final; los demás registros
+      de celulares inexistentes se ignoran.
+    '''
+    registros = leer_diario(ruta_diario)
+    if ruta_diario is None:
+        _estado_diario["registros"] = len(registros)
+    if not registros:
+        return archivo
+
+    filas: Dict[Tuple[str, str, str], List[str]] = {}
+    for fila in archivo[1:]:
+        filas.setdefault((fila[0], fila[1], fila[4]), fila)
+
+    for registro in registros:
+        clave = (registro[1], registro[2], registro[3])
+        fila = filas.get(clave)
+        if fila is not None:
+            aplicar_registro(fila, registro)
+        elif registro[0] == "A" and len(registro) == 7:
+            fila = fila_de_alta(registro)
+            archivo.append(fila)
+            filas[clave] = fila
+    return archivo
+
+
+def aplicar_registro(fila: List[str], registro: List[str]) -> None:
+    '''
+    Aplica un registro del diario sobre una fila.
+    '''
+    if registro[0] == "S" and len(registro) == 6:
+        fila[2] = registro[5]
+    elif registro[0] == "P" and len(registro) == 5:
+        fila[3] = registro[4]
+
+
+@instrumentacion.medir
+def compactar() -> None:
+    '''
+    Vuelca el diario de cambios sobre el CSV y lo vacía.
+
+    Postcondiciones:
+    - El CSV queda con todos los cambios aplicados y el diario queda vacío.
+    - Se parte del CSV en disco y no del catálogo en memoria, así no se pierden filas agregadas por otra opción.
+    '''
+    with bloquear():
+        confirmar()
+        escribir_archivo(aplicar_diario(leer_csv()))
+        open(RUTA_DIARIO, 'w').close()
+        _estado_diario["registros"] = 0
+
+
+def reemplazar(archivo: List[List[str]]) -> None:
+    '''
+    Reemplaza todo el stock guardado por el contenido de "archivo" (por ejemplo, al importar desde otro motor).
+
+    Postcondiciones:
+    - Se descartan los cambios pendientes, el CSV queda con "archivo" y el diario queda vacío.
+    '''
+    with bloquear():
+        _pendiente["registros"] = []
+        _pendiente["archivo"] = None
+        _pendiente["cambios"] = 0
+        escribir_archivo(archivo)
+        open(RUTA_DIARIO, 'w').close()
+        _estado_diario["registros"] = 0
+#diario de cambios final
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import json
+import socket
+from typing import List, Dict, Tuple, Optional, Any
+
+import comandos
+import persistencia
+import motores
+import ventas
+from carrito import ErrorCarrito
+from catalogo import Catalogo
+from concurrencia import CatalogoCompartido
+
+PUERTO = 8765
+
+# Tiempo máximo, en segundos, que un cambio espera en memoria antes de escribirse en disco.
+VENTANA_ESCRITURA = 0.05
+
+
+class ErrorSolicitud(Exception):
+    '''
+    Error en los datos de una solicitud; se devuelve al cliente como respuesta con "ok": false.
+    '''
+
+
+class ServidorInventario:
+    '''
+    Servicio asyncio que mantiene un único catálogo en memoria y atiende las operaciones del menú
+    (opción 1, presupuesto, compra, stock y precio) como pedidos y respuestas JSON, una línea por mensaje.
+
+    Los cambios de stock y precio se hacen de a uno con un asyncio.Lock. La escritura en disco la hace una
+    tarea de fondo que junta los cambios de una ventana de tiempo y los guarda como un solo grupo.
+
+    Con un CatalogoCompartido, otras terminales pueden cambiar el mismo stock: antes de cada cambio, si no
+    quedan cambios sin escribir, se traen los de las otras terminales, y la tarea de fondo guarda sin
+    pisarlos (ver CatalogoCompartido.guardar_diferidos()). Si una
+    escritura falla, el servidor deja de aceptar cambios (los que ya aceptó no llegaron al disco) y se lo
+    informa a cada cliente que pide uno.
+    '''
+
+    def __init__(self, catalogo: Catalogo) -> None:
+        self.catalogo = catalogo
+        self._bloqueo = asyncio.Lock()
+        self._cambios: "asyncio.Queue[Tuple[str, tuple]]" = asyncio.Queue()
+        self._escritor: Optional[asyncio.Task] = None
+        # Motivo por el que falló la última escritura en disco; si hay uno, no se aceptan más cambios.
+        self.error: Optional[str] = None
+        # Cambios encolados que la tarea de fondo todavía no terminó de guardar.
+        self._sin_escribir = 0
+        self._operaciones = {
+            "marcas": self.marcas,
+            "almacenamientos": self.almacenamientos,
+            "modelos": self.modelos,
+            "consultar": self.consultar,
+            "sugerir": self.sugerir,
+            "presupuesto": self.presupuesto,
+            "compra": self.compra,
+            "pedido": self.pedido,
+            "stock": self.stock,
+            "precio": self.precio,
+            "resumen": self.resumen,
+            "ventas": self.ventas,
+        }
+
+    #operaciones inicio
+    async def marcas(self) -> List[str]:
+        return sorted(set(fila.marca for fila in self.catalogo.filas()))
+
+    async def almacenamientos(self) -> List[str]:
+        return sorted(set(fila[4] for fila in self.catalogo.filas()))
+
+    async def modelos(self, marca: str, almacenamiento: str) -> Dict[str, Any]:
+        return {"encabezado": self.catalogo.encabezado, "filas": comandos.consultar(self.catalogo, marca, almacenamiento)}
+
+    async def consultar(self, **filtros: Any) -> Dict[str, Any]:
+        return {"encabezado": self.catalogo.encabezado, "filas": comandos.consultar(self.catalogo, **filtros)}
+
+    async def sugerir(self, modelo: str, marca: Optional[str] = None, almacenamiento: Optional[str] = None,
+                      limite: int = 10) -> Dict[str, Any]:
+        return {"encabezado": self.catalogo.encabezado,
+                "filas": comandos.sugerir(self.catalogo, modelo, marca, almacenamiento, limite)}
+
+    async def presupuesto(self, marca: str, presupuesto: int, minimo: int = 0, limite: Optional[int] = None) -> List[List[str]]:
+        if int(presupuesto) <= 0:
+            raise ErrorSolicitud("El presupuesto debe ser mayor que 0.")
+        filas = self.catalogo.buscar_por_precio(marca, minimo=int(minimo), maximo=int(presupuesto), limite=limite, descendente=True)
+        return [list(fila) for fila in filas]
+
+    async def compra(self, marca: str, modelo: str, almacenamiento: str, pago: str, monto: float = 0.0,
+                     numero_tarjeta: str = "", codigo_seguridad: str = "", dni: int = 0) -> Dict[str, Any]:
+        clave = self._clave(marca, modelo, almacenamiento)
+        async with self._bloqueo:
+            self._aceptar_cambios()
+            precio = float(self.catalogo.precio(*clave))
+            if self.catalogo.cantidad(*clave) <= 0:
+                raise ErrorSolicitud("No hay stock disponible de ese celular.")
+            cambio = comandos.validar_pago(precio, pago, monto, numero_tarjeta, codigo_seguridad, dni)
+            nueva_cantidad = self.catalogo.modificar_cantidad(*clave, -1)
+            self._encolar("stock", clave + (-1, nueva_cantidad))
+            ventas.abrir().registrar(*clave, precio, pago)
+        return {"factura": {"marca": clave[0], "modelo": clave[1], "almacenamiento": clave[2], "precio": precio},
+                "cambio": cambio, "stock": nueva_cantidad}
+
+    async def pedido(self, items: List[Dict[str, Any]], pago: str, **datos_pago: Any) -> Dict[str, Any]:
+        async with self._bloqueo:
+            self._aceptar_cambios()
+            carrito = comandos.armar_carrito(self.catalogo, items)
+            lineas = carrito.lineas()
+            cambio = comandos.validar_pago(float(carrito.total()), pago, **datos_pago)
+            cambios = carrito.confirmar(pago, guardar=False)
+            self._encolar("pedido", (cambios,))
+        return comandos.factura_pedido(lineas, cambios, cambio)
+
+    async def stock(self, marca: str, modelo: str, almacenamiento: str, diferencia: int) -> int:
+        clave = self._clave(marca, modelo, almacenamiento)
+        async with self._bloqueo:
+            self._aceptar_cambios()
+            nueva_cantidad = self.catalogo.cantidad(*clave) + int(diferencia)
+            if nueva_cantidad < 0 or nueva_cantidad > 50:
+                raise ErrorSolicitud("No se puede restar más de la cantidad actual o sumar más de 50.")
+            self.catalogo.modificar_cantidad(*clave, int(diferencia))
+            self._encolar("stock", clave + (int(diferencia), nueva_cantidad))
+        return nueva_cantidad
+
+    async def precio(self, marca: str, modelo: str, almacenamiento: str, precio: int) -> int:
+        clave = self._clave(marca, modelo, almacenamiento)
+        if int(precio) < 0 or int(precio) > 10000:
+            raise ErrorSolicitud("El precio debe estar entre 0 y 10000.")
+        async with self._bloqueo:
+            self._aceptar_cambios()
+            self.catalogo.fijar_precio(*clave, int(precio))
+            self._encolar("precio", clave + (int(precio),))
+        return int(precio)
+
+    async def resumen(self) -> Dict[str, Any]:
+        return self.catalogo.resumen_inventario()
+
+    async def ventas(self, **filtros: Any) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(comandos.reporte_ventas, self.catalogo, **filtros)
+    #operaciones final
+
+    def _aceptar_cambios(self) -> None:
+        # Se llama con self._bloqueo tomado, antes de validar un cambio.
+        if self.error is not None:
+            raise ErrorSolicitud(self.error)
+        if not self._sin_escribir:
+            self.catalogo.refrescar()
+
+    def _encolar(self, tipo: str, datos: tuple) -> None:
+        self._sin_escribir += 1
+        self._cambios.put_nowait((tipo, datos))
+
+    def _clave(self, marca: str, modelo: str, almacenamiento: str) -> Tuple[str, str, str]:
+        clave = self.catalogo.resolver(marca, modelo, str(almacenamiento))
+        if clave is None:
+            raise ErrorSolicitud("No se encontró el celular con los datos proporcionados.")
+        return clave
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        '''
+        Atiende a un cliente: lee una solicitud JSON por línea y responde con una línea JSON.
+
+        Postcondiciones:
+        - Cada respuesta tiene "ok" y, según el caso, "resultado" o "error".
+        '''
+        try:
+            while linea := await lector.readline():
+                respuesta = await self.responder(linea)
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def responder(self, linea: bytes) -> Dict[str, Any]:
+        '''
+        Ejecuta una solicitud con el formato {"op": nombre, ...parámetros} y arma la respuesta.
+        '''
+        try:
+            solicitud = json.loads(linea)
+            operacion = self._operaciones.get(solicitud.pop("op", None))
+            if operacion is None:
+                raise ErrorSolicitud("Operación desconocida.")
+            return {"ok": True, "resultado": await operacion(**solicitud)}
+        except (ErrorSolicitud, comandos.ErrorComando, ErrorCarrito) as e:
+            return {"ok": False, "error": str(e)}
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"ok": False, "error": f"Solicitud inválida: {e}"}
+
+    async def escribir_en_disco(self) -> None:
+        '''
+        Tarea de fondo que guarda en disco los cambios encolados, agrupados por ventana de tiempo.
+
+        Postcondiciones:
+        - Los cambios que el motor rechaza (por ejemplo, porque otra terminal dejó el stock fuera de rango) se
+          informan y los demás se guardan.
+        - Si la escritura falla por otro motivo (un error de disco o de la base), se informa, queda en "error"
+          y la tarea sigue atendiendo la cola, así detener() no queda esperando.
+        '''
+        while True:
+            cambios = [await self._cambios.get()]
+            try:
+                await asyncio.sleep(VENTANA_ESCRITURA)
+                while not self._cambios.empty():
+                    cambios.append(self._cambios.get_nowait())
+                archivo = self.catalogo.archivo if persistencia.MODO_DIARIO else [list(fila) for fila in self.catalogo.archivo]
+                for motivo in await asyncio.to_thread(_guardar_cambios, self.catalogo, archivo, cambios):
+                    print(f"No se guardó un cambio: {motivo}")
+            except Exception as e:
+                self.error = f"No se pudieron guardar los cambios en disco ({e}). El servidor no acepta más cambios."
+                print(self.error)
+            finally:
+                self._sin_escribir -= len(cambios)
+                for _ in cambios:
+                    self._cambios.task_done()
+
+    async def iniciar(self, puerto: int = PUERTO, ruta_unix: Optional[str] = None) -> asyncio.AbstractServer:
+        '''
+        Empieza a escuchar en 127.0.0.1:puerto, o en un socket Unix si se indica ruta_unix.
+        '''
+        self._escritor = asyncio.create_task(self.escribir_en_disco())
+        if ruta_unix:
+            return await asyncio.start_unix_server(self.atender, path=ruta_unix)
+        return await asyncio.start_server(self.atender, "127.0.0.1", puerto)
+
+    async def detener(self) -> None:
+        '''
+        Espera a que se escriban los cambios pendientes y termina la tarea de fondo.
+        '''
+        await self._cambios.join()
+        if self._escritor is not None:
+            self._escritor.cancel()
+        await asyncio.to_thread(self.catalogo.motor.confirmar)
+        await asyncio.to_thread(ventas.abrir().volcar)
+
+
+def _guardar_cambios(catalogo: Catalogo, archivo: List[List[str]], cambios: List[Tuple[str, tuple]]) -> List[str]:
+    # Devuelve los motivos de los cambios rechazados; cualquier otro error se propaga.
+    if isinstance(catalogo, CatalogoCompartido):
+        return catalogo.guardar_diferidos(cambios, archivo)
+    motor = catalogo.motor
+    rechazados = []
+    with persistencia.agrupar(max_cambios=len(cambios) + 1):
+        for tipo, datos in cambios:
+            try:
+                if tipo == "stock":
+                    motor.guardar_stock(archivo, *datos)
+                elif tipo == "pedido":
+                    motor.guardar_pedido(archivo, *datos)
+                else:
+                    motor.guardar_precio(archivo, *datos)
+            except ValueError as e:
+                # El motor SQLite rechaza los cambios que dejarían el stock fuera de rango; los demás se guardan igual.
+                rechazados.append(str(e))
+    return rechazados
+
+
+def pedir(solicitud: Dict[str, Any], puerto: int = PUERTO, host: str = "127.0.0.1") -> Dict[str, Any]:
+    '''
+    Cliente simple: envía una solicitud al servidor y devuelve la respuesta.
+
+    Parámetros:
+    - solicitud: Diccionario con "op" y los parámetros de la operación.
+    '''
+    with socket.create_connection((host, puerto)) as conexion:
+        conexion.sendall(json.dumps(solicitud).encode("utf-8") + b"\n")
+        with conexion.makefile("rb") as respuesta:
+            return json.loads(respuesta.readline())
+
+
+async def servir(puerto: int = PUERTO, ruta_unix: Optional[str] = None) -> None:
+    '''
+    Carga el catálogo (compartido con las terminales del menú) y atiende clientes hasta que se interrumpa el proceso.
+    '''
+    servidor = ServidorInventario(motores.abrir_catalogo(compartido=True))
+    conexiones = await servidor.iniciar(puerto, ruta_unix)
+    print(f"Servidor de inventario escuchando en {ruta_unix or f'127.0.0.1:{puerto}'}")
+    try:
+        async with conexiones:
+            await conexiones.serve_forever()
+    finally:
+        await servidor.detener()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de inventario de celulares.")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--unix", help="Ruta de un socket Unix en lugar de TCP.")
+    argumentos = parser.parse_args()
+    try:
+        asyncio.run(servir(argumentos.puerto, argumentos.unix))
+    except KeyboardInterrupt:
+        print("Servidor detenido.")
@@ -0,0 +1,285 @@
+import argparse
+import glob
+import heapq
+import os
+from contextlib import contextmanager
+from itertools import groupby, islice
+from typing import List, Dict, Tuple, Optional, Iterator
+
+import persistencia
+import instrumentacion
+from catalogo import Celular, Clave, clave_fila
+from concurrencia import CatalogoCompartido
+
+# Carpeta con el stock de cada sucursal: un archivo "<nombre>.csv" por sucursal, con el formato de
+# "stock_celulares.csv". Se elige con la variable de entorno CELULARES_SUCURSALES.
+CARPETA_SUCURSALES = os.environ.get("CELULARES_SUCURSALES", "sucursales")
+
+
+class MotorSucursal:
+    '''
+    Motor de almacenamiento del CSV de una sucursal: cada cambio se agrega a un diario propio
+    ("<nombre>.csv.diario", con los mismos registros que el diario de persistencia) y el diario se
+    vuelca sobre el CSV al cerrar o al superar persistencia.MAX_REGISTROS_DIARIO registros.
+    '''
+    nombre = "sucursal"
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        self.ruta_diario = ruta + ".diario"
+        self.registros = len(persistencia.leer_diario(self.ruta_diario))
+        # Registros de un lote en curso, que se escriben juntos al terminar (ver lote()).
+        self._lote: Optional[List[str]] = None
+
+    def cargar(self) -> List[List[str]]:
+        '''
+        Lee el CSV de la sucursal y le aplica su diario.
+
+        Postcondiciones:
+        - Devuelve el catálogo con el formato de leer_archivo(), encabezado incluido.
+        '''
+        with persistencia.bloquear(exclusivo=False):
+            return persistencia.aplicar_diario(persistencia.leer_csv(self.ruta), self.ruta_diario)
+
+    def _registrar(self, registro: List[str]) -> None:
+        if self._lote is not None:
+            self._lote.append(";".join(registro) + "\n")
+            return
+        self._escribir([";".join(registro) + "\n"])
+
+    def _escribir(self, lineas: List[str]) -> None:
+        with persistencia.bloquear():
+            persistencia.descartar_linea_incompleta(self.ruta_diario)
+            with open(self.ruta_diario, "a", encoding="utf-8") as diario:
+                diario.writelines(lineas)
+                diario.flush()
+                os.fsync(diario.fileno())
+            self.registros += len(lineas)
+            if self.registros >= persistencia.MAX_REGISTROS_DIARIO:
+                self.compactar()
+
+    @contextmanager
+    def lote(self) -> Iterator[None]:
+        '''
+        Escribe juntos todos los cambios guardados dentro del bloque "with", o ninguno si el bloque termina
+        con una excepción (ver persistencia.lote()).
+        '''
+        if self._lote is not None:
+            yield
+            return
+        self._lote = []
+        try:
+            yield
+            lineas = self._lote
+        finally:
+            self._lote = None
+        if lineas:
+            self._escribir(lineas)
+
+    def guardar_stock(self, archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str,
+                      diferencia: int, nueva_cantidad: int) -> None:
+        self._registrar(["S", marca, modelo, almacenamiento, str(diferencia), str(nueva_cantidad)])
+
+    def guardar_precio(self, archivo: List[List[str]], marca: str, modelo: str, almacenamiento: str, precio: int) -> None:
+        self._registrar(["P", marca, modelo, almacenamiento, str(precio)])
+
+    def guardar_alta(self, archivo: List[List[str]], fila: List[str]) -> None:
+        marca, modelo, cantidad, precio, almacenamiento, anio = list(fila)
+        self._registrar(["A", marca, modelo, almacenamiento, cantidad, precio, anio])
+
+    def guardar_pedido(self, archivo: List[List[str]], cambios: List[Tuple[str, str, str, int, int]]) -> None:
+        # Un pedido es una sola línea del diario: si se corta a la mitad, se ignora entero.
+        self._registrar(persistencia.registro_pedido(cambios))
+
+    def confirmar(self) -> None:
+        '''
+        No hace nada: cada cambio ya se escribe en el diario de la sucursal al guardarlo.
+        '''
+
+    def compactar(self) -> None:
+        '''
+        Vuelca el diario de la sucursal sobre su CSV y lo vacía.
+        '''
+        with persistencia.bloquear():
+            persistencia.escribir_archivo(self.cargar(), self.ruta)
+            open(self.ruta_diario, "w").close()
+            self.registros = 0
+
+    def cerrar(self) -> None:
+        if self.registros:
+            self.compactar()
+
+
+class Sucursal:
+    '''
+    Una sucursal con su stock. El catálogo se carga la primera vez que se usa y es un CatalogoCompartido
+    con la versión del archivo de la sucursal, así que varias terminales pueden trabajar sobre la misma
+    sucursal sin pisarse los cambios.
+    '''
+
+    def __init__(self, nombre: str, ruta: str) -> None:
+        self.nombre = nombre
+        self.motor = MotorSucursal(ruta)
+        self._catalogo: Optional[CatalogoCompartido] = None
+
+    @property
+    def cargada(self) -> bool:
+        return self._catalogo is not None
+
+    @property
+    def catalogo(self) -> CatalogoCompartido:
+        '''
+        Catálogo de la sucursal, al día con los cambios que guardaron otras terminales (ver
+        CatalogoCompartido.refrescar(), que solo compara la versión si nadie cambió el archivo).
+        '''
+        if self._catalogo is None:
+            self._catalogo = CatalogoCompartido.cargar(self.motor.cargar, self.motor, self.motor.ruta, self.motor.ruta_diario)
+            if instrumentacion.ACTIVA:
+                instrumentacion.sumar("Sucursal.cargar", filas=len(self._catalogo))
+        else:
+            self._catalogo.refrescar()
+        return self._catalogo
+
+
+class Sucursales:
+    '''
+    Inventario repartido en sucursales, cada una con su propio archivo de stock.
+
+    Las consultas entre sucursales no juntan los archivos: cada sucursal responde con su catálogo en
+    memoria, ya ordenado por sus propios índices, y los resultados se combinan con una mezcla de k vías
+    (heapq.merge), que solo compara la cabeza de cada sucursal.
+    '''
+
+    def __init__(self, carpeta: str = CARPETA_SUCURSALES) -> None:
+        '''
+        Busca las sucursales de la carpeta sin cargar su stock.
+
+        Postcondiciones:
+        - Hay una sucursal por cada archivo "*.csv" de la carpeta, con el nombre del archivo sin la
+          extensión. Si la carpeta no existe, no hay sucursales.
+        '''
+        self.carpeta = carpeta
+        self.sucursales: Dict[str, Sucursal] = {}
+        for ruta in sorted(glob.glob(os.path.join(glob.escape(carpeta), "*.csv"))):
+            nombre = os.path.splitext(os.path.basename(ruta))[0]
+            self.sucursales[nombre] = Sucursal(nombre, ruta)
+
+    def __bool__(self) -> bool:
+        return bool(self.sucursales)
+
+    def __iter__(self) -> Iterator[Sucursal]:
+        return iter(self.sucursales.values())
+
+    def __getitem__(self, nombre: str) -> Sucursal:
+        return self.sucursales[nombre]
+
+    @instrumentacion.medir
+    def modelos(self, marca: Optional[str] = None, almacenamiento: Optional[int] = None,
+                con_stock: bool = False) -> List[Tuple[Clave, int, int, Dict[str, int]]]:
+        '''
+        Opción 1 entre sucursales: los celulares de una marca y un almacenamiento, uno por clave.
+
+        Postcondiciones:
+        - Devuelve tuplas (clave, stock total, precio mínimo, stock por sucursal), ordenadas por clave.
+        - Cada sucursal recorre su índice de claves ordenadas (ver Catalogo.por_clave()), sin ordenar
+          nada; las listas se mezclan y se agrupan las filas de la misma clave.
+        '''
+        por_sucursal = []
+        for sucursal in self:
+            filas = sucursal.catalogo.por_clave(marca, almacenamiento, con_stock=con_stock)
+            por_sucursal.append([(clave_fila(fila), sucursal.nombre, fila) for fila in filas])
+        resultado = []
+        for clave, grupo in groupby(heapq.merge(*por_sucursal, key=lambda item: item[:2]), key=lambda item: item[0]):
+            grupo = list(grupo)
+            resultado.append((clave, sum(fila.cantidad for _, _, fila in grupo), min(fila.precio for _, _, fila in grupo),
+                              {nombre: fila.cantidad for _, nombre, fila in grupo}))
+        return resultado
+
+    @instrumentacion.medir
+    def presupuesto(self, marca: str, maximo: int, minimo: int = 0, limite: Optional[int] = None) -> List[Tuple[str, Celular]]:
+        '''
+        Opción 5 entre sucursales: los celulares de una marca con precio entre "minimo" y "maximo".
+
+        Postcondiciones:
+        - Devuelve pares (sucursal, celular) ordenados del precio más alto al más bajo.
+        - Cada sucursal recorre su índice de precios de la marca desde el tope del presupuesto (ver
+          Catalogo.buscar_por_precio()) y las listas se mezclan. Con "limite", cada sucursal aporta a lo
+          sumo "limite" filas, porque las demás no pueden quedar entre las primeras.
+        '''
+        por_sucursal = []
+        for sucursal in self:
+            filas = sucursal.catalogo.buscar_por_precio(marca, minimo, maximo, limite, descendente=True)
+            por_sucursal.append([(fila.precio, sucursal.nombre, fila) for fila in filas])
+        mezcla = heapq.merge(*por_sucursal, key=lambda item: item[0], reverse=True)
+        return [(nombre, fila) for _, nombre, fila in islice(mezcla, limite)]
+
+    def disponibilidad(self, marca: str, modelo: str, almacenamiento: str) -> Dict[str, int]:
+        '''
+        Stock de un celular en cada sucursal que lo tiene en su catálogo.
+
+        Postcondiciones:
+        - La marca y el modelo se buscan sin distinguir mayúsculas ni espacios de más (ver Catalogo.resolver()).
+        - Devuelve un diccionario sucursal -> cantidad; cada sucursal responde con su índice de claves.
+        '''
+        disponible = {}
+        for sucursal in self:
+            clave = sucursal.catalogo.resolver(marca, modelo, almacenamiento)
+            if clave is not None:
+                disponible[sucursal.nombre] = sucursal.catalogo.cantidad(*clave)
+        return disponible
+
+    def elegir(self, marca: str, modelo: str, almacenamiento: str, cantidad: int = 1,
+               preferida: Optional[str] = None) -> Optional[Sucursal]:
+        '''
+        Elige la sucursal desde donde vender un celular.
+
+        Postcondiciones:
+        - Si la sucursal preferida tiene al menos "cantidad" unidades, devuelve esa.
+        - Si no, devuelve la que más unidades tiene entre las que alcanzan (a igual stock, la primera por
+          nombre), o None si ninguna tiene stock suficiente.
+        '''
+        disponible = self.disponibilidad(marca, modelo, almacenamiento)
+        if disponible.get(preferida, 0) >= cantidad:
+            return self.sucursales[preferida]
+        candidatas = [(-unidades, nombre) for nombre, unidades in disponible.items() if unidades >= cantidad]
+        return self.sucursales[min(candidatas)[1]] if candidatas else None
+
+    def cerrar(self) -> None:
+        '''
+        Vuelca el diario de cada sucursal cargada sobre su CSV.
+        '''
+        for sucursal in self:
+            if sucursal.cargada:
+                sucursal.motor.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas de stock entre sucursales.")
+    parser.add_argument("--carpeta", default=CARPETA_SUCURSALES)
+    subparsers = parser.add_subparsers(dest="consulta", required=True)
+    modelos = subparsers.add_parser("modelos", help="Celulares de una marca y un almacenamiento en todas las sucursales.")
+    modelos.add_argument("marca")
+    modelos.add_argument("almacenamiento", type=int)
+    presupuesto = subparsers.add_parser("presupuesto", help="Celulares de una marca dentro de un presupuesto.")
+    presupuesto.add_argument("marca")
+    presupuesto.add_argument("maximo", type=int)
+    presupuesto.add_argument("--limite", type=int)
+    disponibilidad = subparsers.add_parser("disponibilidad", help="Stock de un celular en cada sucursal.")
+    disponibilidad.add_argument("marca")
+    disponibilidad.add_argument("modelo")
+    disponibilidad.add_argument("almacenamiento")
+    argumentos = parser.parse_args()
+
+    red = Sucursales(argumentos.carpeta)
+    if argumentos.consulta == "modelos":
+        for (marca, modelo, almacenamiento), total, precio, stock in red.modelos(argumentos.marca, argumentos.almacenamiento):
+            detalle = ", ".join(f"{nombre}: {unidades}" for nombre, unidades in stock.items())
+            print(f"{marca} {modelo} {almacenamiento}GB | Stock total: {total} | Desde ${precio} | {detalle}")
+    elif argumentos.consulta == "presupuesto":
+        for nombre, celular in red.presupuesto(argumentos.marca, argumentos.maximo, limite=argumentos.limite):
+            print(f"{nombre} | {celular.marca} {celular.modelo} {celular.almacenamiento}GB | ${celular.precio} | Stock: {celular.cantidad}")
+    else:
+        disponible = red.disponibilidad(argumentos.marca, argumentos.modelo, argumentos.almacenamiento)
+        for nombre, unidades in disponible.items():
+            print(f"{nombre}: {unidades}")
+        print(f"Total: {sum(disponible.values())}")
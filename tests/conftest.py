@@ -0,0 +1,29 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import persistencia
+import motores
+import ventas
+import funciones
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    '''
+    Trabaja en una carpeta temporal con una copia de "stock_celulares.csv" y sin estado de otras pruebas.
+    '''
+    shutil.copy(os.path.join(RAIZ, persistencia.RUTA_ARCHIVO), tmp_path / persistencia.RUTA_ARCHIVO)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(persistencia, "_estado_diario", {"registros": -1})
+    monkeypatch.setattr(persistencia, "_pendiente", {"registros": [], "archivo": None, "cambios": 0, "desde": 0.0})
+    monkeypatch.setattr(persistencia, "_grupo", {"max_cambios": 1, "ventana": 0.0})
+    monkeypatch.setattr(motores, "_abiertos", {})
+    monkeypatch.setattr(ventas, "_libro", {})
+    monkeypatch.setattr(funciones, "_cache_archivo", {"firma": None, "datos": []})
+    return tmp_path
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+import carga_paralela
+import funciones as fn
+import motores
+import persistencia
+
+
+def _escribir(ruta, lineas):
+    ruta.write_text("".join(linea + "\n" for linea in lineas), encoding="utf-8")
+    return str(ruta)
+
+
+def test_fragmentos_en_paralelo_coinciden_con_un_solo_proceso(carpeta, monkeypatch):
+    lineas = [f"Nokia;Modelo {i};{i % 50 + 1};{100 + i};64;2020" for i in range(3000)]
+    lineas[10] = "Nokia;Modelo 10;x;100;64;2020"
+    lineas[2000] = lineas[5]
+    ruta = _escribir(carpeta / "importar.csv", ["Marca;Modelo;Cantidad;Precio;Almacenamiento;Anio_de_lanzamiento"] + lineas)
+
+    un_proceso = carga_paralela.validar_archivo(ruta, procesos=1)
+    monkeypatch.setattr(carga_paralela, "TAMANIO_MINIMO_PARALELO", 0)
+    monkeypatch.setattr(carga_paralela, "TAMANIO_FRAGMENTO", 4096)
+    assert carga_paralela.validar_archivo(ruta, procesos=2) == un_proceso
+
+    filas, errores = un_proceso
+    assert len(filas) == 2998
+    assert [numero for numero, _ in errores] == [12, 2002]
+    assert errores[1][1] == carga_paralela.REPETIDO
+
+
+def test_fila_rechazada_no_bloquea_la_siguiente_con_la_misma_clave(carpeta):
+    catalogo = motores.abrir_catalogo()
+    ruta = _escribir(carpeta / "importar.csv", [
+        "Iphone;15 Pro Max;48;1199;512;2023",
+        "Iphone;15 Pro Max;2;1199;512;2023",
+        "Iphone;15 Pro Max;1;1199;512;2023",
+        "nokia;3310;4;50;64;2000",
+        "Nokia;3310;4;50;64;2000",
+    ])
+    agregados, combinados, errores = fn.importar_productos(ruta, catalogo, combinar=True)
+    assert (agregados, combinados) == (1, 1)
+    assert errores == ["Línea 1: La cantidad combinada supera 50.",
+                       "Línea 3: " + carga_paralela.REPETIDO,
+                       "Línea 5: " + carga_paralela.REPETIDO]
+    assert catalogo.cantidad("Iphone", "15 Pro Max", "512") == 7
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    assert ["Nokia", "3310", "4", "50", "64", "2000"] in archivo
+    assert ["Iphone", "15 Pro Max", "7", "1199", "512", "2023"] in archivo
+
+
+def test_los_procesos_del_pool_no_importan_funciones():
+    # Cada proceso del pool importa carga_paralela; la validación vive en catalogo para no cargar el menú.
+    resultado = subprocess.run([sys.executable, "-c", "import sys, carga_paralela, comandos; print('funciones' in sys.modules)"],
+                               cwd=os.path.dirname(os.path.abspath(carga_paralela.__file__)), capture_output=True, text=True)
+    assert resultado.stdout.strip() == "False"
+    assert fn.validar_producto is carga_paralela.validar_producto
@@ -0,0 +1,67 @@
+import pytest
+
+import funciones as fn
+import persistencia
+import ventas
+from carrito import Carrito, ErrorCarrito
+from concurrencia import CatalogoCompartido
+
+PRO_MAX = ("Iphone", "15 Pro Max", "512")
+QUINCE = ("Iphone", "15", "512")
+
+
+def _en_disco(*clave):
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    return int(next(fila for fila in archivo[1:] if (fila[0], fila[1], fila[4]) == clave)[2])
+
+
+def test_agregar_cuenta_lo_ya_reservado(carpeta):
+    carrito = Carrito(CatalogoCompartido.cargar())
+    carrito.agregar("iphone", "15 pro max", "512", 3)
+    with pytest.raises(ErrorCarrito):
+        carrito.agregar(*PRO_MAX, 3)
+    assert carrito.items == {PRO_MAX: 3}
+    carrito.quitar(PRO_MAX)
+    assert not carrito and carrito.total() == 0
+
+
+def test_confirmar_vende_todo_y_vacia_el_carrito(carpeta):
+    carrito = Carrito(CatalogoCompartido.cargar())
+    carrito.agregar(*PRO_MAX, 2)
+    carrito.agregar(*QUINCE, 1)
+    antes = _en_disco(*QUINCE)
+    carrito.confirmar("efectivo")
+    assert not carrito
+    assert (_en_disco(*PRO_MAX), _en_disco(*QUINCE)) == (3, antes - 1)
+    assert ventas.abrir().totales(ventas.hoy(), por=("modelo",)) == [
+        {"modelo": "15", "unidades": 1, "ingresos": 899},
+        {"modelo": "15 Pro Max", "unidades": 2, "ingresos": 2398},
+    ]
+
+
+def test_venta_de_otra_terminal_anula_todo_el_pedido(carpeta):
+    carrito = Carrito(CatalogoCompartido.cargar())
+    carrito.agregar(*QUINCE, 1)
+    carrito.agregar(*PRO_MAX, 4)
+    antes = _en_disco(*QUINCE)
+    assert CatalogoCompartido.cargar().actualizar_stock(*PRO_MAX, -3) == 2
+
+    with pytest.raises(ErrorCarrito, match="pedidas 4, hay 2"):
+        carrito.confirmar("tarjeta")
+    assert carrito.items == {QUINCE: 1, PRO_MAX: 4}
+    assert (_en_disco(*PRO_MAX), _en_disco(*QUINCE)) == (2, antes)
+    assert ventas.abrir().totales(ventas.hoy(), por=()) == []
+
+
+def test_compra_permite_quitar_un_celular_antes_de_cobrar(carpeta, monkeypatch):
+    catalogo = CatalogoCompartido.cargar()
+    elegidos = iter([PRO_MAX, QUINCE])
+    respuestas = iter(["s", "q", "1", "n", "tarjeta"])
+    monkeypatch.setattr(fn, "elegir_celular_compra", lambda catalogo: next(elegidos))
+    monkeypatch.setattr(fn, "pedir_cantidad_compra", lambda: 1)
+    monkeypatch.setattr(fn, "tarjeta", lambda total: None)
+    monkeypatch.setattr("builtins.input", lambda mensaje="": next(respuestas))
+    antes = _en_disco(*QUINCE)
+
+    fn.compra(catalogo)
+    assert (_en_disco(*PRO_MAX), _en_disco(*QUINCE)) == (5, antes - 1)
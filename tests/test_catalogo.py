@@ -0,0 +1,170 @@
+import sys
+
+import generador
+import persistencia
+from catalogo import Catalogo, Celular, clave_fila
+
+
+def test_buscar_por_clave_compuesta(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    fila = catalogo.buscar("Iphone", "15 Pro Max", "512")
+    assert fila is not None and fila.cantidad == 5 and fila.precio == 1199
+    assert catalogo.buscar("Iphone", "15 Pro Max", "64") is None
+    assert ("Iphone", "15 Pro ", "512") in catalogo
+
+
+def test_buscar_por_precio_coincide_con_recorrido(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    esperado = sorted((fila.precio for fila in catalogo.filas() if fila.marca.lower() == "samsung" and fila.precio <= 900),
+                      reverse=True)
+    assert [fila.precio for fila in catalogo.buscar_por_precio("SAMSUNG", maximo=900, descendente=True)] == esperado
+    assert len(catalogo.buscar_por_precio("samsung", maximo=900, limite=2)) == min(2, len(esperado))
+
+
+def test_buscar_por_precio_con_minimo_y_limite(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    precios = sorted(fila.precio for fila in catalogo.filas() if fila.marca == "Iphone")
+    medio = precios[len(precios) // 2]
+    assert [fila.precio for fila in catalogo.buscar_por_precio("iphone", minimo=medio)] == [p for p in precios if p >= medio]
+    assert [fila.precio for fila in catalogo.buscar_por_precio("iphone", limite=3)] == precios[:3]
+    assert [fila.precio for fila in catalogo.buscar_por_precio("iphone", minimo=medio, maximo=medio)] == [medio] * precios.count(medio)
+    assert catalogo.buscar_por_precio("iphone", maximo=precios[0] - 1) == []
+    assert catalogo.buscar_por_precio("nokia") == []
+
+
+def test_precio_nuevo_se_reubica_en_el_indice(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    catalogo.fijar_precio("Iphone", "15 Pro Max", "512", 10)
+    assert catalogo.buscar_por_precio("iphone", limite=1)[0].modelo == "15 Pro Max"
+    assert catalogo.buscar("Iphone", "15 Pro Max", "512") not in catalogo.buscar_por_precio("iphone", minimo=11)
+
+
+def test_indices_y_totales_siguen_los_cambios(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    clave = ("Iphone", "15 Pro Max", "512")
+    unidades, valor = catalogo.total
+    catalogo.fijar_precio(*clave, 1)
+    catalogo.fijar_cantidad(*clave, 0)
+    assert catalogo.total == [unidades - 5, valor - 5 * 1199]
+    assert catalogo.buscar_por_precio("iphone", maximo=1)[0].modelo == "15 Pro Max"
+    assert catalogo.buscar("Iphone", "15 Pro Max", "512") not in catalogo.consultar(con_stock=True)
+
+
+def test_consultar_coincide_con_recorrido(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    resultado = catalogo.consultar("samsung", 256, anio_desde=2022, precio_maximo=1000, con_stock=True)
+    esperado = [fila for fila in catalogo.filas() if fila.marca.lower() == "samsung" and fila.almacenamiento == 256
+                and fila.anio >= 2022 and fila.precio <= 1000 and fila.cantidad > 0]
+    assert resultado == esperado
+
+
+def test_por_clave_sigue_ordenado_al_agregar(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    ordenados = lambda filas: sorted(filas, key=lambda fila: (fila[0], fila[1], fila[4]))
+    assert list(catalogo.por_clave("iphone", 512)) == ordenados(catalogo.consultar("iphone", 512))
+    assert catalogo.agregar(["Iphone", "14 Mini", "0", "699", "512", "2022"])
+    assert list(catalogo.por_clave("iphone", 512)) == ordenados(catalogo.consultar("iphone", 512))
+    assert list(catalogo.por_clave("iphone", con_stock=True)) == ordenados(catalogo.consultar("iphone", con_stock=True))
+
+
+def test_agregar_no_duplica_claves(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    filas = len(catalogo)
+    assert not catalogo.agregar(["Iphone", "15 Pro Max", "1", "1", "512", "2023"])
+    assert catalogo.agregar(["Nokia", "3310", "1", "50", "64", "2000"])
+    assert len(catalogo) == filas + 1
+    assert catalogo.buscar_por_precio("nokia")[0].modelo == "3310"
+
+
+def test_resolver_ignora_mayusculas_y_espacios(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    assert catalogo.resolver("iphone", "15  PRO", "512") == ("Iphone", "15 Pro ", "512")
+    assert catalogo.resolver("Iphone", "15 Pro", "512GB") is None
+    assert catalogo.resolver("Iphone", "15 Pro", "64") is None
+
+
+def test_sugerir_por_prefijo_y_con_errores_de_tipeo(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    por_prefijo = catalogo.sugerir("samsung", "galaxy s23", "256")
+    # Primero los que empiezan con lo escrito y después los parecidos ("Galaxy S22...").
+    assert [fila.modelo.strip() for fila in por_prefijo[:3]] == ["Galaxy S23", "Galaxy S23 +", "Galaxy S23 Ultra"]
+    assert "Galaxy S22" in [fila.modelo.strip() for fila in por_prefijo[3:]]
+    assert all(fila.almacenamiento == 256 for fila in por_prefijo)
+    assert catalogo.sugerir("Samsung", "Galxy S23", "256")[0].modelo.strip() == "Galaxy S23"
+    assert catalogo.sugerir("Samsung", "zzzzzz") == []
+
+
+def test_sugerir_con_almacenamiento_no_numerico_no_filtra(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    sugeridos = catalogo.sugerir("Samsung", "Galaxy S23", "512GB")
+    assert sugeridos == catalogo.sugerir("Samsung", "Galaxy S23")
+    assert {fila.almacenamiento for fila in sugeridos} == {128, 256, 512}
+
+
+def _recontar(catalogo):
+    # Facetas y totales por marca calculados recorriendo todas las filas.
+    facetas, totales = {}, {}
+    for i, fila in enumerate(catalogo.archivo[1:], start=1):
+        facetas.setdefault(fila.marca.lower(), set()).add(i)
+        total = totales.setdefault(fila.marca.lower(), [0, 0])
+        total[0] += fila.cantidad
+        total[1] += fila.cantidad * fila.precio
+    return facetas, totales
+
+
+def test_facetas_y_totales_por_marca_usan_la_misma_clave(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    catalogo.agregar(["IPHONE", "SE", "3", "429", "128", "2022"])
+    catalogo.modificar_cantidad("Iphone", "15 Pro Max", "512", -2)
+    catalogo.fijar_precio("Samsung", "Galaxy S23", "256", 700)
+    facetas, totales = _recontar(catalogo)
+    assert catalogo.facetas["marca"] == facetas
+    assert catalogo.totales["marca"] == totales
+    assert catalogo.resumen_inventario()["marca"] == dict(sorted(totales.items()))
+    assert catalogo.total == [sum(total[0] for total in totales.values()), sum(total[1] for total in totales.values())]
+    assert catalogo.buscar("IPHONE", "SE", "128") in catalogo.consultar("iphone", 128)
+
+
+def test_celular_se_usa_como_fila_de_cadenas(carpeta):
+    fila = ["Iphone", "15 Pro Max", "5", "$1199 ", "512", "2023"]
+    celular = Celular.desde_fila(fila)
+    assert (celular.cantidad, celular.precio, celular.almacenamiento, celular.anio) == (5, 1199, 512, 2023)
+    assert celular[2] == "5" and celular[0:2] == ["Iphone", "15 Pro Max"] and len(celular) == 6
+    assert ";".join(celular) == "Iphone;15 Pro Max;5;1199;512;2023"
+    assert celular == ["Iphone", "15 Pro Max", "5", "1199", "512", "2023"]
+    celular[2] = "7"
+    assert celular.cantidad == 7
+    assert not hasattr(celular, "__dict__")
+
+
+def test_catalogo_convierte_las_filas_una_sola_vez(carpeta):
+    archivo = persistencia.leer_csv()
+    catalogo = Catalogo(archivo)
+    assert all(isinstance(fila, Celular) for fila in archivo[1:]) and catalogo.archivo is archivo
+    modelos = {fila.modelo for fila in catalogo.filas()}
+    assert all(sys.intern(modelo) is modelo for modelo in modelos)
+    assert Catalogo(archivo).archivo[1] is archivo[1]
+
+
+def test_consultas_por_facetas_coinciden_con_recorrido_en_catalogo_sintetico(carpeta):
+    generador.generar_catalogo("sintetico.csv", 3000, semilla=3)
+    catalogo = Catalogo(persistencia.leer_csv("sintetico.csv"))
+    catalogo.fijar_cantidad(*clave_fila(catalogo.archivo[1]), 0)
+    catalogo.agregar(["Nokia", "Nuevo", "4", "321", "64", "2024"])
+    filtros = [
+        {"marca": "samsung"},
+        {"almacenamiento": 256, "con_stock": True},
+        {"anio_desde": 2020, "anio_hasta": 2021, "precio_maximo": 700},
+        {"marca": "NOKIA", "almacenamiento": 64, "anio_desde": 2024},
+        {"precio_minimo": 2000, "con_stock": True},
+        {"marca": "iphone", "anio_hasta": 2014, "precio_minimo": 100, "precio_maximo": 1500},
+    ]
+    for filtro in filtros:
+        esperado = [fila for fila in catalogo.filas()
+                    if ("marca" not in filtro or fila.marca.lower() == filtro["marca"].lower())
+                    and ("almacenamiento" not in filtro or fila.almacenamiento == filtro["almacenamiento"])
+                    and filtro.get("anio_desde", 0) <= fila.anio <= filtro.get("anio_hasta", 9999)
+                    and filtro.get("precio_minimo", 0) <= fila.precio <= filtro.get("precio_maximo", 10 ** 9)
+                    and (not filtro.get("con_stock") or fila.cantidad > 0)]
+        assert catalogo.consultar(**filtro) == esperado, filtro
+    assert catalogo.con_stock == {i for i, fila in enumerate(catalogo.archivo[1:], start=1) if fila.cantidad > 0}
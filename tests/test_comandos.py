@@ -0,0 +1,54 @@
+import json
+
+import comandos
+import motores
+import persistencia
+from concurrencia import CatalogoCompartido
+
+PRO_MAX = {"marca": "iphone", "modelo": "15 pro max", "almacenamiento": "512"}
+
+
+def _lineas(*comandos_json):
+    return [json.dumps(comando) for comando in comandos_json]
+
+
+def _cantidad_en_disco(marca, modelo, almacenamiento):
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    return int(next(fila for fila in archivo[1:] if (fila[0], fila[1], fila[4]) == (marca, modelo, almacenamiento))[2])
+
+
+def test_comandos_parten_del_stock_que_dejo_otra_terminal(carpeta):
+    catalogo = motores.abrir_catalogo(compartido=True)
+    # Otra terminal vende después de que se cargó el catálogo.
+    CatalogoCompartido.cargar().actualizar_stock("Iphone", "15 Pro Max", "512", -4)
+    resultados = list(comandos.procesar(_lineas({"cmd": "stock", **PRO_MAX, "diferencia": -1},
+                                                {"cmd": "stock", **PRO_MAX, "diferencia": -1}), catalogo))
+    assert [resultado["ok"] for resultado in resultados] == [True, False]
+    assert resultados[0]["resultado"] == 0
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 0
+
+
+def test_tramo_se_guarda_junto(carpeta):
+    catalogo = motores.abrir_catalogo(compartido=True)
+    en_disco = []
+
+    def lineas():
+        yield json.dumps({"cmd": "stock", **PRO_MAX, "diferencia": -1})
+        # El primer cambio todavía no se escribió: se guarda con el resto del tramo.
+        en_disco.append(_cantidad_en_disco("Iphone", "15 Pro Max", "512"))
+        yield json.dumps({"cmd": "price", **PRO_MAX, "precio": 1099})
+
+    resultados = list(comandos.procesar(lineas(), catalogo))
+    assert [resultado["linea"] for resultado in resultados] == [1, 2] and en_disco == [5]
+    assert len(persistencia.leer_diario()) == 2
+    assert ["Iphone", "15 Pro Max", "4", "1099", "512", "2023"] in persistencia.aplicar_diario(persistencia.leer_csv())
+
+
+def test_puntos_de_control_guardan_cada_tramo(carpeta):
+    catalogo = motores.abrir_catalogo(compartido=True)
+    resultados = comandos.procesar(_lineas({"cmd": "stock", **PRO_MAX, "diferencia": -1},
+                                           {"cmd": "stock", **PRO_MAX, "diferencia": -1}), catalogo, cada=1)
+    assert next(resultados)["resultado"] == 4
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 4
+    assert next(resultados)["resultado"] == 3
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 3
@@ -0,0 +1,87 @@
+import funciones as fn
+import persistencia
+from concurrencia import CatalogoCompartido
+
+CLAVE = ("Iphone", "15 Pro Max", "512")
+
+
+def _en_disco(*clave):
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    return next(fila for fila in archivo[1:] if (fila[0], fila[1], fila[4]) == clave)
+
+
+def test_cambios_de_dos_terminales_no_se_pisan(carpeta):
+    terminal_a = CatalogoCompartido.cargar()
+    terminal_b = CatalogoCompartido.cargar()
+    assert terminal_b.actualizar_stock(*CLAVE, 5) == 10
+    assert terminal_a.actualizar_stock(*CLAVE, 1) == 11
+    assert _en_disco(*CLAVE)[2] == "11"
+
+
+def test_lote_con_catalogo_desactualizado_no_pierde_cambios(carpeta):
+    terminal_a = CatalogoCompartido.cargar()
+    terminal_b = CatalogoCompartido.cargar()
+    terminal_b.actualizar_stock(*CLAVE, 5)
+
+    aplicados, errores = fn.aplicar_lote([["Iphone", "15 Pro Max", "512", "stock", "+1"]], terminal_a)
+    assert (aplicados, errores) == (1, [])
+    assert terminal_a.cantidad(*CLAVE) == 11
+    assert _en_disco(*CLAVE)[2] == "11"
+
+
+def test_lote_valida_contra_el_stock_vigente(carpeta):
+    terminal_a = CatalogoCompartido.cargar()
+    terminal_b = CatalogoCompartido.cargar()
+    terminal_b.actualizar_stock(*CLAVE, 45)
+
+    aplicados, errores = fn.aplicar_lote([["Iphone", "15 Pro Max", "512", "stock", "+1"]], terminal_a)
+    assert aplicados == 0 and "quedaría en 51" in errores[0]
+    assert _en_disco(*CLAVE)[2] == "50"
+
+
+def test_importar_con_catalogo_desactualizado(carpeta):
+    terminal_a = CatalogoCompartido.cargar()
+    terminal_b = CatalogoCompartido.cargar()
+    terminal_b.actualizar_stock(*CLAVE, 5)
+    terminal_b.dar_de_alta(["Nokia", "3310", "2", "50", "64", "2000"])
+    (carpeta / "importar.csv").write_text("Iphone;15 Pro Max;3;1199;512;2023\nNokia;3310;1;50;64;2000\n")
+
+    agregados, combinados, errores = fn.importar_productos("importar.csv", terminal_a, combinar=True)
+    assert (agregados, combinados, errores) == (0, 2, [])
+    assert _en_disco(*CLAVE)[2] == "13"
+    assert _en_disco("Nokia", "3310", "64")[2] == "3"
+
+
+def test_refrescar_trae_los_cambios_de_otra_terminal(carpeta):
+    terminal_a = CatalogoCompartido.cargar()
+    terminal_b = CatalogoCompartido.cargar()
+    terminal_b.actualizar_precio(*CLAVE, 999)
+    terminal_b.dar_de_alta(["Nokia", "3310", "2", "50", "64", "2000"])
+    terminal_a.refrescar()
+    assert terminal_a.precio(*CLAVE) == 999
+    assert ("Nokia", "3310", "64") in terminal_a
+
+
+def test_guardar_diferidos_recalcula_sobre_el_stock_de_otra_terminal(carpeta):
+    servidor = CatalogoCompartido.cargar()
+    nueva = servidor.modificar_cantidad(*CLAVE, -1)
+    servidor.fijar_precio(*CLAVE, 1099)
+    CatalogoCompartido.cargar().actualizar_stock(*CLAVE, -3)
+
+    assert servidor.guardar_diferidos([("stock", CLAVE + (-1, nueva)), ("precio", CLAVE + (1099,))]) == []
+    assert _en_disco(*CLAVE)[2:4] == ["1", "1099"]
+    servidor.refrescar()
+    assert (servidor.cantidad(*CLAVE), servidor.precio(*CLAVE)) == (1, 1099)
+
+
+def test_guardar_diferidos_rechaza_el_pedido_que_ya_no_alcanza(carpeta):
+    servidor = CatalogoCompartido.cargar()
+    quince = ("Iphone", "15", "512")
+    cambios = servidor.descontar({CLAVE: 2, quince: 1})
+    CatalogoCompartido.cargar().actualizar_stock(*CLAVE, -4)
+
+    rechazados = servidor.guardar_diferidos([("pedido", (cambios,))])
+    assert len(rechazados) == 1 and "15 Pro Max" in rechazados[0]
+    assert (_en_disco(*CLAVE)[2], _en_disco(*quince)[2]) == ("1", "10")
+    servidor.refrescar()
+    assert servidor.cantidad(*CLAVE) == 1
@@ -0,0 +1,117 @@
+import os
+
+import funciones as fn
+import instrumentacion
+import motores
+import persistencia
+from concurrencia import CatalogoCompartido
+
+
+def test_cache_se_invalida_al_cambiar_el_stock(carpeta, monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    primera = fn.leer_archivo_cacheado()
+    assert fn.leer_archivo_cacheado() is primera
+
+    motores.abrir_catalogo().actualizar_stock("Iphone", "15 Pro Max", "512", 1)
+    segunda = fn.leer_archivo_cacheado()
+    assert segunda is not primera
+    assert instrumentacion.metricas["cache_stock.aciertos"]["llamadas"] == 1
+    assert instrumentacion.metricas["cache_stock.fallos"]["llamadas"] == 2
+    assert "cache_stock.aciertos" in instrumentacion.resumen()
+
+
+def test_modelos_cel_coincide_con_el_stock_completo(carpeta):
+    catalogo = motores.abrir_catalogo()
+    catalogo.actualizar_stock("Samsung", "Galaxy S23", "256", 2)
+    archivo = fn.leer_archivo()
+    for marca in ("Iphone", "Samsung", "Xiaomi"):
+        for almacenamiento in ("128", "256", "512"):
+            esperado = [list(fila) for fila in archivo[1:] if fila[0] == marca and fila[4] == almacenamiento]
+            assert fn.modelos_cel(marca, almacenamiento) == esperado
+
+
+def test_abrir_catalogo_sin_csv_avisa(carpeta, capsys):
+    os.remove(carpeta / "stock_celulares.csv")
+    assert fn.abrir_catalogo(motores.abrir("csv")) is None
+    assert capsys.readouterr().out == "El archivo no se encontró.\n"
+
+
+def test_abrir_catalogo_con_la_base_vacia_avisa(carpeta, capsys):
+    motor = motores.MotorSQLite(str(carpeta / "vacia.db"))
+    try:
+        assert fn.abrir_catalogo(motor) is None
+        assert "python motores.py csv sqlite" in capsys.readouterr().out
+        motores.convertir(motores.MotorCSV(), motor)
+        assert len(fn.abrir_catalogo(motor)) == len(fn.leer_archivo()) - 1
+    finally:
+        motor.cerrar()
+
+
+def _importar(carpeta, *filas):
+    ruta = carpeta / "nuevos.csv"
+    ruta.write_text("".join(";".join(fila) + "\n" for fila in filas))
+    return fn.importar_productos(str(ruta), motores.abrir_catalogo(compartido=True))
+
+
+def test_importar_guarda_las_altas_en_el_diario(carpeta):
+    csv = (carpeta / "stock_celulares.csv").read_bytes()
+    otra = CatalogoCompartido.cargar()
+    agregados, _, errores = _importar(carpeta, ["Nokia", "3310", "4", "50", "64", "2000"],
+                                      ["Nokia", "105", "2", "30", "64", "2019"])
+    assert (agregados, errores) == (2, [])
+    assert (carpeta / "stock_celulares.csv").read_bytes() == csv
+    assert [registro[0] for registro in persistencia.leer_diario()] == ["A", "A"]
+    # Las otras terminales ven las altas como cualquier otro cambio del diario.
+    otra.refrescar()
+    assert otra.cantidad("Nokia", "3310", "64") == 4
+
+
+def test_importar_sin_diario_reescribe_el_csv(carpeta, monkeypatch):
+    monkeypatch.setattr(persistencia, "MODO_DIARIO", False)
+    agregados, _, _ = _importar(carpeta, ["Nokia", "3310", "4", "50", "64", "2000"])
+    assert agregados == 1 and not os.path.exists(persistencia.RUTA_DIARIO)
+    assert ["Nokia", "3310", "4", "50", "64", "2000"] in persistencia.leer_csv()
+    assert not [nombre for nombre in os.listdir(carpeta) if nombre.endswith(".tmp")]
+
+
+def test_aplicar_lote_archivo_valida_cada_linea(carpeta):
+    (carpeta / "cambios.csv").write_bytes("﻿Iphone;15 Pro Max;512;stock;-3\r\n"
+                                          "Iphone;15 Pro Max;512;stock;-3\r\n"
+                                          "\r\n"
+                                          "Iphone;15 Plus;512;precio;950\r\n".encode("utf-8"))
+    catalogo = motores.abrir_catalogo()
+    aplicados, errores = fn.aplicar_lote_archivo(str(carpeta / "cambios.csv"), catalogo)
+    assert aplicados == 2 and len(errores) == 1 and errores[0].startswith("Línea 2")
+    assert ["Iphone", "15 Pro Max", "2", "1199", "512", "2023"] in persistencia.cargar()
+    assert ["Iphone", "15 Plus", "8", "950", "512", "2023"] in persistencia.cargar()
+
+
+def test_opcion_de_lotes_informa_el_resultado(carpeta, monkeypatch, capsys):
+    (carpeta / "cambios.csv").write_text("Iphone;15 Pro Max;512;stock;+1\n")
+    monkeypatch.setattr("builtins.input", lambda _: str(carpeta / "cambios.csv"))
+    fn.actualizar_por_lotes(motores.abrir_catalogo())
+    assert capsys.readouterr().out == "Cambios aplicados: 1. Errores: 0.\n"
+    monkeypatch.setattr("builtins.input", lambda _: str(carpeta / "no_existe.csv"))
+    fn.actualizar_por_lotes(motores.abrir_catalogo())
+    assert capsys.readouterr().out == "No se pudo leer el archivo.\n"
+
+
+def test_opcion_1_lee_el_stock_una_sola_vez(carpeta, monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    marcas = fn.lista_celulares()
+    assert fn.modelos_cel(marcas[0], "512")
+    assert instrumentacion.metricas["cache_stock.fallos"]["llamadas"] == 1
+    assert "leer_filtrado" not in instrumentacion.metricas
+
+
+def test_presupuesto_lista_del_mas_caro_al_mas_barato(carpeta, monkeypatch, capsys):
+    respuestas = iter(["900", "samsung"])
+    monkeypatch.setattr("builtins.input", lambda _: next(respuestas))
+    fn.presupuesto(motores.abrir_catalogo())
+    lineas = capsys.readouterr().out.splitlines()[1:]
+    precios = [int(linea.rsplit("Precio: ", 1)[1]) for linea in lineas]
+    esperados = sorted((int(fila[3]) for fila in fn.leer_archivo()[1:] if fila[0] == "Samsung" and int(fila[3]) <= 900),
+                       reverse=True)
+    assert precios == esperados and precios
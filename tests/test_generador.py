@@ -0,0 +1,20 @@
+import benchmark
+import carga_paralela
+import generador
+
+
+def test_catalogo_sintetico_es_valido_y_repetible(carpeta):
+    generador.generar_catalogo("sintetico.csv", 2000, semilla=7)
+    filas, errores = carga_paralela.validar_archivo("sintetico.csv", procesos=1)
+    assert errores == [] and len(filas) == 2000
+    assert len({fila[0] for _, fila in filas}) == len(generador.MARCAS)
+    assert list(generador.generar_filas(50, semilla=7)) == [fila for _, fila in filas[:50]]
+    assert list(generador.generar_filas(50, semilla=8)) != [fila for _, fila in filas[:50]]
+
+
+def test_benchmark_mide_cada_operacion(carpeta):
+    resultados = benchmark.correr_tamanio(300, 3, 0)
+    operaciones = {resultado["operacion"] for resultado in resultados}
+    assert {"leer_archivo", "modelos_cel", "presupuesto", "modificar_stock", "compra"} <= operaciones
+    assert all(resultado["filas"] == 300 and resultado["repeticiones"] >= 1 for resultado in resultados)
+    assert next(resultado for resultado in resultados if resultado["operacion"] == "leer_archivo")["memoria_mb"] > 0
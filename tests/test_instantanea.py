@@ -0,0 +1,49 @@
+import os
+
+import instantanea
+import persistencia
+from catalogo import Catalogo
+
+
+def test_instantanea_tiene_las_mismas_filas_que_el_csv(carpeta):
+    archivo = persistencia.leer_csv()
+    instantanea.exportar(archivo)
+    assert instantanea.esta_vigente()
+    assert instantanea.cargar_si_vigente() == archivo
+
+    abierta = instantanea.Instantanea()
+    try:
+        assert abierta.columna("marca") == [fila[0] for fila in archivo[1:]]
+        assert abierta.columna("precio") == [int(fila[3]) for fila in archivo[1:]]
+        assert abierta.fila(0) == archivo[1]
+    finally:
+        abierta.cerrar()
+
+
+def test_instantanea_con_cambios_en_el_diario_no_se_usa(carpeta):
+    instantanea.exportar(persistencia.leer_csv())
+    Catalogo(persistencia.leer_csv()).actualizar_stock("Iphone", "15 Pro Max", "512", 1)
+    assert not instantanea.esta_vigente()
+    assert instantanea.cargar_si_vigente() == []
+
+
+def test_instantanea_cortada_no_se_usa(carpeta):
+    instantanea.exportar(persistencia.leer_csv())
+    with open(instantanea.RUTA_INSTANTANEA, "r+b") as archivo:
+        archivo.truncate(100)
+    assert not instantanea.esta_vigente()
+    assert instantanea.cargar_si_vigente() == []
+
+
+def test_instantanea_sigue_vigente_con_el_diario_vacio(carpeta):
+    open(persistencia.RUTA_DIARIO, "w").close()
+    instantanea.exportar(persistencia.leer_csv())
+    assert instantanea.esta_vigente()
+    assert not [nombre for nombre in os.listdir(carpeta) if nombre.endswith(".tmp")]
+
+
+def test_importar_reconstruye_el_csv(carpeta):
+    archivo = persistencia.leer_csv()
+    instantanea.exportar(archivo)
+    instantanea.importar(ruta_csv="reconstruido.csv")
+    assert persistencia.leer_csv("reconstruido.csv") == archivo
@@ -0,0 +1,45 @@
+import json
+
+import funciones as fn
+import instrumentacion
+
+
+def _doble(valor):
+    return 2 * valor
+
+
+def test_apagada_no_envuelve_ni_cuenta(monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", False)
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    assert instrumentacion.medir(_doble) is _doble
+
+
+def test_activa_cuenta_llamadas_filas_y_bytes(monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    medida = instrumentacion.medir(_doble)
+    assert medida(3) == 6 and medida.__name__ == "_doble"
+    medida(4)
+    instrumentacion.sumar("_doble", filas=10, bytes_leidos=100)
+    instrumentacion.contar("cache", 2)
+    assert instrumentacion.metricas["_doble"]["llamadas"] == 2 and instrumentacion.metricas["_doble"]["segundos"] >= 0
+    assert (instrumentacion.metricas["_doble"]["filas"], instrumentacion.metricas["_doble"]["bytes_leidos"]) == (10, 100)
+    assert instrumentacion.metricas["cache"]["llamadas"] == 2
+
+
+def test_resumen_en_json_o_tabla(monkeypatch):
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    instrumentacion.contar("leer_archivo")
+    monkeypatch.setattr(instrumentacion, "FORMATO", "json")
+    assert json.loads(instrumentacion.resumen())["leer_archivo"]["llamadas"] == 1
+    monkeypatch.setattr(instrumentacion, "FORMATO", "tabla")
+    assert instrumentacion.resumen().splitlines()[1].split()[:2] == ["leer_archivo", "1"]
+
+
+def test_lectura_del_stock_suma_filas_y_bytes(carpeta, monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    monkeypatch.setattr(instrumentacion, "metricas", {})
+    archivo = fn.leer_archivo()
+    leidas = instrumentacion.metricas["leer_csv"]
+    assert leidas["filas"] >= len(archivo) - 1
+    assert leidas["bytes_leidos"] == (carpeta / "stock_celulares.csv").stat().st_size
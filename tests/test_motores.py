@@ -0,0 +1,79 @@
+import pytest
+
+import funciones as fn
+import motores
+import persistencia
+from catalogo import Catalogo
+
+
+@pytest.fixture
+def sqlite(carpeta):
+    motor = motores.MotorSQLite(str(carpeta / "stock.db"))
+    motores.convertir(motores.MotorCSV(), motor)
+    yield motor
+    motor.cerrar()
+
+
+def _cantidad(motor, marca, modelo, almacenamiento):
+    return next(int(fila[2]) for fila in motor.cargar()[1:] if (fila[0], fila[1], fila[4]) == (marca, modelo, almacenamiento))
+
+
+def test_convertir_copia_todas_las_filas(sqlite):
+    assert sqlite.cargar() == motores.MotorCSV().cargar()
+
+
+def test_cambios_de_stock_de_dos_terminales_se_suman(sqlite):
+    una, otra = Catalogo(sqlite.cargar(), sqlite), Catalogo(sqlite.cargar(), sqlite)
+    una.actualizar_stock("Iphone", "15 Pro Max", "512", 3)
+    otra.actualizar_stock("Iphone", "15 Pro Max", "512", -2)
+    assert _cantidad(sqlite, "Iphone", "15 Pro Max", "512") == 6
+
+
+def test_stock_fuera_de_rango_en_la_base_se_rechaza(sqlite):
+    una, otra = Catalogo(sqlite.cargar(), sqlite), Catalogo(sqlite.cargar(), sqlite)
+    assert una.actualizar_stock("Iphone", "15 Pro Max", "512", -5) == 0
+    with pytest.raises(ValueError):
+        otra.actualizar_stock("Iphone", "15 Pro Max", "512", -3)
+    assert otra.cantidad("Iphone", "15 Pro Max", "512") == 5
+    assert _cantidad(sqlite, "Iphone", "15 Pro Max", "512") == 0
+
+    assert una.actualizar_stock("Iphone", "15 Pro Max", "512", 50) == 50
+    with pytest.raises(ValueError):
+        otra.actualizar_stock("Iphone", "15 Pro Max", "512", 1)
+    assert _cantidad(sqlite, "Iphone", "15 Pro Max", "512") == 50
+
+
+def test_pedido_sin_stock_en_la_base_no_guarda_nada(sqlite):
+    una, otra = Catalogo(sqlite.cargar(), sqlite), Catalogo(sqlite.cargar(), sqlite)
+    una.actualizar_stock("Iphone", "15 Pro Max", "512", -5)
+    pedido = {("Iphone", "15", "512"): 1, ("Iphone", "15 Pro Max", "512"): 2}
+    with pytest.raises(ValueError):
+        otra.vender(pedido)
+    assert otra.cantidad("Iphone", "15", "512") == _cantidad(sqlite, "Iphone", "15", "512")
+    assert _cantidad(sqlite, "Iphone", "15 Pro Max", "512") == 0
+
+
+def test_lote_rechazado_por_la_base_no_guarda_nada(sqlite):
+    una, otra = Catalogo(sqlite.cargar(), sqlite), Catalogo(sqlite.cargar(), sqlite)
+    una.actualizar_stock("Iphone", "15 Pro Max", "512", -5)
+    aplicados, errores = fn.aplicar_lote([["Iphone", "15 Plus", "512", "stock", "-1"],
+                                          ["Iphone", "15 Plus", "512", "precio", "950"],
+                                          ["Iphone", "15 Pro Max", "512", "stock", "-2"]], otra)
+    assert aplicados == 0 and len(errores) == 1 and "No se aplicó ningún cambio" in errores[0]
+    assert (_cantidad(sqlite, "Iphone", "15 Plus", "512"), _cantidad(sqlite, "Iphone", "15 Pro Max", "512")) == (8, 0)
+    assert (otra.cantidad("Iphone", "15 Plus", "512"), otra.precio("Iphone", "15 Plus", "512")) == (8, 999)
+    assert otra.cantidad("Iphone", "15 Pro Max", "512") == 0
+
+
+def test_lote_csv_que_falla_no_escribe_el_diario(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+
+    def cambio():
+        nueva = catalogo.modificar_cantidad("Iphone", "15 Plus", "512", -1)
+        catalogo.motor.guardar_stock(catalogo.archivo, "Iphone", "15 Plus", "512", -1, nueva)
+        raise ValueError("falla a mitad del lote")
+
+    with pytest.raises(ValueError):
+        catalogo.en_lote(cambio)
+    assert persistencia.leer_diario() == [] and persistencia._pendiente["registros"] == []
+    assert catalogo.cantidad("Iphone", "15 Plus", "512") == 8
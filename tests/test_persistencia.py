@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pytest
+
+import persistencia
+from catalogo import Catalogo
+
+
+def _fila(archivo, marca, modelo, almacenamiento):
+    return next(fila for fila in archivo[1:] if (fila[0], fila[1], fila[4]) == (marca, modelo, almacenamiento))
+
+
+def test_diario_se_reproduce_sobre_el_csv(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", -2)
+    catalogo.actualizar_precio("Iphone", "15 Plus", "512", 950)
+    catalogo.dar_de_alta(["Nokia", "3310", "4", "50", "64", "2000"])
+
+    assert _fila(persistencia.leer_csv(), "Iphone", "15 Pro Max", "512")[2] == "5"
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    assert _fila(archivo, "Iphone", "15 Pro Max", "512")[2] == "3"
+    assert _fila(archivo, "Iphone", "15 Plus", "512")[3] == "950"
+    assert _fila(archivo, "Nokia", "3310", "64") == ["Nokia", "3310", "4", "50", "64", "2000"]
+
+
+def test_compactar_vuelca_el_diario(carpeta):
+    Catalogo(persistencia.leer_csv()).actualizar_stock("Iphone", "15 Pro Max", "512", 3)
+    persistencia.compactar()
+    assert os.path.getsize(persistencia.RUTA_DIARIO) == 0
+    assert _fila(persistencia.leer_csv(), "Iphone", "15 Pro Max", "512")[2] == "8"
+
+
+def test_linea_cortada_del_diario_se_ignora(carpeta):
+    persistencia.registrar_pedido([("Iphone", "15 Pro Max", "512", -1, 4), ("Iphone", "15", "512", -2, 8)])
+    with open(persistencia.RUTA_DIARIO, "a", encoding="utf-8") as diario:
+        diario.write("V;Iphone;15 Plus;512;-8;0;Iphone;15;512")
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    assert _fila(archivo, "Iphone", "15 Pro Max", "512")[2] == "4"
+    assert _fila(archivo, "Iphone", "15", "512")[2] == "8"
+    assert _fila(archivo, "Iphone", "15 Plus", "512")[2] == "8"
+
+
+def test_pedido_cortado_se_ignora_entero_aunque_despues_se_escriba_otro(carpeta):
+    with open(persistencia.RUTA_DIARIO, "w", encoding="utf-8") as diario:
+        diario.write("V;Iphone;15 Pro Max;512;-5;0;Iphone;15;512;-2")
+    persistencia.registrar_pedido([("Iphone", "15 Plus", "512", -1, 7), ("Iphone", "15", "512", -1, 9)])
+    persistencia.registrar_pedido([("Iphone", "15 Pro Max", "512", -1, 4)])
+
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    assert [_fila(archivo, "Iphone", modelo, "512")[2] for modelo in ("15 Pro Max", "15 Plus", "15")] == ["4", "7", "9"]
+    assert len(persistencia.leer_diario()) == 3
+
+
+def test_registro_despues_de_una_linea_cortada_no_queda_pegado(carpeta):
+    with open(persistencia.RUTA_DIARIO, "w", encoding="utf-8") as diario:
+        diario.write("S;Iphone;15 Pro Max;512;-1;4\nV;Iphone;15 Pro Max;512;-4;0;Iphone;15")
+    Catalogo(persistencia.leer_csv()).actualizar_stock("Iphone", "15 Plus", "512", -1)
+
+    with open(persistencia.RUTA_DIARIO, encoding="utf-8") as diario:
+        assert diario.read() == "S;Iphone;15 Pro Max;512;-1;4\nS;Iphone;15 Plus;512;-1;7\n"
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    assert _fila(archivo, "Iphone", "15 Pro Max", "512")[2] == "4"
+    assert _fila(archivo, "Iphone", "15 Plus", "512")[2] == "7"
+
+
+def test_agrupar_escribe_una_sola_vez(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    with persistencia.agrupar():
+        catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", 1)
+        catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", 1)
+        assert not os.path.exists(persistencia.RUTA_DIARIO)
+    assert len(persistencia.leer_diario()) == 2
+
+
+def test_grupo_se_confirma_al_completarse(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    with persistencia.agrupar(max_cambios=2, ventana=3600.0):
+        catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", -1)
+        assert not os.path.exists(persistencia.RUTA_DIARIO)
+        catalogo.actualizar_stock("Iphone", "15 Plus", "512", -1)
+        assert len(persistencia.leer_diario()) == 2
+        catalogo.actualizar_stock("Iphone", "15 Plus", "512", -1)
+        assert len(persistencia.leer_diario()) == 2
+    assert len(persistencia.leer_diario()) == 3
+
+
+def test_grupo_se_confirma_al_vencer_la_ventana_sin_mas_cambios(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    with persistencia.agrupar(max_cambios=100, ventana=0.05):
+        catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", -1)
+        limite = time.monotonic() + 5
+        # El temporizador crea el diario antes de escribirlo: se espera al registro, no al archivo.
+        while not persistencia.leer_diario() and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert persistencia.leer_diario() == [["S", "Iphone", "15 Pro Max", "512", "-1", "4"]]
+        assert persistencia._pendiente["cambios"] == 0
+
+
+def test_leer_filtrado_aplica_el_diario_con_cualquier_ruta(carpeta):
+    catalogo = Catalogo(persistencia.leer_csv())
+    catalogo.actualizar_stock("Iphone", "15 Pro Max", "512", -5)
+    catalogo.dar_de_alta(["Iphone", "SE", "3", "429", "512", "2022"])
+    for ruta in (persistencia.RUTA_ARCHIVO, "./" + persistencia.RUTA_ARCHIVO, str(carpeta / persistencia.RUTA_ARCHIVO)):
+        filas = list(persistencia.leer_filtrado(ruta, marca="Iphone", almacenamiento="512"))
+        assert ["Iphone", "15 Pro Max", "0", "1199", "512", "2023"] in filas
+        assert ["Iphone", "SE", "3", "429", "512", "2022"] in filas
+
+
+@pytest.mark.skipif(persistencia.fcntl is None, reason="requiere fcntl")
+def test_bloqueo_entre_hilos_no_se_comparte(carpeta):
+    adentro = [threading.Event(), threading.Event()]
+    salir = [threading.Event(), threading.Event()]
+
+    def hilo(numero):
+        if numero == 1:
+            adentro[0].wait(5)
+        with persistencia.bloquear():
+            adentro[numero].set()
+            salir[numero].wait(5)
+
+    hilos = [threading.Thread(target=hilo, args=(numero,)) for numero in (0, 1)]
+    for h in hilos:
+        h.start()
+    assert adentro[0].wait(5)
+    assert not adentro[1].wait(0.2)
+    salir[0].set()
+    assert adentro[1].wait(5)
+
+    # Mientras el segundo hilo está adentro, otro proceso (otro archivo abierto) no puede tomar el bloqueo.
+    with open(persistencia.RUTA_BLOQUEO, "a+b") as otro:
+        with pytest.raises(BlockingIOError):
+            persistencia.fcntl.flock(otro.fileno(), persistencia.fcntl.LOCK_EX | persistencia.fcntl.LOCK_NB)
+    salir[1].set()
+    for h in hilos:
+        h.join(5)
+    with open(persistencia.RUTA_BLOQUEO, "a+b") as otro:
+        persistencia.fcntl.flock(otro.fileno(), persistencia.fcntl.LOCK_EX | persistencia.fcntl.LOCK_NB)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import motores
+import persistencia
+import servidor
+from concurrencia import CatalogoCompartido
+
+PRO_MAX = {"marca": "iphone", "modelo": "15 pro max", "almacenamiento": "512"}
+
+
+def _cantidad_en_disco(marca, modelo, almacenamiento):
+    archivo = persistencia.aplicar_diario(persistencia.leer_csv())
+    return int(next(fila for fila in archivo[1:] if (fila[0], fila[1], fila[4]) == (marca, modelo, almacenamiento))[2])
+
+
+async def _con_servidor(catalogo, solicitudes):
+    # Levanta el servidor en un puerto libre, envía las solicitudes por una conexión y lo detiene.
+    inventario = servidor.ServidorInventario(catalogo)
+    conexiones = await inventario.iniciar(puerto=0)
+    puerto = conexiones.sockets[0].getsockname()[1]
+    respuestas = []
+    try:
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        for solicitud in solicitudes:
+            escritor.write(json.dumps(solicitud).encode("utf-8") + b"\n")
+            await escritor.drain()
+            respuestas.append(json.loads(await lector.readline()))
+            await asyncio.wait_for(inventario._cambios.join(), 5)
+        escritor.close()
+    finally:
+        conexiones.close()
+        await conexiones.wait_closed()
+        await asyncio.wait_for(inventario.detener(), 5)
+    return inventario, respuestas
+
+
+def test_cambios_de_los_clientes_llegan_al_disco(carpeta):
+    _, respuestas = asyncio.run(_con_servidor(motores.abrir_catalogo(), [
+        {"op": "stock", **PRO_MAX, "diferencia": -2},
+        {"op": "precio", **PRO_MAX, "precio": 1099},
+        {"op": "pedido", "items": [{**PRO_MAX, "cantidad": 1}], "pago": "efectivo", "monto": 2000},
+        {"op": "stock", **PRO_MAX, "diferencia": -5},
+    ]))
+    assert [respuesta["ok"] for respuesta in respuestas] == [True, True, True, False]
+    assert respuestas[0]["resultado"] == 3
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 2
+    assert ["Iphone", "15 Pro Max", "2", "1099", "512", "2023"] in persistencia.aplicar_diario(persistencia.leer_csv())
+
+
+def test_escritura_fallida_se_informa_y_no_se_aceptan_mas_cambios(carpeta, monkeypatch):
+    def fallar(*argumentos):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(servidor, "_guardar_cambios", fallar)
+    inventario, respuestas = asyncio.run(_con_servidor(motores.abrir_catalogo(), [
+        {"op": "stock", **PRO_MAX, "diferencia": -1},
+        {"op": "stock", **PRO_MAX, "diferencia": -1},
+        {"op": "resumen"},
+    ]))
+    assert [respuesta["ok"] for respuesta in respuestas] == [True, False, True]
+    assert "disco lleno" in respuestas[1]["error"] and inventario.error == respuestas[1]["error"]
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 5
+
+
+def test_servidor_compartido_no_pisa_los_cambios_de_otra_terminal(carpeta):
+    async def probar():
+        inventario = servidor.ServidorInventario(motores.abrir_catalogo(compartido=True))
+        await inventario.stock(**PRO_MAX, diferencia=-1)
+        # Otra terminal vende mientras el cambio del servidor espera en la cola.
+        CatalogoCompartido.cargar().actualizar_stock("Iphone", "15 Pro Max", "512", -2)
+        conexiones = await inventario.iniciar(puerto=0)
+        conexiones.close()
+        await asyncio.wait_for(inventario._cambios.join(), 5)
+        # Sin cambios pendientes, el siguiente cambio parte del stock que dejó la otra terminal.
+        resultado = await inventario.stock(**PRO_MAX, diferencia=-1)
+        await asyncio.wait_for(inventario.detener(), 5)
+        return resultado
+
+    assert asyncio.run(probar()) == 1
+    assert _cantidad_en_disco("Iphone", "15 Pro Max", "512") == 1
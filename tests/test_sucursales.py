@@ -0,0 +1,60 @@
+import pytest
+
+import persistencia
+from catalogo import Catalogo
+from sucursales import Sucursales
+
+CLAVE = ("Iphone", "15 Pro Max", "512")
+
+
+@pytest.fixture
+def red(carpeta):
+    # Dos sucursales con el mismo catálogo y distinto stock del Iphone 15 Pro Max 512GB.
+    (carpeta / "sucursales").mkdir()
+    archivo = persistencia.leer_csv()
+    for nombre, cantidad in (("centro", 2), ("norte", 9)):
+        ruta = str(carpeta / "sucursales" / f"{nombre}.csv")
+        filas = [list(fila) for fila in archivo]
+        next(fila for fila in filas[1:] if (fila[0], fila[1], fila[4]) == CLAVE)[2] = str(cantidad)
+        persistencia.escribir_archivo(filas, ruta)
+    return Sucursales(str(carpeta / "sucursales"))
+
+
+def test_consultas_combinan_las_sucursales(red):
+    catalogo = Catalogo(persistencia.leer_csv())
+    modelos = red.modelos("iphone", 512)
+    assert [clave for clave, *_ in modelos] == sorted(
+        (fila.marca, fila.modelo, str(fila.almacenamiento)) for fila in catalogo.consultar("iphone", 512))
+    assert dict((clave, (total, stock)) for clave, total, _, stock in modelos)[CLAVE] == (11, {"centro": 2, "norte": 9})
+
+    precios = [celular.precio for _, celular in red.presupuesto("samsung", 900)]
+    assert precios == sorted(precios, reverse=True)
+    assert len(precios) == 2 * len(catalogo.buscar_por_precio("samsung", maximo=900))
+    assert len(red.presupuesto("samsung", 900, limite=3)) == 3
+
+
+def test_elegir_prefiere_la_sucursal_pedida_si_le_alcanza(red):
+    assert red.disponibilidad("iphone", "15 pro max", "512") == {"centro": 2, "norte": 9}
+    assert red.elegir(*CLAVE, 2, preferida="centro").nombre == "centro"
+    assert red.elegir(*CLAVE, 3, preferida="centro").nombre == "norte"
+    assert red.elegir(*CLAVE, 10) is None
+
+
+def test_cambios_de_una_sucursal_se_guardan_en_su_archivo(red, carpeta):
+    red["norte"].catalogo.actualizar_stock(*CLAVE, -4)
+    red.cerrar()
+    otra = Sucursales(str(carpeta / "sucursales"))
+    assert otra.disponibilidad(*CLAVE) == {"centro": 2, "norte": 5}
+    assert Catalogo(persistencia.leer_csv()).cantidad(*CLAVE) == 5
+
+
+def test_dos_terminales_en_la_misma_sucursal_no_se_pisan(red, carpeta):
+    otra = Sucursales(str(carpeta / "sucursales"))
+    assert red["norte"].catalogo.cantidad(*CLAVE) == otra["norte"].catalogo.cantidad(*CLAVE) == 9
+    assert otra["norte"].catalogo.actualizar_stock(*CLAVE, -4) == 5
+    # La primera terminal ve la venta de la otra y valida sobre el stock vigente.
+    assert red.disponibilidad(*CLAVE)["norte"] == 5
+    assert red["norte"].catalogo.actualizar_stock(*CLAVE, -6) is None
+    assert red["norte"].catalogo.actualizar_stock(*CLAVE, -5) == 0
+    red.cerrar()
+    assert Sucursales(str(carpeta / "sucursales")).disponibilidad(*CLAVE) == {"centro": 2, "norte": 0}
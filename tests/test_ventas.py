@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+import pytest
+
+import persistencia
+import ventas
+
+
+def _momento(dia, hora=12):
+    return time.mktime(time.strptime(f"{dia} {hora}", "%Y-%m-%d %H"))
+
+
+@pytest.fixture(params=[False, True], ids=["texto", "binario"])
+def libro(carpeta, request):
+    libro = ventas.LibroVentas(binario=request.param)
+    libro.registrar("Iphone", "15", "512", 999, "efectivo", _momento("2024-03-01"))
+    libro.registrar("Samsung", "Galaxy S23", "256", 799, "tarjeta", _momento("2024-03-01", 15))
+    libro.registrar("Iphone", "15", "512", 999, "tarjeta", _momento("2024-03-02"))
+    libro.registrar("Xiaomi", "13T", "256", 499, "efectivo", _momento("2024-03-04"))
+    libro.volcar()
+    return libro
+
+
+def test_leer_solo_los_dias_pedidos(libro):
+    assert [venta.modelo for venta in libro.leer("2024-03-02", "2024-03-04")] == ["15", "13T"]
+    assert [venta.dia for venta in libro.leer("2024-03-01")] == ["2024-03-01", "2024-03-01"]
+    assert list(libro.leer("2024-03-03")) == []
+
+
+def test_totales_por_marca_y_pago(libro):
+    assert libro.totales("2024-03-01", "2024-03-04", por=("marca",)) == [
+        {"marca": "Iphone", "unidades": 2, "ingresos": 1998},
+        {"marca": "Samsung", "unidades": 1, "ingresos": 799},
+        {"marca": "Xiaomi", "unidades": 1, "ingresos": 499},
+    ]
+    assert libro.totales("2024-03-01", "2024-03-04", por=("pago",), marca="iphone") == [
+        {"pago": "efectivo", "unidades": 1, "ingresos": 999},
+        {"pago": "tarjeta", "unidades": 1, "ingresos": 999},
+    ]
+
+
+def test_registro_cortado_se_descarta_al_abrir(libro):
+    with open(libro.ruta, "ab") as archivo:
+        archivo.write(ventas._codificar(ventas.Venta(_momento("2024-03-04"), "Iphone", "15", "128", 1, "efectivo"),
+                                        libro.binario)[:-3])
+    otro = ventas.LibroVentas(libro.ruta, libro.binario)
+    otro.registrar("Iphone", "15", "128", 799, "efectivo", _momento("2024-03-04", 18))
+    otro.volcar()
+    assert [venta.precio for venta in otro.leer("2024-03-04")] == [499, 799]
+
+
+def test_volcar_descarta_el_registro_cortado_de_otra_terminal(libro):
+    # La otra terminal se cortó después de que este libro se abriera.
+    with open(libro.ruta, "ab") as archivo:
+        archivo.write(ventas._codificar(ventas.Venta(_momento("2024-03-04"), "Iphone", "15", "128", 1, "efectivo"),
+                                        libro.binario)[:-3])
+    libro.registrar("Iphone", "15", "128", 799, "efectivo", _momento("2024-03-04", 18))
+    libro.volcar()
+    assert [venta.precio for venta in ventas.LibroVentas(libro.ruta, libro.binario).leer("2024-03-04")] == [499, 799]
+
+
+def test_ventas_pendientes_se_escriben_al_vencer_la_ventana(carpeta, monkeypatch):
+    monkeypatch.setattr(ventas, "VENTANA_SEGUNDOS", 0.05)
+    libro = ventas.LibroVentas()
+    libro.registrar("Iphone", "15", "512", 999, "efectivo", _momento("2024-03-01"))
+    limite = time.monotonic() + 5
+    while libro.pendientes and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert [venta.precio for venta in ventas.LibroVentas().leer("2024-03-01")] == [999]
+
+
+def test_indice_borrado_se_reconstruye(libro):
+    bloques = list(libro.bloques)
+    os.remove(libro.ruta_indice)
+    otro = ventas.LibroVentas(libro.ruta, libro.binario)
+    assert otro.bloques == bloques
+    assert otro.totales("2024-03-01", "2024-03-04", por=()) == [{"unidades": 4, "ingresos": 3296}]
+
+
+@pytest.mark.skipif(persistencia.fcntl is None, reason="requiere fcntl")
+def test_reparar_espera_a_quien_esta_escribiendo(libro):
+    # Otra terminal empezó a agregar una venta y todavía tiene el bloqueo: el registro a medias no se toca.
+    registro = ventas._codificar(ventas.Venta(_momento("2024-03-04", 18), "Iphone", "15", "128", 799, "efectivo"),
+                                 libro.binario)
+    abierto = []
+    with open(persistencia.RUTA_BLOQUEO, "a+b") as otra_terminal:
+        persistencia.fcntl.flock(otra_terminal.fileno(), persistencia.fcntl.LOCK_EX)
+        with open(libro.ruta, "ab") as archivo:
+            archivo.write(registro[:5])
+            archivo.flush()
+            hilo = threading.Thread(target=lambda: abierto.append(ventas.LibroVentas(libro.ruta, libro.binario)))
+            hilo.start()
+            hilo.join(0.2)
+            assert not abierto
+            archivo.write(registro[5:])
+        persistencia.fcntl.flock(otra_terminal.fileno(), persistencia.fcntl.LOCK_UN)
+    hilo.join(5)
+    assert [venta.precio for venta in abierto[0].leer("2024-03-04")] == [499, 799]
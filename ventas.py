@@ -0,0 +1,320 @@
+import argparse
+import os
+import struct
+import threading
+import time
+from typing import List, Dict, Tuple, Optional, Iterator, NamedTuple
+
+import persistencia
+import instrumentacion
+
+RUTA_VENTAS = "ventas.log"
+RUTA_VENTAS_BINARIO = "ventas.bin"
+
+# Si está activo, el libro se guarda con la codificación binaria compacta en lugar de texto.
+BINARIO = False
+
+# Las ventas se acumulan en memoria y se escriben juntas al llegar a MAX_PENDIENTES ventas o cuando la más
+# vieja sin escribir tiene más de VENTANA_SEGUNDOS (un temporizador las escribe aunque no haya más ventas).
+# Las consultas y volcar() escriben lo pendiente antes.
+MAX_PENDIENTES = 64
+VENTANA_SEGUNDOS = 1.0
+
+PAGOS = ("efectivo", "tarjeta")
+
+# Registro binario: momento, precio, almacenamiento, forma de pago y largo de "marca;modelo" en UTF-8.
+_REGISTRO = struct.Struct("<dIHBH")
+
+
+class Venta(NamedTuple):
+    momento: float
+    marca: str
+    modelo: str
+    almacenamiento: str
+    precio: int
+    pago: str
+
+    @property
+    def dia(self) -> str:
+        return time.strftime("%Y-%m-%d", time.localtime(self.momento))
+
+
+def _codificar(venta: Venta, binario: bool) -> bytes:
+    if binario:
+        nombre = f"{venta.marca};{venta.modelo}".encode("utf-8")
+        return _REGISTRO.pack(venta.momento, venta.precio, int(venta.almacenamiento),
+                              PAGOS.index(venta.pago), len(nombre)) + nombre
+    return (f"{venta.momento:.3f};{venta.marca};{venta.modelo};{venta.almacenamiento};"
+            f"{venta.precio};{venta.pago}\n").encode("utf-8")
+
+
+def _decodificar(datos: bytes, binario: bool) -> Tuple[List[Venta], int]:
+    '''
+    Decodifica los registros completos de "datos" y devuelve las ventas y los bytes que ocupan.
+    '''
+    ventas = []
+    if binario:
+        posicion = 0
+        while posicion + _REGISTRO.size <= len(datos):
+            momento, precio, almacenamiento, pago, largo = _REGISTRO.unpack_from(datos, posicion)
+            fin = posicion + _REGISTRO.size + largo
+            if fin > len(datos):
+                break
+            marca, modelo = datos[posicion + _REGISTRO.size:fin].decode("utf-8").split(";", 1)
+            ventas.append(Venta(momento, marca, modelo, str(almacenamiento), precio, PAGOS[pago]))
+            posicion = fin
+        return ventas, posicion
+
+    completos = datos[:datos.rfind(b"\n") + 1]
+    for linea in completos.decode("utf-8").splitlines():
+        momento, marca, modelo, almacenamiento, precio, pago = linea.split(";")
+        ventas.append(Venta(float(momento), marca, modelo, almacenamiento, int(precio), pago))
+    return ventas, len(completos)
+
+
+class LibroVentas:
+    '''
+    Libro de ventas de solo agregado, con un índice por día.
+
+    Las ventas se escriben en orden de llegada, así que las de un mismo día quedan en bloques contiguos.
+    El índice ("<ruta>.idx") guarda el día y la posición donde empieza cada bloque, de modo que un
+    reporte de un rango de días lee solo los bloques de esos días y no todo el historial.
+    '''
+
+    def __init__(self, ruta: Optional[str] = None, binario: bool = BINARIO) -> None:
+        self.binario = binario
+        # Ruta absoluta: el temporizador de la ventana escribe en el mismo libro aunque cambie la carpeta actual.
+        self.ruta = os.path.abspath(ruta or (RUTA_VENTAS_BINARIO if binario else RUTA_VENTAS))
+        self.ruta_indice = self.ruta + ".idx"
+        self.pendientes: List[Venta] = []
+        self._desde = 0.0
+        # Protege "pendientes" entre registrar() y el temporizador. Se toma siempre después del bloqueo de
+        # persistencia, nunca antes, para que dos hilos no se esperen entre sí.
+        self._cerrojo = threading.Lock()
+        self.bloques: List[Tuple[str, int]] = []
+        # Fin del último registro que se sabe completo (escrito o revisado por este libro).
+        self._fin = 0
+        self._reparar()
+
+    def _leer_indice(self) -> None:
+        try:
+            with open(self.ruta_indice, "rt", encoding="utf-8") as indice:
+                lineas = indice.read().split("\n")
+        except FileNotFoundError:
+            lineas = []
+        # La última línea puede estar incompleta si el programa se cortó mientras escribía.
+        self.bloques = [(dia, int(inicio)) for dia, inicio in (linea.split(";") for linea in lineas[:-1] if linea)]
+
+    def _reparar(self) -> None:
+        with persistencia.bloquear():
+            if os.path.exists(self.ruta) and not os.path.exists(self.ruta_indice):
+                self.reconstruir_indice()
+            else:
+                self._leer_indice()
+            self._descartar_incompleto()
+
+    def _descartar_incompleto(self) -> int:
+        # Descarta un último registro incompleto, para que la próxima venta no quede pegada a él, y devuelve
+        # el largo del libro. Se llama con el bloqueo exclusivo tomado: ninguna otra terminal está escribiendo,
+        # así que un registro incompleto es de un programa que se cortó y no una venta que otra terminal está
+        # agregando. Solo se revisa lo escrito desde el último registro que se sabe completo.
+        if not os.path.exists(self.ruta):
+            self._fin = 0
+            return 0
+        with open(self.ruta, "r+b") as libro:
+            tamanio = libro.seek(0, os.SEEK_END)
+            conocidos = (self._fin, self.bloques[-1][1] if self.bloques else 0)
+            inicio = max((inicio for inicio in conocidos if inicio <= tamanio), default=0)
+            if inicio < tamanio:
+                libro.seek(inicio)
+                _, largo = _decodificar(libro.read(), self.binario)
+                if inicio + largo != tamanio:
+                    libro.truncate(inicio + largo)
+                tamanio = inicio + largo
+        self._fin = tamanio
+        return tamanio
+
+    def reconstruir_indice(self) -> None:
+        '''
+        Vuelve a armar el índice por día recorriendo todo el libro (por ejemplo, si se borró el índice).
+        '''
+        self.bloques = []
+        ultimo_dia = None
+        posicion = 0
+        with persistencia.bloquear():
+            if os.path.exists(self.ruta):
+                with open(self.ruta, "rb") as libro:
+                    datos = libro.read()
+                ventas, _ = _decodificar(datos, self.binario)
+                for venta in ventas:
+                    if venta.dia != ultimo_dia:
+                        self.bloques.append((venta.dia, posicion))
+                        ultimo_dia = venta.dia
+                    posicion += len(_codificar(venta, self.binario))
+            with open(self.ruta_indice, "w", encoding="utf-8") as indice:
+                indice.writelines(f"{dia};{inicio}\n" for dia, inicio in self.bloques)
+
+    def registrar(self, marca: str, modelo: str, almacenamiento: str, precio: float, pago: str,
+                  momento: Optional[float] = None) -> Venta:
+        '''
+        Agrega una venta al libro.
+
+        Parámetros:
+        - pago: "efectivo" o "tarjeta".
+        - momento: Fecha y hora de la venta como marca de tiempo. Si es None se usa la hora actual.
+
+        Postcondiciones:
+        - La venta queda pendiente y se escribe con el próximo grupo (ver MAX_PENDIENTES y VENTANA_SEGUNDOS).
+        - Devuelve la venta registrada.
+        '''
+        venta = Venta(time.time() if momento is None else momento, marca, modelo, str(almacenamiento),
+                      int(precio), pago.lower())
+        if venta.pago not in PAGOS:
+            raise ValueError(f"Forma de pago desconocida: {pago}")
+        with self._cerrojo:
+            if not self.pendientes:
+                self._desde = time.monotonic()
+                if VENTANA_SEGUNDOS > 0:
+                    temporizador = threading.Timer(VENTANA_SEGUNDOS, self._volcar_vencido, args=(self._desde,))
+                    temporizador.daemon = True
+                    temporizador.start()
+            self.pendientes.append(venta)
+            lleno = len(self.pendientes) >= MAX_PENDIENTES or time.monotonic() - self._desde >= VENTANA_SEGUNDOS
+        if lleno:
+            self.volcar()
+        return venta
+
+    def _volcar_vencido(self, desde: float) -> None:
+        # Temporizador de la ventana: si las ventas que lo iniciaron siguen pendientes, las escribe.
+        if self.pendientes and self._desde == desde:
+            self.volcar()
+
+    @instrumentacion.medir
+    def volcar(self) -> None:
+        '''
+        Escribe en disco las ventas pendientes.
+
+        Postcondiciones:
+        - Primero se agregan al índice los bloques nuevos y después las ventas, con una sola escritura
+          sincronizada con el disco. Si el programa se corta en el medio, el índice puede tener un bloque
+          vacío pero nunca le falta el comienzo de un día.
+        - Antes de escribir se descarta un registro incompleto que haya dejado otra terminal que se cortó.
+        '''
+        if not self.pendientes:
+            return
+        with persistencia.bloquear():
+            with self._cerrojo:
+                ventas, self.pendientes = self.pendientes, []
+            if not ventas:
+                return
+            datos = [_codificar(venta, self.binario) for venta in ventas]
+            # Otras terminales pueden haber agregado ventas y bloques desde la última lectura del índice.
+            self._leer_indice()
+            posicion = self._descartar_incompleto()
+            ultimo_dia = self.bloques[-1][0] if self.bloques else None
+            nuevos = []
+            for venta, registro in zip(ventas, datos):
+                if venta.dia != ultimo_dia:
+                    nuevos.append((venta.dia, posicion))
+                    ultimo_dia = venta.dia
+                posicion += len(registro)
+
+            if nuevos:
+                with open(self.ruta_indice, "a", encoding="utf-8") as indice:
+                    indice.writelines(f"{dia};{inicio}\n" for dia, inicio in nuevos)
+                    indice.flush()
+                    os.fsync(indice.fileno())
+                self.bloques.extend(nuevos)
+            with open(self.ruta, "ab") as libro:
+                libro.write(b"".join(datos))
+                libro.flush()
+                os.fsync(libro.fileno())
+            self._fin = posicion
+        if instrumentacion.ACTIVA:
+            instrumentacion.sumar("LibroVentas.volcar", filas=len(ventas), bytes_escritos=sum(len(d) for d in datos))
+
+    def leer(self, desde: str, hasta: Optional[str] = None) -> Iterator[Venta]:
+        '''
+        Recorre las ventas de los días entre "desde" y "hasta" inclusive (fechas "AAAA-MM-DD").
+
+        Postcondiciones:
+        - Solo se leen del disco los bloques de esos días, según el índice.
+        - Si "hasta" es None, se usa el mismo día que "desde".
+        '''
+        self.volcar()
+        hasta = hasta or desde
+        # Con el bloqueo tomado se fijan los bloques y el largo del libro, así lo que otras terminales
+        # agreguen mientras se lee no se mezcla con el último bloque.
+        with persistencia.bloquear(exclusivo=False):
+            self._leer_indice()
+            if not self.bloques:
+                return
+            bloques = list(self.bloques)
+            libro = open(self.ruta, "rb")
+            fin_libro = libro.seek(0, os.SEEK_END)
+        with libro:
+            for i, (dia, inicio) in enumerate(bloques):
+                if not desde <= dia <= hasta:
+                    continue
+                fin = bloques[i + 1][1] if i + 1 < len(bloques) else fin_libro
+                libro.seek(inicio)
+                datos = libro.read(fin - inicio)
+                if instrumentacion.ACTIVA:
+                    instrumentacion.sumar("LibroVentas.leer", bytes_leidos=len(datos))
+                yield from _decodificar(datos, self.binario)[0]
+
+    @instrumentacion.medir
+    def totales(self, desde: str, hasta: Optional[str] = None, por: Tuple[str, ...] = ("dia",),
+                marca: Optional[str] = None, modelo: Optional[str] = None) -> List[Dict[str, object]]:
+        '''
+        Calcula las unidades vendidas y los ingresos de un rango de días.
+
+        Parámetros:
+        - por: Campos por los que se agrupa: "dia", "marca", "modelo", "almacenamiento" y/o "pago".
+          Con una tupla vacía se devuelve un solo total.
+        - marca, modelo: Si se indican, solo se cuentan las ventas de esa marca (sin distinguir mayúsculas)
+          y de ese modelo.
+
+        Postcondiciones:
+        - Devuelve una fila por grupo, ordenadas por los campos de agrupación, con esos campos más
+          "unidades" e "ingresos".
+        '''
+        grupos: Dict[tuple, List[int]] = {}
+        for venta in self.leer(desde, hasta):
+            if marca is not None and venta.marca.lower() != marca.lower():
+                continue
+            if modelo is not None and venta.modelo != modelo:
+                continue
+            total = grupos.setdefault(tuple(getattr(venta, campo) for campo in por), [0, 0])
+            total[0] += 1
+            total[1] += venta.precio
+        return [dict(zip(por, clave), unidades=unidades, ingresos=ingresos)
+                for clave, (unidades, ingresos) in sorted(grupos.items())]
+
+
+_libro: Dict[str, LibroVentas] = {}
+
+
+def abrir() -> LibroVentas:
+    '''
+    Devuelve el libro de ventas por defecto (RUTA_VENTAS, o RUTA_VENTAS_BINARIO si BINARIO está activo).
+    '''
+    if "libro" not in _libro:
+        _libro["libro"] = LibroVentas()
+    return _libro["libro"]
+
+
+def hoy() -> str:
+    return time.strftime("%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reporte de ventas por día, marca y modelo.")
+    parser.add_argument("--desde", default=hoy(), help="Primer día (AAAA-MM-DD). Por defecto, hoy.")
+    parser.add_argument("--hasta", help="Último día (AAAA-MM-DD). Por defecto, el mismo que --desde.")
+    parser.add_argument("--por", nargs="*", default=["dia"], help="Campos de agrupación (dia, marca, modelo, almacenamiento, pago).")
+    parser.add_argument("--marca")
+    parser.add_argument("--modelo")
+    argumentos = parser.parse_args()
+    for fila in abrir().totales(argumentos.desde, argumentos.hasta, tuple(argumentos.por), argumentos.marca, argumentos.modelo):
+        print(" | ".join(f"{campo}: {valor}" for campo, valor in fila.items()))